@@ -0,0 +1,114 @@
+# API/cache.py
+
+"""
+In-process LRU cache for P&L files served by the API.
+
+Entries are keyed by (symbol, strategy) and validated against the file's
+mtime and size on every lookup, so a re-run backtest is picked up on the
+next request.  Each entry keeps the response body pre-serialized (compact
+JSON plus a gzip copy) together with a content ETag, so repeated polls
+cost one os.stat() and, when the client sends If-None-Match, a 304.
+Entries also carry the series as sorted date/value arrays, so range queries
+are answered with a binary search over them without re-reading the file.
+"""
+
+import os
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+import numpy as np
+import orjson
+from fastapi import Request, Response
+
+# Bodies smaller than this are not worth compressing on the fly.
+GZIP_MIN_BYTES = 1024
+
+
+@dataclass
+class CachedFile:
+    mtime_ns: int
+    size: int
+    body: bytes      # compact JSON
+    gzipped: bytes   # gzip of body
+    etag: str
+    dates: np.ndarray   # datetime64[D], ascending
+    values: np.ndarray  # float64, aligned with dates
+
+    @classmethod
+    def load(cls, path: str, st: os.stat_result) -> "CachedFile":
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        body = orjson.dumps(data)
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        dates = np.array([row["date"] for row in data], dtype="datetime64[D]")
+        values = np.array([row["value"] for row in data], dtype=np.float64)
+        return cls(st.st_mtime_ns, st.st_size, body, gzip.compress(body, 6), etag, dates, values)
+
+
+class FileCache:
+    """Bounded LRU of CachedFile entries with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, CachedFile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, path: str) -> CachedFile:
+        """Return the entry for `key`, (re)loading `path` if it changed on disk."""
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Parse outside the lock so a large file doesn't stall other requests
+        entry = CachedFile.load(path, st)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": sum(len(e.body) + len(e.gzipped) for e in self._entries.values()),
+            }
+
+
+def etag_response(request: Request, body: bytes, etag: str,
+                  gzipped: Optional[bytes] = None) -> Response:
+    """304 if the client already has `etag`, else the body (gzipped if accepted)."""
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        if gzipped is None and len(body) >= GZIP_MIN_BYTES:
+            gzipped = gzip.compress(body, 6)
+        if gzipped is not None:
+            headers["Content-Encoding"] = "gzip"
+            return Response(gzipped, media_type="application/json", headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def cached_response(entry: CachedFile, request: Request) -> Response:
+    """Serve the whole pre-serialized file."""
+    return etag_response(request, entry.body, entry.etag, entry.gzipped)
@@ -0,0 +1,153 @@
+# API/data.py
+
+"""
+Non-blocking data access for the API.
+
+Handlers never touch the disk on the event loop:
+
+* File reads and CPU-bound work (parsing a P&L file, computing metrics) run
+  through run_io(), a bounded pool of API_IO_THREADS threads (default 8)
+  separate from Starlette's own thread pool, so a burst of cold reads
+  queues up here instead of starving every sync endpoint.
+* Price queries go to SQLite through aiosqlite.  SQLitePool keeps
+  API_DB_POOL (default 4) read-only connections open and hands them out
+  per query; under WAL they read concurrently with the ingestion writer.
+
+json_response() serializes with orjson, which handles NumPy arrays
+natively and is several times faster than json.dumps on price series.
+"""
+
+import os
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import anyio
+import aiosqlite
+import numpy as np
+import orjson
+from fastapi import HTTPException, Response
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+DEFAULT_PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+_io_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+async def run_io(fn, *args, **kwargs):
+    """Run blocking `fn` on the bounded I/O pool and await its result."""
+    global _io_limiter
+    if _io_limiter is None:
+        _io_limiter = anyio.CapacityLimiter(int(os.getenv("API_IO_THREADS", 8)))
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs),
+                                          limiter=_io_limiter)
+
+
+def dumps(data) -> bytes:
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def json_response(data, headers: Optional[dict] = None) -> Response:
+    return Response(dumps(data), media_type="application/json", headers=headers)
+
+
+class SQLitePool:
+    """A fixed set of read-only aiosqlite connections shared by all requests."""
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: Optional[asyncio.Queue] = None
+        self._opened = 0
+        self._lock = asyncio.Lock()
+
+    async def _open(self) -> aiosqlite.Connection:
+        con = await aiosqlite.connect(f"file:{self.path}?mode=ro", uri=True)
+        await con.execute("PRAGMA busy_timeout=30000")
+        await con.execute("PRAGMA cache_size=-16384")  # 16 MiB page cache per connection
+        return con
+
+    @asynccontextmanager
+    async def acquire(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        # Connections are opened on demand, up to `size`; after that requests wait their turn
+        if self._idle.empty() and self._opened < self.size:
+            async with self._lock:
+                if self._opened < self.size:
+                    self._opened += 1
+                    try:
+                        self._idle.put_nowait(await self._open())
+                    except BaseException:
+                        self._opened -= 1
+                        raise
+        con = await self._idle.get()
+        try:
+            yield con
+        finally:
+            self._idle.put_nowait(con)
+
+    async def fetchall(self, sql: str, args=()) -> List[tuple]:
+        async with self.acquire() as con:
+            async with con.execute(sql, args) as cur:
+                return await cur.fetchall()
+
+    async def close(self):
+        while self._idle is not None and not self._idle.empty():
+            await self._idle.get_nowait().close()
+        self._opened = 0
+
+
+class PriceReader:
+    """Read-only, async access to the per-symbol price tables of market_data.db."""
+
+    def __init__(self, pool: SQLitePool):
+        self.pool = pool
+
+    async def symbols(self) -> List[str]:
+        rows = await self.pool.fetchall(
+            "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+        return [name for (name,) in rows]
+
+    async def _columns(self, symbol: str) -> List[str]:
+        rows = await self.pool.fetchall("SELECT name FROM pragma_table_info(?)", (symbol,))
+        if not rows:
+            raise HTTPException(404, f"no price table for {symbol} — ingest it first")
+        return [name for (name,) in rows]
+
+    async def read(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None,
+                   columns=DEFAULT_PRICE_COLUMNS) -> Dict[str, np.ndarray]:
+        """
+        {"date": datetime64[D], <column>: float64, ...} for start <= date <= end.
+        Dates are stored as 'YYYY-MM-DD HH:MM:SS.ffffff' text, so the bounds
+        compare as strings and use the Date index.
+        """
+        try:
+            start = None if start is None else str(np.datetime64(start, "D"))
+            end = None if end is None else str(np.datetime64(end, "D"))
+        except ValueError:
+            raise HTTPException(422, "start/end must be dates in YYYY-MM-DD format")
+        symbol = symbol.upper()
+        available = await self._columns(symbol)
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise HTTPException(422, f"{symbol} has no column(s) {', '.join(missing)}")
+
+        where, args = [], []
+        if start is not None:
+            where.append('"Date" >= ?')
+            args.append(start)
+        if end is not None:
+            where.append("\"Date\" < date(?, '+1 day')")
+            args.append(end)
+        select = ", ".join(f'"{c}"' for c in columns)
+        sql = f'SELECT substr("Date", 1, 10), {select} FROM "{symbol}"'
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = await self.pool.fetchall(sql + ' ORDER BY "Date"', args)
+
+        out = {"date": np.array([row[0] for row in rows], dtype="datetime64[D]")}
+        for i, col in enumerate(columns, start=1):
+            out[col] = np.array([row[i] for row in rows], dtype=np.float64)
+        return out
@@ -0,0 +1,49 @@
+# API/downsample.py
+
+"""
+Shape-preserving downsampling for P&L series.
+
+Largest-Triangle-Three-Buckets (Steinarsson, 2013) keeps the first and last
+points and, from every bucket in between, the point that forms the largest
+triangle with the previously kept point and the average of the next bucket.
+Peaks and drawdowns survive, which plain striding would drop.
+"""
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Return the indices of the `n_out` points LTTB keeps from (x, y).
+    If the series already has <= n_out points every index is returned.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("LTTB needs at least 3 output points")
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bucket edges over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Per-bucket averages, used as the third triangle vertex
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1])[: n_out - 2] / np.diff(edges)
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1])[: n_out - 2] / np.diff(edges)
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Twice the triangle area for every candidate in the bucket at once
+        area = np.abs(
+            (x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
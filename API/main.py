@@ -1,18 +1,40 @@
 # API/main.py
 
 import os
-import json
-from typing import List
+import sys
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 import pandas.errors as pderr
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 
+from .cache import FileCache, cached_response, etag_response
+from .data import (DEFAULT_PRICE_COLUMNS, PRICE_COLUMNS, PriceReader, SQLitePool, dumps,
+                   json_response, run_io)
+from .downsample import lttb
 from .utils import current_cfg
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backtester.metrics import compute_metrics
+from Backtester.results import SUFFIX, ResultFile
+from Backtester.sweep_index import SORT_COLUMNS, SweepIndex
+from common.stream import stream_enabled
+
+from .stream import KEEPALIVE, Hub, start_listener
+
 # Load config and env
 cfg = current_cfg()
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
@@ -24,8 +46,27 @@ if db_path_env:
 else:
     DB_PATH = os.path.join(os.path.dirname(__file__), "../DataPipeline/market_data.db")
 
+# Async, read-only connection pool onto the price database
+prices = PriceReader(SQLitePool(DB_PATH, size=int(os.getenv("API_DB_POOL", 4))))
+
+# Live P&L broker fed by traders and sweeps over UDP (see API/stream.py)
+live = Hub()
+LIVE_KEEPALIVE_SECONDS = float(os.getenv("LIVE_KEEPALIVE_SECONDS", 15))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = None
+    if stream_enabled():
+        listener = await start_listener(live)
+    yield
+    if listener is not None:
+        listener.close()
+    await prices.pool.close()
+
+
 # Initialize FastAPI app
-app = FastAPI(title="TradingFund API")
+app = FastAPI(title="TradingFund API", lifespan=lifespan)
 
 # CORS for local dev and deployed dashboard
 app.add_middleware(
@@ -38,18 +79,268 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Directory of the pnl_<symbol>_<strategy>.json files written by backtest.py
+PNL_DIR = os.getenv("PNL_DIR", os.path.dirname(__file__))
+
+# P&L files parsed and pre-serialized in memory, keyed by (symbol, strategy)
+pnl_cache = FileCache(maxsize=int(os.getenv("PNL_CACHE_SIZE", 128)))
+
+# Sweep metrics index; re-scanned for new files at most every SWEEP_REFRESH_SECONDS
+SWEEP_DIR = os.getenv("SWEEP_DIR", os.path.join(os.path.dirname(__file__), "pnl_sweep"))
+SWEEP_REFRESH_SECONDS = float(os.getenv("SWEEP_REFRESH_SECONDS", 30))
+sweep_index = SweepIndex(SWEEP_DIR)
+_sweep_refreshed = 0.0
+_sweep_refresh_lock = threading.Lock()
+
+
+def refresh_sweeps(force: bool = False, full: bool = False) -> Optional[dict]:
+    """Incrementally refresh the sweep index if it is older than SWEEP_REFRESH_SECONDS."""
+    global _sweep_refreshed
+    if not force and time.monotonic() - _sweep_refreshed < SWEEP_REFRESH_SECONDS:
+        return None
+    with _sweep_refresh_lock:
+        stats = sweep_index.refresh(full=full)
+        _sweep_refreshed = time.monotonic()
+    return stats
+
+
+def series_body(dates: np.ndarray, values: np.ndarray, start: Optional[str], end: Optional[str],
+                max_points: Optional[int]) -> bytes:
+    """Compact JSON of [start, end] of a series, LTTB-downsampled to max_points."""
+    lo, hi = 0, len(dates)
+    try:
+        if start is not None:
+            lo = int(np.searchsorted(dates, np.datetime64(start, "D"), side="left"))
+        if end is not None:
+            hi = max(lo, int(np.searchsorted(dates, np.datetime64(end, "D"), side="right")))
+    except ValueError:
+        raise HTTPException(422, "start/end must be dates in YYYY-MM-DD format")
+    dates, values = dates[lo:hi], values[lo:hi]
+    if max_points is not None:
+        keep = lttb(dates.astype(np.int64), values, max_points)
+        dates, values = dates[keep], values[keep]
+    return dumps([{"date": d, "value": v} for d, v in zip(dates.astype(str).tolist(), values.tolist())])
+
+def price_metrics(dates: np.ndarray, close: np.ndarray) -> dict:
+    """Summary statistics of a close series (daily bars, 252 per year)."""
+    returns = np.diff(close) / close[:-1]
+    years = len(returns) / 252
+    total = close[-1] / close[0] - 1
+    metrics = {
+        "start": str(dates[0]), "end": str(dates[-1]), "bars": int(len(close)),
+        "first_close": float(close[0]), "last_close": float(close[-1]),
+        "total_return": float(total),
+        "annual_return": float((1 + total) ** (1 / years) - 1) if total > -1 else -1.0,
+        "annual_volatility": float(returns.std(ddof=1) * 252 ** 0.5),
+    }
+    metrics.update(compute_metrics(close))
+    return metrics
+
 # GET /pnl
 @app.get("/pnl", response_model=List[dict])
-def get_pnl(
+async def get_pnl(
+    request: Request,
     symbol: str = Query(..., description="Ticker symbol used in the backtest"),
     strategy: str = Query(..., description="Strategy name used in the backtest"),
+    start: Optional[str] = Query(None, description="First date to return (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Last date to return (YYYY-MM-DD)"),
+    max_points: Optional[int] = Query(
+        None, ge=3, description="Downsample (LTTB) to at most this many points"
+    ),
 ):
-    """Return the P&L series for a given symbol & strategy."""
+    """
+    Return the P&L series for a given symbol & strategy, optionally sliced to
+    [start, end] and downsampled to max_points.
+    Served from the LRU cache with an ETag; If-None-Match yields a 304.
+    """
     fname = f"pnl_{symbol.lower()}_{strategy}.json"
-    path = os.path.join(os.path.dirname(__file__), fname)
-    if not os.path.isfile(path):
+    path = os.path.join(PNL_DIR, fname)
+    try:
+        # stat (and, on a miss, parse) on the I/O pool, off the event loop
+        entry = await run_io(pnl_cache.get, (symbol.lower(), strategy), path)
+    except FileNotFoundError:
         raise HTTPException(404, f"{fname} not found — run the backtest first")
-    return json.load(open(path))
+    if start is None and end is None and (max_points is None or max_points >= len(entry.values)):
+        return cached_response(entry, request)
+
+    body = await run_io(series_body, entry.dates, entry.values, start, end, max_points)
+    etag = f'{entry.etag[:-1]}-{start}-{end}-{max_points}"'
+    return etag_response(request, body, etag)
+
+# GET /sweeps
+@app.get("/sweeps", response_model=List[dict])
+async def list_sweeps():
+    """Symbols and strategies with indexed sweep runs: run count, best Sharpe and final value."""
+    def load():
+        refresh_sweeps()
+        return sweep_index.groups()
+
+    # the refresh stats sweep files and both hit SQLite: keep them off the event loop
+    return await run_io(load)
+
+# GET /sweeps/runs
+@app.get("/sweeps/runs", response_model=List[dict])
+async def list_sweep_runs(
+    sort: str = Query("sharpe", description=f"One of {', '.join(SORT_COLUMNS)}"),
+    order: str = Query("desc", description="asc or desc"),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    symbol: Optional[str] = Query(None),
+    strategy: Optional[str] = Query(None),
+    period: Optional[int] = Query(None),
+    devfactor: Optional[float] = Query(None),
+    stake: Optional[int] = Query(None),
+    rsi_period: Optional[int] = Query(None),
+    rsi_lower: Optional[float] = Query(None),
+    rsi_upper: Optional[float] = Query(None),
+    min_sharpe: Optional[float] = Query(None),
+    min_final_value: Optional[float] = Query(None),
+    drawdown_floor: Optional[float] = Query(
+        None, le=0, description="Only runs whose max drawdown is >= this, e.g. -0.2"
+    ),
+):
+    """
+    Sweep runs filtered and ranked by Sharpe, max drawdown or final value,
+    answered from the metrics index without opening any series file.
+    """
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(422, f"sort must be one of {', '.join(SORT_COLUMNS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(422, "order must be asc or desc")
+    def load():
+        refresh_sweeps()
+        return sweep_index.query(
+            sort=sort, descending=order == "desc", limit=limit, offset=offset,
+            symbol=symbol, strategy=strategy, min_sharpe=min_sharpe,
+            min_final_value=min_final_value, drawdown_floor=drawdown_floor,
+            period=period, devfactor=devfactor, stake=stake,
+            rsi_period=rsi_period, rsi_lower=rsi_lower, rsi_upper=rsi_upper,
+        )
+
+    return await run_io(load)
+
+# GET /sweeps/runs/{run_id}/pnl
+@app.get("/sweeps/runs/{run_id}/pnl", response_model=List[dict])
+async def get_sweep_run_pnl(
+    request: Request,
+    run_id: int,
+    start: Optional[str] = Query(None, description="First date to return (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Last date to return (YYYY-MM-DD)"),
+    max_points: Optional[int] = Query(
+        None, ge=3, description="Downsample (LTTB) to at most this many points"
+    ),
+):
+    """The P&L series of one indexed run, sliced and downsampled like /pnl."""
+    run = await run_io(sweep_index.get, run_id)
+    if run is None:
+        raise HTTPException(404, f"sweep run {run_id} not found")
+    path = os.path.join(SWEEP_DIR, run["source"])
+
+    def load():
+        if run["source"].endswith(SUFFIX):
+            dates, values = ResultFile(path).series(run["key"])
+            st = os.stat(path)
+            return None, dates, values, f'"{st.st_mtime_ns:x}-{st.st_size:x}-{run_id}'
+        entry = pnl_cache.get(("sweep", run["source"]), path)
+        return entry, entry.dates, entry.values, entry.etag[:-1]
+
+    try:
+        entry, dates, values, tag = await run_io(load)
+    except FileNotFoundError:
+        raise HTTPException(404, f"{run['source']} no longer exists")
+    if entry is not None and start is None and end is None and (
+            max_points is None or max_points >= len(entry.values)):
+        return cached_response(entry, request)
+    body = await run_io(series_body, dates, values, start, end, max_points)
+    return etag_response(request, body, f'{tag}-{start}-{end}-{max_points}"')
+
+# POST /sweeps/refresh
+@app.post("/sweeps/refresh")
+async def refresh_sweep_index(full: bool = Query(False, description="Re-stat every file, not just changed dirs")):
+    """Index new or changed sweep files now instead of waiting for the next periodic refresh."""
+    return await run_io(refresh_sweeps, force=True, full=full)
+
+# GET /symbols
+@app.get("/symbols", response_model=List[str])
+async def list_symbols():
+    """Symbols with a price table in the database."""
+    return await prices.symbols()
+
+# GET /prices
+@app.get("/prices")
+async def get_prices(
+    symbol: str = Query(..., description="Ingested ticker symbol, e.g. AAPL or CRYPTO_BTCUSD"),
+    start: Optional[str] = Query(None, description="First date to return (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Last date to return (YYYY-MM-DD)"),
+    columns: List[str] = Query(list(DEFAULT_PRICE_COLUMNS), description=f"Any of {', '.join(PRICE_COLUMNS)}"),
+    max_points: Optional[int] = Query(
+        None, ge=3, description="Downsample (LTTB on the first column) to at most this many points"
+    ),
+):
+    """
+    Daily bars of `symbol` as columns: {"symbol", "date": [...], "<column>": [...]}.
+    Read from SQLite through the async connection pool.
+    """
+    data = await prices.read(symbol, start, end, columns)
+    if max_points is not None and len(data["date"]) > max_points:
+        keep = await run_io(lttb, data["date"].astype(np.int64), data[columns[0]], max_points)
+        data = {k: v[keep] for k, v in data.items()}
+    data["date"] = data["date"].astype(str).tolist()
+    return json_response({"symbol": symbol.upper(), **data})
+
+# GET /metrics
+@app.get("/metrics")
+async def get_metrics(
+    symbol: str = Query(..., description="Ingested ticker symbol"),
+    start: Optional[str] = Query(None, description="First date (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Last date (YYYY-MM-DD)"),
+):
+    """Buy-and-hold summary of `symbol` over [start, end]: returns, volatility, Sharpe, max drawdown."""
+    data = await prices.read(symbol, start, end, ("Close",))
+    if len(data["date"]) < 2:
+        raise HTTPException(404, f"fewer than two {symbol.upper()} bars in that range")
+    return json_response({"symbol": symbol.upper(), **await run_io(price_metrics, data["date"], data["Close"])})
+
+# GET /stream
+@app.get("/stream")
+async def stream(
+    channel: str = Query(..., description='e.g. "live/AAPL", "live/portfolio" or "sweep"'),
+):
+    """
+    Server-sent events for one live channel: a "snapshot" event with the
+    recent history, then one event per update ("value", "fill", "run", ...).
+    A client that falls LIVE_QUEUE_SIZE messages behind gets a "dropped"
+    event and is disconnected; reconnecting starts from a new snapshot.
+    """
+    sub = live.subscribe(channel)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(sub.get(), LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    message = KEEPALIVE
+                if message is None:
+                    return
+                yield message
+        finally:
+            live.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# GET /stream/stats
+@app.get("/stream/stats")
+def stream_stats():
+    """Live channels with their subscriber counts, plus published/delivered/dropped totals."""
+    return live.stats()
+
+# GET /cache/stats
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss/eviction counters of the /pnl cache, for sizing PNL_CACHE_SIZE."""
+    return pnl_cache.stats()
 
 # GET /health
 @app.get("/health")
@@ -0,0 +1,191 @@
+# API/stream.py
+
+"""
+Live P&L publish/subscribe behind GET /stream.
+
+Publishers are the live traders (portfolio value and fills) and sweeps
+(one event per finished grid point).  They run in their own processes and
+send each event as one JSON datagram over UDP to LIVE_STREAM_ADDR with
+common/stream.py's UDPPublisher.  The API binds that address on startup
+(StreamListener) and hands every datagram to the Hub.
+
+The Hub is the in-process broker.  Each channel ("live/AAPL",
+"live/portfolio", "sweep", ...) keeps:
+
+* a sequence number, stamped on every event as "seq";
+* the last LIVE_HISTORY events of each type ("value", "fill", "run", ...),
+  which make up the snapshot a new subscriber receives first;
+* its subscribers, each with a bounded queue of LIVE_QUEUE_SIZE messages.
+
+An event is encoded as a server-sent-events message once and then put on
+every subscriber's queue, so publishing costs one encode plus one
+put_nowait per subscriber.  A subscriber whose queue is full is too slow
+to keep up.  It is dropped rather than allowed to grow memory or hold up
+the others: its backlog is cleared and it is sent a final "dropped" event.
+The client reconnects and starts again from a new snapshot.
+
+The Hub has the same publish(channel, event) method as UDPPublisher, so
+tests and single-process runs can pass a Hub to a trader directly.
+
+Only one API process can bind the UDP port.  With `serve --workers N`, the
+live stream is served by whichever worker bound it first.
+"""
+
+import os
+import json
+import math
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Optional
+
+from common.stream import DEFAULT_ADDR, parse_addr
+
+log = logging.getLogger(__name__)
+
+QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", 256))
+HISTORY = int(os.getenv("LIVE_HISTORY", 5000))
+KEEPALIVE = b": keep-alive\n\n"  # SSE comment, keeps proxies from closing idle streams
+
+
+def sse(event: str, data, seq: Optional[int] = None) -> bytes:
+    """One server-sent-events message."""
+    head = f"event: {event}\n" + (f"id: {seq}\n" if seq is not None else "")
+    return f"{head}data: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class Subscription:
+    """One client's bounded queue of encoded messages; None marks the end of the stream."""
+
+    __slots__ = ("channel", "queue", "dropped")
+
+    def __init__(self, channel: str, size: int):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(size, 2))
+        self.dropped = False
+
+    async def get(self) -> Optional[bytes]:
+        return await self.queue.get()
+
+
+class Channel:
+    __slots__ = ("name", "seq", "history", "subscribers")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seq = 0
+        self.history: Dict[str, deque] = {}
+        self.subscribers = set()
+
+
+class Hub:
+    """In-process broker: per-channel snapshots, bounded per-client queues, slow-consumer dropping."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE, history: int = HISTORY):
+        self.queue_size = queue_size
+        self.history = history
+        self.channels: Dict[str, Channel] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def _channel(self, name: str) -> Channel:
+        channel = self.channels.get(name)
+        if channel is None:
+            channel = self.channels[name] = Channel(name)
+        return channel
+
+    def publish(self, channel: str, event: dict) -> int:
+        """Record `event` (a dict with a "type") and fan it out; returns how many clients got it."""
+        ch = self._channel(channel)
+        ch.seq += 1
+        # NaN/inf (e.g. an undefined Sharpe) aren't valid JSON for EventSource clients
+        event = {k: None if isinstance(v, float) and not math.isfinite(v) else v for k, v in event.items()}
+        event["seq"] = ch.seq
+        kind = event.get("type", "event")
+        if kind not in ch.history:
+            ch.history[kind] = deque(maxlen=self.history)
+        ch.history[kind].append(event)
+        self.published += 1
+        if not ch.subscribers:
+            return 0
+
+        message = sse(kind, event, ch.seq)
+        sent = 0
+        for sub in list(ch.subscribers):
+            try:
+                sub.queue.put_nowait(message)
+                sent += 1
+            except asyncio.QueueFull:
+                self._drop(ch, sub)
+        self.delivered += sent
+        return sent
+
+    def _drop(self, ch: Channel, sub: Subscription) -> None:
+        ch.subscribers.discard(sub)
+        sub.dropped = True
+        self.dropped += 1
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(sse("dropped", {"channel": ch.name, "seq": ch.seq,
+                                             "reason": "slow consumer; reconnect for a new snapshot"}))
+        sub.queue.put_nowait(None)
+
+    def snapshot(self, channel: str) -> dict:
+        ch = self._channel(channel)
+        return {"channel": ch.name, "seq": ch.seq,
+                **{kind: list(events) for kind, events in ch.history.items()}}
+
+    def subscribe(self, channel: str) -> Subscription:
+        """A new subscription whose first message is the channel's snapshot."""
+        ch = self._channel(channel)
+        sub = Subscription(channel, self.queue_size)
+        sub.queue.put_nowait(sse("snapshot", self.snapshot(channel), ch.seq))
+        ch.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        ch = self.channels.get(sub.channel)
+        if ch is not None:
+            ch.subscribers.discard(sub)
+            if not ch.subscribers and not ch.seq:
+                del self.channels[sub.channel]  # nothing was ever published there
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published, "delivered": self.delivered, "dropped": self.dropped,
+            "channels": [{"channel": ch.name, "seq": ch.seq, "subscribers": len(ch.subscribers),
+                          "history": {kind: len(events) for kind, events in ch.history.items()}}
+                         for ch in self.channels.values()],
+        }
+
+
+# --- cross-process transport ----------------------------------------------------
+
+class StreamListener(asyncio.DatagramProtocol):
+    """Receives UDPPublisher datagrams and publishes them to a Hub."""
+
+    def __init__(self, hub: Hub):
+        self.hub = hub
+        self.invalid = 0
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            message = json.loads(data)
+            channel, event = str(message["channel"]), dict(message["event"])
+        except (ValueError, KeyError, TypeError):
+            self.invalid += 1
+            return
+        self.hub.publish(channel, event)
+
+
+async def start_listener(hub: Hub, addr: str = DEFAULT_ADDR):
+    """Bind the UDP listener; returns its transport, or None if the address is taken."""
+    loop = asyncio.get_running_loop()
+    try:
+        transport, _ = await loop.create_datagram_endpoint(lambda: StreamListener(hub),
+                                                           local_addr=parse_addr(addr))
+    except OSError as exc:
+        log.warning("live stream listener not started on %s: %s", addr, exc)
+        return None
+    return transport
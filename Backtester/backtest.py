@@ -1,8 +1,9 @@
 # Backtester/backtest.py
 
+from __future__ import annotations
+
 import os
 import argparse
-import pandas as pd
 import json
 from pathlib import Path
 import sys
@@ -11,55 +12,78 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-import backtrader as bt
+# Backtrader, pandas, the engines and the price store (SQLAlchemy) are
+# imported inside the functions that use them, so `--help`, the CLI and
+# modules that only need compute_metrics don't pay for them.
+from Backtester.metrics import compute_metrics
+from Backtester.result_cache import ResultCache, code_version, slice_hash
+
+
+_store = None
 
-from sqlalchemy import MetaData, Table, select
-from Backtester.db import engine
-from Backtester.strategies.mean_reversion import MeanReversionStrategy
-from Backtester.strategies.mean_reversion_rsi import EnhancedMeanReversionStrategy
 
+def price_store():
+    """The configured price store (PRICE_STORE), created on first use."""
+    global _store
+    if _store is None:
+        from Backtester.db import get_engine
+        from DataPipeline.store import get_store
+        _store = get_store(engine=get_engine())
+    return _store
 
-def fetch_data_from_db(symbol: str) -> pd.DataFrame:
+
+def fetch_data_from_db(symbol: str, start: str = None, end: str = None) -> pd.DataFrame:
     """
-    Query the SQLite table for `symbol` and return a DataFrame with
+    Load `symbol` from the price store and return a DataFrame with
     index=Date and columns: [Open, High, Low, Close, Adj Close, Volume].
-    Uses SQLAlchemy reflection (MetaData + Table) under SQLAlchemy 1.4+.
+    With start/end only that date range is read (an indexed WHERE on
+    SQLite, a binary search on the columnar store).
     """
-    symbol = symbol.upper()
+    return price_store().read(symbol.upper(), start, end)
 
-    # Reflect the table structure for this symbol
-    metadata = MetaData()  # no bind=engine
-    table = Table(symbol, metadata, autoload_with=engine)
 
-    # Build a SELECT * FROM <symbol> statement
-    stmt = select(table)
+def write_pnl_json(output_json: str, dates, value_history):
+    """Write [{ "date": "YYYY-MM-DD", "value": float }, ...] to `output_json`."""
+    import pandas as pd
 
-    # Let pandas load the result into a DataFrame, with Date as the index
-    df = pd.read_sql(stmt, con=engine, index_col="Date", parse_dates=["Date"])
-    return df
+    dates = pd.DatetimeIndex(dates).strftime("%Y-%m-%d").tolist()
 
+    # Zip them into a list of dicts (one per bar of value_history)
+    pnl_data = []
+    for dt, port_val in zip(dates, value_history):
+        pnl_data.append({"date": dt, "value": port_val})
 
-def run_backtest(symbol: str, start: str, end: str, initial_cash: float,
-                 output_json: str, strategy: str,
-                 period: int, devfactor: float, stake: int):
+    os.makedirs(os.path.dirname(output_json) or ".", exist_ok=True)
+    with open(output_json, "w") as f:
+        json.dump(pnl_data, f, indent=2)
+
+
+def run_strategy(df: pd.DataFrame, initial_cash: float, strategy: str,
+                 period: int, devfactor: float, stake: int, exactbars: int = 0,
+                 indicators=None, **rsi_params):
     """
-    1) Pull price data from SQLite via fetch_data_from_db()
-    2) Run Backtrader simulation using the requested strategy
-    3) Write out a daily P&L series to a JSON file (output_json)
-    4) Print simple performance metrics
+    Run the Backtrader simulation on `df` and return the strategy instance
+    (its value_history and fills).
+    `df` may also be a dict of feed arrays (Backtester.feeds.frame_arrays or
+    block_arrays), prepared once and shared by many runs.
+    `exactbars` is passed to Cerebro: 1 keeps only the bars the indicators
+    need instead of full-length line buffers (less memory, a little slower).
+    `indicators` (indicator_cache.SeriesIndicators of the close) replaces the
+    strategy's own SMA/std-dev/RSI with precomputed arrays.
+    `rsi_params` (rsi_period, rsi_lower, rsi_upper) only apply to "enhanced".
     """
-    cerebro = bt.Cerebro()
-    cerebro.broker.setcash(initial_cash)
+    import backtrader as bt
+    from Backtester.feeds import ArrayFeed, frame_arrays
+    from Backtester.strategies.mean_reversion import MeanReversionStrategy
+    from Backtester.strategies.mean_reversion_rsi import EnhancedMeanReversionStrategy
 
-    # Fetch data from the database
-    df = fetch_data_from_db(symbol)
-
-    # Filter by date range
-    df = df.loc[(df.index >= pd.to_datetime(start)) & (df.index <= pd.to_datetime(end))]
+    # No observers: nothing is plotted, and they only cost time and memory
+    cerebro = bt.Cerebro(stdstats=False, exactbars=exactbars)
+    cerebro.broker.setcash(initial_cash)
 
-    # Convert the Pandas DataFrame into a Backtrader data feed
-    data_feed = bt.feeds.PandasData(dataname=df)
-    cerebro.adddata(data_feed)
+    # Feed the bars straight from NumPy arrays rather than through PandasData
+    arrays = df if isinstance(df, dict) else frame_arrays(df)
+    cerebro.adddata(ArrayFeed(arrays=arrays))
     # Map command-line strategy name to class
     strategy_map = {
         "mean_reversion": MeanReversionStrategy,
@@ -72,47 +96,84 @@ def run_backtest(symbol: str, start: str, end: str, initial_cash: float,
         period=period,
         devfactor=devfactor,
         stake=stake,
+        indicators=indicators,
+        **(rsi_params if strat_cls is EnhancedMeanReversionStrategy else {}),
     )
 
-    print(f"Starting Portfolio Value: {cerebro.broker.getvalue():,.2f}")
     results = cerebro.run()
-    print(f"Final Portfolio Value:   {cerebro.broker.getvalue():,.2f}")
+    return results[0]  # our lone instance of the strategy
 
-    # ---------------------------------------------------------------
-    # ### UPDATED SECTION ###
-    # Instead of using strat.broker._valuehist, use strat.value_history:
-    strat = results[0]  # our lone instance of MeanReversionStrategy
-    value_history = strat.value_history  # list of floats (one entry per bar)
-    dates = df.index.tolist()            # list of pandas.Timestamp
 
-    # Zip them into a list of dicts: [{ "date": "YYYY-MM-DD", "value": float }, ...]
-    pnl_data = []
-    for dt, port_val in zip(dates, value_history):
-        pnl_data.append({"date": dt.strftime("%Y-%m-%d"), "value": port_val})
+def run_cerebro(df: pd.DataFrame, initial_cash: float, strategy: str,
+                period: int, devfactor: float, stake: int, exactbars: int = 0,
+                indicators=None, **rsi_params) -> list:
+    """run_strategy(...).value_history: a list of floats, one entry per bar."""
+    return run_strategy(df, initial_cash, strategy, period, devfactor, stake,
+                        exactbars, indicators, **rsi_params).value_history
 
-    # Write the P&L series to the specified JSON file
-    os.makedirs(os.path.dirname(output_json), exist_ok=True)
-    with open(output_json, "w") as f:
-        json.dump(pnl_data, f, indent=2)
 
+def run_engine(df: pd.DataFrame, initial_cash: float, strategy: str,
+               period: int, devfactor: float, stake: int,
+               engine: str = "backtrader", **rsi_params) -> list:
+    """Simulate `strategy` on `df` with the chosen engine and return its value_history."""
+    if engine == "vectorized":
+        from Backtester.vectorized import STRATEGIES, run_vectorized
+        if strategy not in STRATEGIES:
+            strategy = "mean_reversion"
+        result = run_vectorized(df, initial_cash, strategy, period, devfactor, stake, **rsi_params)
+        return result.value_history.tolist()
+    if engine == "backtrader":
+        return run_cerebro(df, initial_cash, strategy, period, devfactor, stake, **rsi_params)
+    raise ValueError(f"Unknown engine '{engine}'")
+
+
+def run_backtest(symbol: str, start: str, end: str, initial_cash: float,
+                 output_json: str, strategy: str,
+                 period: int, devfactor: float, stake: int,
+                 engine: str = "backtrader", cache: ResultCache = None):
+    """
+    1) Pull price data from SQLite via fetch_data_from_db()
+    2) Run the simulation using the requested strategy and engine
+       ("backtrader" or the array-based "vectorized" engine), unless the
+       result cache already holds it for this exact price slice, code
+       and parameters
+    3) Write out a daily P&L series to a JSON file (output_json)
+    4) Print simple performance metrics
+    """
+    # Fetch data from the database
+    df = fetch_data_from_db(symbol, start, end)
+
+    print(f"Starting Portfolio Value: {initial_cash:,.2f}")
+    cache = cache if cache is not None else ResultCache()
+    key = cache.key(slice_hash(df), strategy=strategy, engine=engine,
+                    code=code_version(strategy, engine), cash=initial_cash,
+                    period=period, devfactor=devfactor, stake=stake)
+    cached = cache.get(key)
+    if cached is not None:
+        value_history = cached["values"]
+        print("Loaded result from cache (pass --no-cache to re-run)")
+    else:
+        value_history = run_engine(df, initial_cash, strategy, period, devfactor, stake, engine)
+        value_history = [float(v) for v in value_history]
+        cache.put(key, {"values": value_history, "metrics": compute_metrics(value_history)})
+    final_value = value_history[-1] if value_history else initial_cash
+    print(f"Final Portfolio Value:   {final_value:,.2f}")
+
+    # value_history starts once the indicators have warmed up
+    write_pnl_json(output_json, df.index[len(df) - len(value_history):], value_history)
     print(f"P&L series written to {output_json}")
 
     # ---- Performance metrics ----
-    returns = pd.Series(value_history).pct_change().dropna()
-    if not returns.empty:
-        sharpe = (returns.mean() / returns.std()) * (252 ** 0.5)
-        running_max = pd.Series(value_history).cummax()
-        drawdown = (pd.Series(value_history) - running_max) / running_max
-        max_drawdown = drawdown.min()
-        print(f"Sharpe Ratio: {sharpe:.2f}")
-        print(f"Max Drawdown: {max_drawdown:.2%}")
+    metrics = cached["metrics"] if cached is not None else compute_metrics(value_history)
+    if metrics:
+        print(f"Sharpe Ratio: {metrics['sharpe']:.2f}")
+        print(f"Max Drawdown: {metrics['max_drawdown']:.2%}")
 
-    # ### END OF UPDATED SECTION ###
-    # ---------------------------------------------------------------
+    return value_history, metrics
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Run a backtest for a given symbol.")
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run a backtest for a given symbol.")
     parser.add_argument(
         "--symbol", type=str, required=True, help="Ticker symbol (must match a table in market_data.db)."
     )
@@ -153,7 +214,19 @@ if __name__ == "__main__":
         default=100,
         help="position size (shares/contracts)",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="backtrader",
+        choices=["backtrader", "vectorized"],
+        help="simulation engine (vectorized = NumPy array engine)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="re-run the simulation even if a cached result exists",
+    )
+    args = parser.parse_args(argv)
 
     run_backtest(
         symbol=args.symbol.upper(),
@@ -165,4 +238,10 @@ if __name__ == "__main__":
         period=args.period,
         devfactor=args.devfactor,
         stake=args.stake,
+        engine=args.engine,
+        cache=ResultCache(enabled=not args.no_cache),
     )
+
+
+if __name__ == "__main__":
+    main()
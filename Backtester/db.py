@@ -3,8 +3,6 @@
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
 # Load the .env from DataPipeline/ which defines DB_PATH (e.g. "market_data.db")
@@ -25,7 +23,41 @@ def resolve_db_path() -> Path:
 
 
 DB_PATH = resolve_db_path()
-engine = create_engine(
-    f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+_engine = None
+_session_factory = None
+
+
+def get_engine():
+    """The SQLite engine, created on first use so importing this module stays cheap."""
+    global _engine
+    if _engine is None:
+        from sqlalchemy import create_engine, event
+
+        _engine = create_engine(
+            f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False}
+        )
+        event.listen(_engine, "connect", _set_sqlite_pragmas)
+    return _engine
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Wait out an ingestion writer instead of failing with "database is locked"."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB memory-mapped reads
+    cursor.close()
+
+
+def __getattr__(name):
+    # `engine` and `SessionLocal` are built lazily on first access
+    global _session_factory
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        if _session_factory is None:
+            from sqlalchemy.orm import sessionmaker
+
+            _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+        return _session_factory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
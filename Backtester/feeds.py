@@ -0,0 +1,115 @@
+# Backtester/feeds.py
+
+"""
+Backtrader data feed over preloaded NumPy arrays.
+
+bt.feeds.PandasData copies a DataFrame into Backtrader's line buffers one
+`df.iloc[row, col]` lookup at a time, which dominates the cost of a short
+backtest.  ArrayFeed instead reads each bar straight out of contiguous
+float64 arrays: a DataFrame's columns, a ColumnarStore memmap, or the
+sweep's shared-memory price block.  The arrays are prepared once (see
+frame_arrays / block_arrays) and can back any number of Cerebro runs
+without being copied.
+
+Dates become Backtrader's float date numbers (days since 0001-01-01, as
+bt.date2num) in one vectorized step, so results match PandasData exactly.
+
+ArrayLine does the same for indicators: it replays a precomputed array
+(Backtester/indicator_cache.py) as an indicator line.
+"""
+
+import array
+import datetime as dt
+from typing import Dict
+
+import backtrader as bt
+import numpy as np
+from backtrader.utils import date2num
+
+EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+NS_PER_DAY = 86_400 * 10 ** 9
+
+# Feed line -> source column
+LINES = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+def date_numbers(dates) -> np.ndarray:
+    """bt.date2num for an array of datetime64 values."""
+    ns = np.asarray(dates).astype("datetime64[ns]").view(np.int64)
+    days, rem = np.divmod(ns, NS_PER_DAY)
+    if not rem.any():
+        # Daily bars: midnight date numbers are whole ordinals, exact in float64
+        return (days + EPOCH_ORDINAL).astype(np.float64)
+    # Intraday: date2num sums the time-of-day fractions with math.fsum; do the same per bar
+    stamps = ns.view("datetime64[ns]").astype("datetime64[us]").astype(object)
+    return np.array([date2num(d) for d in stamps])
+
+
+def frame_arrays(df) -> Dict[str, np.ndarray]:
+    """Feed arrays for an OHLCV DataFrame indexed by Date."""
+    arrays = {"datetime": date_numbers(df.index.values)}
+    for line, col in LINES.items():
+        if col in df.columns:
+            arrays[line] = np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+    return arrays
+
+
+def block_arrays(block: np.ndarray, columns) -> Dict[str, np.ndarray]:
+    """
+    Feed arrays viewing a (len(columns), n_bars) float64 block whose Date row
+    holds whole days since the epoch (Backtester/sweep.py's shared memory).
+    Only the date row is converted; every price row is used in place.
+    """
+    arrays = {"datetime": block[columns.index("Date")] + EPOCH_ORDINAL}
+    for line, col in LINES.items():
+        if col in columns:
+            arrays[line] = block[columns.index(col)]
+    return arrays
+
+
+class ArrayFeed(bt.feed.DataBase):
+    """
+    Data feed over a dict of equal-length arrays keyed by line name
+    ("datetime" plus any of open/high/low/close/volume/openinterest), as
+    returned by frame_arrays().  Lines without an array stay NaN, as they
+    do with PandasData.
+    """
+
+    params = (("arrays", None),)
+
+    def start(self):
+        super().start()
+        self._idx = -1
+        arrays = self.p.arrays
+        self._n = len(arrays["datetime"])
+        self._columns = [(getattr(self.lines, line), values) for line, values in arrays.items()]
+
+    def _load(self):
+        self._idx += 1
+        if self._idx >= self._n:
+            return False
+        i = self._idx
+        for line, values in self._columns:
+            line[0] = values[i]
+        return True
+
+
+class ArrayLine(bt.Indicator):
+    """
+    Indicator whose values come from a precomputed array aligned with the
+    data feed (values[i] belongs to bar i).  `minperiod` is the minimum
+    period of the indicator it stands in for, so strategy.next() starts on
+    the same bar: `period` for SMA/std-dev, `period + 1` for RSI.
+    """
+
+    lines = ("value",)
+    params = (("values", None), ("minperiod", 1))
+
+    def __init__(self):
+        self.addminperiod(self.p.minperiod)
+
+    def next(self):
+        self.lines.value[0] = self.p.values[len(self) - 1]
+
+    def once(self, start, end):
+        self.lines.value.array[start:end] = array.array("d", self.p.values[start:end].tolist())
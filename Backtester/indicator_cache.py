@@ -0,0 +1,131 @@
+# Backtester/indicator_cache.py
+
+"""
+Precomputed indicator arrays shared by the strategies, the vectorized
+engine and the sweep.
+
+The strategies only need two indicators: SMA + std-dev over `period`, and
+Wilder RSI over `rsi_period`.  Neither depends on `devfactor`, `stake` or
+the RSI thresholds, but every run used to recompute both from scratch.
+Two layers stop that:
+
+* SeriesIndicators wraps one close series and keeps each indicator it has
+  produced in memory, so every grid point with the same period reuses it.
+* IndicatorCache stores them on disk under a key hashing together
+  (symbol, fingerprint of the closes, indicator, params, indicator code).
+  Each entry is one .npy file, opened with np.load(mmap_mode="r"), so all
+  sweep workers share the same page-cache copy instead of each holding its
+  own.  It is a ResultCache with a different file format, so it has the
+  same atomic writes, the same fan-out and the same size bound: once it
+  passes INDICATOR_CACHE_MB (default 512), the least recently used
+  entries are evicted.
+
+run_sweep fills the cache in the parent for every distinct (symbol,
+period) and (symbol, rsi_period) before starting the pool.  Indicator
+work therefore scales with the number of distinct periods, not with the
+size of the grid.  compute_signals/simulate take a SeriesIndicators
+through `indicators=`, and the Backtrader strategies through their
+`indicators` param (see feeds.ArrayLine).
+"""
+
+from __future__ import annotations
+
+import os
+import hashlib
+import functools
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from Backtester.result_cache import ResultCache
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_CACHE_DIR = Path(os.getenv("INDICATOR_CACHE", ROOT / "Backtester" / ".indicator_cache"))
+DEFAULT_MAX_BYTES = int(float(os.getenv("INDICATOR_CACHE_MB", 512)) * 2 ** 20)
+
+
+def fingerprint(close) -> str:
+    """Content hash of a close series (the only input of every indicator here)."""
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    return hashlib.blake2b(close.tobytes(), digest_size=16).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def indicator_version() -> str:
+    """Hash of the module computing the indicators, so editing it invalidates entries."""
+    return hashlib.blake2b((ROOT / "Backtester" / "vectorized.py").read_bytes(), digest_size=8).hexdigest()
+
+
+class IndicatorCache(ResultCache):
+    """One .npy file per (symbol, fingerprint, indicator, params), read back memory-mapped."""
+
+    SUFFIX = ".npy"
+
+    def __init__(self, root=None, enabled: bool = True,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        super().__init__(root if root is not None else DEFAULT_CACHE_DIR, enabled, max_bytes)
+
+    def _load(self, path: Path) -> np.ndarray:
+        return np.load(path, mmap_mode="r")
+
+    def _dump(self, path: Path, value: np.ndarray) -> None:
+        with open(path, "wb") as f:  # a file object: np.save would append .npy to the temp name
+            np.save(f, np.ascontiguousarray(value, dtype=np.float64))
+
+    def series(self, symbol: str, close) -> "SeriesIndicators":
+        return SeriesIndicators(close, symbol, self)
+
+
+class SeriesIndicators:
+    """
+    The indicators of one close series, each computed at most once: from
+    the in-memory memo, else from `cache` (if any), else from scratch.
+    """
+
+    def __init__(self, close, symbol: str = "", cache: Optional[IndicatorCache] = None):
+        self.close = np.asarray(close, dtype=np.float64)
+        self.symbol = symbol
+        self.cache = cache if cache is not None and cache.enabled else None
+        self.fingerprint = fingerprint(self.close) if self.cache is not None else None
+        self.computed = 0  # indicators calculated here rather than loaded
+        self._memo = {}
+
+    def _get(self, indicator: str, compute, **params) -> np.ndarray:
+        memo_key = (indicator,) + tuple(sorted(params.items()))
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        value, key = None, None
+        if self.cache is not None:
+            key = self.cache.key(f"{self.symbol}|{self.fingerprint}", indicator=indicator,
+                                 code=indicator_version(), **params)
+            value = self.cache.get(key)
+        if value is None:
+            value = compute()
+            self.computed += 1
+            if key is not None:
+                self.cache.put(key, value)
+        self._memo[memo_key] = value
+        return value
+
+    def mean_std(self, period: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Rolling SMA and population std-dev (vectorized.rolling_mean_std)."""
+        from Backtester.vectorized import rolling_mean_std
+
+        both = self._get("mean_std", lambda: np.stack(rolling_mean_std(self.close, period)),
+                         period=int(period))
+        return both[0], both[1]
+
+    def rsi(self, period: int) -> np.ndarray:
+        """Wilder RSI (vectorized.wilder_rsi)."""
+        from Backtester.vectorized import wilder_rsi
+
+        return self._get("rsi", lambda: wilder_rsi(self.close, period), period=int(period))
+
+    def warm(self, grid) -> None:
+        """Make sure every indicator the grid points need is cached."""
+        for period in sorted({p["period"] for p in grid}):
+            self.mean_std(period)
+        for period in sorted({p["rsi_period"] for p in grid if "rsi_period" in p}):
+            self.rsi(period)
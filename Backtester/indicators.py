@@ -0,0 +1,199 @@
+# Backtester/indicators.py
+
+"""
+Streaming (O(1) per update) versions of the strategy indicators.
+
+The live trader sees one price at a time, so recomputing np.mean/np.std over
+a window on every tick wastes work and keeps an ever-growing price list.
+These classes keep a fixed-size ring buffer and update their state
+incrementally:
+
+* RollingStats -- SMA and population variance over `period` values using a
+                  windowed Welford update.
+* WilderRSI    -- RSI smoothed with Wilder's SMMA, seeded with the simple
+                  mean of the first `period` moves.
+* RollingZScore -- (price - SMA) / std, the mean-reversion signal.
+
+Definitions match bt.indicators.SimpleMovingAverage / StandardDeviation /
+RSI and the array versions in Backtester/vectorized.py, so live decisions
+use the same math as the backtests.
+"""
+
+import math
+from typing import Iterable, Optional
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO of floats; push() returns the value it evicts."""
+
+    __slots__ = ("capacity", "_data", "_head", "_count")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._data = [0.0] * capacity
+        self._head = 0   # slot of the oldest value once full
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        return self._count == self.capacity
+
+    def push(self, value: float) -> Optional[float]:
+        if self._count < self.capacity:
+            self._data[(self._head + self._count) % self.capacity] = value
+            self._count += 1
+            return None
+        evicted = self._data[self._head]
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        return evicted
+
+    def values(self) -> list:
+        """Contents from oldest to newest."""
+        start = self._head
+        return [self._data[(start + i) % self.capacity] for i in range(self._count)]
+
+
+class RollingStats:
+    """
+    Mean and population variance of the last `period` values.
+
+    Welford's update with a removal step keeps each update O(1).  Rounding
+    error from the add/remove pairs is bounded by recomputing the sums from
+    the buffer every `resync` full windows.
+    """
+
+    __slots__ = ("period", "_buf", "_mean", "_m2", "_since_sync", "_resync")
+
+    def __init__(self, period: int, resync: int = 1000):
+        self.period = period
+        self._buf = RingBuffer(period)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._since_sync = 0
+        self._resync = resync * period
+
+    @property
+    def ready(self) -> bool:
+        return self._buf.full
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        n = len(self._buf)
+        return max(self._m2, 0.0) / n if n else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def update(self, x: float) -> None:
+        old = self._buf.push(x)
+        n = len(self._buf)
+        if old is None:
+            # Growing phase: plain Welford
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+        else:
+            # Window full: replace `old` by `x`
+            old_mean = self._mean
+            self._mean += (x - old) / n
+            self._m2 += (x - old) * (x - self._mean + old - old_mean)
+            self._since_sync += 1
+            if self._since_sync >= self._resync:
+                self._sync()
+
+    def _sync(self) -> None:
+        values = self._buf.values()
+        self._mean = math.fsum(values) / len(values)
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in values)
+        self._since_sync = 0
+
+
+class RollingZScore:
+    """z = (price - SMA) / std over the last `period` prices (price included)."""
+
+    __slots__ = ("stats",)
+
+    def __init__(self, period: int):
+        self.stats = RollingStats(period)
+
+    @property
+    def ready(self) -> bool:
+        return self.stats.ready
+
+    def seed(self, prices: Iterable[float]) -> None:
+        for price in prices:
+            self.stats.update(float(price))
+
+    def update(self, price: float) -> float:
+        """Add `price` and return its z-score (0.0 while std is zero)."""
+        self.stats.update(price)
+        std = self.stats.std
+        if std == 0:
+            return 0.0
+        return (price - self.stats.mean) / std
+
+
+class WilderRSI:
+    """
+    RSI over `period` moves.  Returns NaN until period + 1 prices have been
+    seen, matching bt.indicators.RSI's warm-up.
+    """
+
+    __slots__ = ("period", "_prev", "_count", "_up", "_down")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._prev = None
+        self._count = 0      # number of moves seen
+        self._up = 0.0       # running sum during warm-up, then SMMA
+        self._down = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.period
+
+    def seed(self, prices: Iterable[float]) -> None:
+        for price in prices:
+            self.update(float(price))
+
+    def update(self, price: float) -> float:
+        if self._prev is None:
+            self._prev = price
+            return math.nan
+        move = price - self._prev
+        self._prev = price
+        up = move if move > 0 else 0.0
+        down = -move if move < 0 else 0.0
+        self._count += 1
+
+        if self._count < self.period:
+            self._up += up
+            self._down += down
+            return math.nan
+        if self._count == self.period:
+            self._up = (self._up + up) / self.period
+            self._down = (self._down + down) / self.period
+        else:
+            alpha = 1.0 / self.period
+            self._up = self._up * (1.0 - alpha) + up * alpha
+            self._down = self._down * (1.0 - alpha) + down * alpha
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if not self.ready:
+            return math.nan
+        if self._down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self._up / self._down)
@@ -0,0 +1,18 @@
+# Backtester/metrics.py
+
+"""Performance metrics of a portfolio value series (pandas only, no Backtrader)."""
+
+
+def compute_metrics(value_history) -> dict:
+    """Sharpe ratio (annualised, daily bars) and max drawdown of a value series."""
+    import pandas as pd  # deferred: importers such as the CLI shouldn't pay for pandas
+
+    values = pd.Series(value_history, dtype="float64")
+    returns = values.pct_change().dropna()
+    if returns.empty:
+        return {}
+    std = returns.std()
+    sharpe = (returns.mean() / std) * (252 ** 0.5) if std > 0 else float("nan")
+    running_max = values.cummax()
+    drawdown = (values - running_max) / running_max
+    return {"sharpe": float(sharpe), "max_drawdown": float(drawdown.min())}
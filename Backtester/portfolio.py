@@ -0,0 +1,307 @@
+# Backtester/portfolio.py
+
+"""
+Multi-asset portfolio backtest in one pass.
+
+All symbols are aligned on the union of their dates into 2-D
+(dates x symbols) open/close arrays; a symbol with no bar on a date (an
+equity on a weekend, a coin before it listed) is NaN there.  Signals for
+every symbol are evaluated in one vectorized call to compute_signals():
+each column's bars are first packed to the top so the rolling windows run
+over that symbol's own bars, exactly as a single-symbol backtest would.
+
+The simulation then walks the dates once with one shared cash balance.
+Orders follow the single-symbol engine's rules (next-bar open fills,
+orders rejected when shared cash would go negative) and each date costs a
+handful of array operations, so hundreds of symbols run in seconds.
+Because opening a short adds cash, the cash rule alone never limits
+shorts: an entry is also rejected when it would take gross exposure
+(long plus short market value) above `leverage` x equity.
+
+The portfolio value is written in the { date, value } shape the API
+serves; the default output is API/pnl_portfolio_<strategy>.json, i.e.
+/pnl?symbol=portfolio&strategy=<strategy>.
+
+Example:
+    python tradingfund.py portfolio --symbols AAPL MSFT GOOGL CRYPTO_BTCUSD \\
+        --start 2020-01-01 --end 2025-06-09 --sizing equal
+    python tradingfund.py portfolio --synthetic 500      # scaling check
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backtester.backtest import compute_metrics, price_store, write_pnl_json
+
+# pandas comes in with Backtester.vectorized, which is imported inside the
+# functions so `tradingfund portfolio --help` starts fast.
+
+STRATEGIES = ("mean_reversion", "enhanced")  # as Backtester.vectorized.STRATEGIES
+SIZINGS = ("shares", "equal")
+
+
+@dataclass
+class Panel:
+    symbols: List[str]
+    dates: np.ndarray    # datetime64[ns], ascending union of all symbols' dates
+    open: np.ndarray     # (dates, symbols) float64, NaN where a symbol has no bar
+    close: np.ndarray    # (dates, symbols) float64, NaN where a symbol has no bar
+
+
+@dataclass
+class PortfolioResult:
+    dates: np.ndarray
+    value: np.ndarray       # portfolio value per date
+    cash: np.ndarray        # cash per date
+    position: np.ndarray    # (dates, symbols) holdings
+    symbol_pnl: np.ndarray  # P&L per symbol (realized + marked to the last close)
+    trades: np.ndarray      # filled orders per symbol
+    rejected: int           # orders rejected for lack of cash or over the exposure limit
+
+
+def panel_from_arrays(arrays: Dict[str, Dict[str, np.ndarray]]) -> Panel:
+    """Align {symbol: {"Date", "Open", "Close"}} arrays on the union of their dates."""
+    symbols = list(arrays)
+    dates = np.unique(np.concatenate([np.asarray(a["Date"], dtype=np.int64) for a in arrays.values()]))
+    open_ = np.full((len(dates), len(symbols)), np.nan)
+    close = np.full_like(open_, np.nan)
+    for j, symbol in enumerate(symbols):
+        rows = np.searchsorted(dates, np.asarray(arrays[symbol]["Date"], dtype=np.int64))
+        open_[rows, j] = arrays[symbol]["Open"]
+        close[rows, j] = arrays[symbol]["Close"]
+    return Panel(symbols, dates.view("datetime64[ns]"), open_, close)
+
+
+def load_panel(symbols, start: Optional[str] = None, end: Optional[str] = None) -> Panel:
+    """Read every symbol from the price store and align them."""
+    store = price_store()
+    arrays = {}
+    for symbol in symbols:
+        a = store.read_arrays(symbol.upper(), start, end, columns=["Open", "Close"])
+        arrays[symbol.upper()] = {
+            "Date": np.asarray(a["Date"]).view(np.int64),
+            "Open": np.asarray(a["Open"], dtype=np.float64),
+            "Close": np.asarray(a["Close"], dtype=np.float64),
+        }
+    return panel_from_arrays(arrays)
+
+
+def synthetic_panel(n_symbols: int, n_days: int = 2520, seed: int = 0) -> Panel:
+    """Random-walk prices on business days, for scaling checks."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=n_days).values.astype("datetime64[ns]")
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.015, (n_days, n_symbols)), axis=0))
+    open_ = close * np.exp(rng.normal(0, 0.003, close.shape))
+    return Panel([f"SYN{i}" for i in range(n_symbols)], dates, open_, close)
+
+
+def panel_signals(panel: Panel, strategy: str, period: int, devfactor: float, stake: int,
+                  **rsi_params):
+    """
+    Signals for every symbol on the date grid: (z, long_entry, short_entry,
+    size, ready).  `ready` marks bars where the strategy's next() would run.
+    """
+    from Backtester.vectorized import RSI_DEFAULTS, compute_signals
+
+    valid = np.isfinite(panel.open) & np.isfinite(panel.close)
+    n = len(panel.dates)
+
+    # Pack each column's bars to the top (stable, so time order is kept)
+    order = np.argsort(~valid, axis=0, kind="stable")
+    packed = np.take_along_axis(panel.close, order, axis=0)
+    padding = np.arange(n)[:, None] >= valid.sum(axis=0)
+    packed[padding] = np.nan
+
+    params = dict(RSI_DEFAULTS)
+    params.update(rsi_params)
+    start, z, long_entry, short_entry, size = compute_signals(
+        packed, strategy, period, devfactor, stake, **params
+    )
+    ready = (np.arange(n) >= start)[:, None] & ~padding
+
+    # Scatter back from packed rows to dates
+    out = []
+    for packed_values, fill in ((z, np.nan), (long_entry & ready, False),
+                                (short_entry & ready, False), (size, 0), (ready, False)):
+        grid = np.full(packed_values.shape, fill, dtype=packed_values.dtype)
+        np.put_along_axis(grid, order, packed_values, axis=0)
+        out.append(grid)
+    return tuple(out)
+
+
+def simulate_portfolio(panel: Panel, initial_cash: float, strategy: str = "mean_reversion",
+                       period: int = 20, devfactor: float = 2.0, stake: int = 100,
+                       sizing: str = "shares", leverage: float = 1.0, **rsi_params) -> PortfolioResult:
+    """
+    Trade every symbol from one cash pool.
+
+    sizing="shares" trades `stake` shares per entry (scaled by |z| for the
+    enhanced strategy) as the single-symbol backtest does.  sizing="equal"
+    targets 1/N of the current portfolio value per entry (fractional units),
+    which suits universes with very different price levels.
+    An entry is rejected if it would take gross exposure (the market value
+    of longs plus shorts, at the last closes) above `leverage` x equity.
+    """
+    import pandas as pd
+
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'; expected one of {STRATEGIES}")
+    if sizing not in SIZINGS:
+        raise ValueError(f"Unknown sizing '{sizing}'; expected one of {SIZINGS}")
+
+    z, long_entry, short_entry, size, ready = panel_signals(
+        panel, strategy, period, devfactor, stake, **rsi_params
+    )
+    open_, close = panel.open, panel.close
+    valid = np.isfinite(open_) & np.isfinite(close)
+    # Last known close per symbol, for marking positions on dates without a bar
+    mark = pd.DataFrame(close).ffill().fillna(0.0).to_numpy()
+    weight = 1.0 / close.shape[1]
+
+    n, n_sym = close.shape
+    pos = np.zeros(n_sym)
+    pending = np.zeros(n_sym)         # order size waiting for the symbol's next bar
+    pending_price = np.zeros(n_sym)   # close when the order was created
+    cash = float(initial_cash)
+    flows = np.zeros(n_sym)           # cash paid (-) / received (+) per symbol
+    trades = np.zeros(n_sym, dtype=np.int64)
+    rejected = 0
+
+    value = np.empty(n)
+    cash_hist = np.empty(n)
+    position = np.empty((n, n_sym))
+
+    for t in range(n):
+        v = valid[t]
+
+        # 1) Fill the orders created on each symbol's previous bar at today's open
+        fills = np.flatnonzero((pending != 0) & v).tolist()
+        if fills:
+            last = mark[t - 1] if t else np.zeros(n_sym)
+            limit = leverage * (cash + pos @ last)
+            gross = np.abs(pos) @ last
+        for j in fills:
+            o = pending[j]
+            px = open_[t, j]
+            entry = pos[j] == 0
+            if cash - o * pending_price[j] < 0.0 or (entry and cash - o * px < 0.0):
+                rejected += 1
+            elif entry and gross + abs(o) * px > limit:
+                rejected += 1  # short entries add cash, so cash alone never stops them
+            else:
+                gross += abs(o) * px if entry else -abs(pos[j]) * last[j]
+                cash -= o * px
+                flows[j] -= o * px
+                pos[j] += o
+                trades[j] += 1
+        pending[v] = 0.0
+
+        equity = cash + pos @ mark[t]
+        value[t] = equity
+        cash_hist[t] = cash
+        position[t] = pos
+
+        # 2) Decide on every symbol with a bar today, all at once
+        act = ready[t]
+        if not act.any():
+            continue
+        if sizing == "equal":
+            units = weight * equity / close[t] * (size[t] / stake)
+        else:
+            units = size[t].astype(np.float64)
+        zt = z[t]
+        entry = np.where(short_entry[t], -units, np.where(long_entry[t], units, 0.0))
+        exits = ((pos > 0) & (zt >= 0)) | ((pos < 0) & (zt <= 0))
+        orders = np.where(pos == 0, entry, np.where(exits, -pos, 0.0))
+        orders = np.where(act, np.nan_to_num(orders), 0.0)
+        placed = orders != 0
+        pending[placed] = orders[placed]
+        pending_price[placed] = close[t, placed]
+
+    symbol_pnl = flows + pos * mark[-1] if n else flows
+    return PortfolioResult(panel.dates, value, cash_hist, position, symbol_pnl, trades, rejected)
+
+
+def run_portfolio(symbols, start: Optional[str], end: Optional[str], initial_cash: float,
+                  output_json: str, strategy: str = "mean_reversion", period: int = 20,
+                  devfactor: float = 2.0, stake: int = 100, sizing: str = "shares",
+                  panel: Optional[Panel] = None, leverage: float = 1.0, **rsi_params) -> PortfolioResult:
+    """Load (or take) a panel, simulate it, print a summary and write the P&L JSON."""
+    t0 = time.perf_counter()
+    if panel is None:
+        panel = load_panel(symbols, start, end)
+    t_load = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = simulate_portfolio(panel, initial_cash, strategy, period, devfactor, stake,
+                                sizing, leverage, **rsi_params)
+    t_sim = time.perf_counter() - t0
+
+    print(f"{len(panel.symbols)} symbols x {len(panel.dates)} dates: "
+          f"load {t_load:.2f}s, simulate {t_sim:.2f}s")
+    print(f"Starting Portfolio Value: {initial_cash:,.2f}")
+    print(f"Final Portfolio Value:   {result.value[-1]:,.2f}")
+    print(f"Trades: {int(result.trades.sum())} filled, {result.rejected} rejected (cash or exposure limit)")
+    metrics = compute_metrics(result.value)
+    if metrics:
+        print(f"Sharpe Ratio: {metrics['sharpe']:.2f}")
+        print(f"Max Drawdown: {metrics['max_drawdown']:.2%}")
+
+    ranked = np.argsort(result.symbol_pnl)[::-1]
+    shown = ranked if len(ranked) <= 10 else np.concatenate([ranked[:5], ranked[-5:]])
+    print(f"{'symbol':<16}{'trades':>8}{'P&L':>14}")
+    for j in shown:
+        print(f"{panel.symbols[j]:<16}{result.trades[j]:>8}{result.symbol_pnl[j]:>14,.2f}")
+
+    write_pnl_json(output_json, result.dates, result.value.tolist())
+    print(f"P&L series written to {output_json}")
+    return result
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Backtest many symbols from one cash pool.")
+    parser.add_argument("--symbols", nargs="+", default=None,
+                        help="Ticker symbols / tables (default: every symbol in the store).")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Ignore the store and simulate N synthetic random-walk symbols.")
+    parser.add_argument("--start", type=str, default=None, help="Start date (YYYY-MM-DD).")
+    parser.add_argument("--end", type=str, default=None, help="End date (YYYY-MM-DD).")
+    parser.add_argument("--cash", type=float, default=100_000, help="Initial capital (USD).")
+    parser.add_argument("--strategy", type=str, default="mean_reversion", choices=list(STRATEGIES))
+    parser.add_argument("--period", type=int, default=20, help="look-back window for z-score")
+    parser.add_argument("--devfactor", type=float, default=2.0, help="standard-dev threshold")
+    parser.add_argument("--stake", type=int, default=100, help="shares per trade (sizing=shares)")
+    parser.add_argument("--sizing", choices=SIZINGS, default="shares",
+                        help="fixed share stake, or equal 1/N value per position")
+    parser.add_argument("--leverage", type=float, default=1.0,
+                        help="max gross (long + short) exposure as a multiple of equity")
+    parser.add_argument("--output", type=str, default=None,
+                        help="P&L JSON path (default: API/pnl_portfolio_<strategy>.json)")
+    args = parser.parse_args(argv)
+
+    output = args.output or str(ROOT / "API" / f"pnl_portfolio_{args.strategy}.json")
+    panel = None
+    symbols = args.symbols
+    if args.synthetic:
+        panel = synthetic_panel(args.synthetic)
+    elif symbols is None:
+        symbols = price_store().symbols()
+    run_portfolio(symbols, args.start, args.end, args.cash, output, args.strategy,
+                  args.period, args.devfactor, args.stake, args.sizing, panel=panel,
+                  leverage=args.leverage)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# Backtester/replay.py
+
+"""
+Event-driven replay of stored intraday prices through the live trader.
+
+The daily backtests can't show what LiveMeanReversionTrader /
+PortfolioTrader actually do, because those act on every tick.  Here the
+minute bars or trade ticks in the intraday store (DataPipeline/intraday.py)
+are streamed in time order, one price at a time, into ReplayTrader.  Like
+PortfolioTrader.on_price, it updates a RollingZScore and calls
+signals.live_order, waits until the window is full, and holds one working
+order at a time.  A market order sent on one tick fills at the next
+tick's price, which stands in for the live fill latency.  Bars replay
+their close.
+
+Prices are read through IntradayStore.chunks(): memory-mapped slices of a
+fixed number of records.  Only the equity at each UTC day's last tick is
+kept, so memory does not grow with the number of ticks.  A year of
+one-minute bars (525k) replays in about a second.
+
+    python Backtester/replay.py --symbol SYN --interval 1m --start 2025-01-01 --end 2025-12-31
+    python Backtester/replay.py --symbol BTC/USDT --interval tick --output pnl_btc_ticks.json
+
+The indicator warms up on the first `period` replayed prices (the live
+traders seed it from daily closes instead).
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backtester.indicators import RollingZScore
+from Backtester.signals import DEFAULTS, live_order
+
+NS_PER_DAY = 86_400 * 10 ** 9
+
+
+class ReplayTrader:
+    """The live per-tick decision loop with simulated next-tick fills and cash."""
+
+    __slots__ = ("zscore", "devfactor", "stake", "cash", "position", "pending",
+                 "ticks", "orders", "last_price")
+
+    def __init__(self, initial_cash: float, period: int = DEFAULTS["period"],
+                 devfactor: float = DEFAULTS["devfactor"], stake: int = DEFAULTS["stake"]):
+        self.zscore = RollingZScore(period)
+        self.devfactor = devfactor
+        self.stake = stake
+        self.cash = initial_cash
+        self.position = 0
+        self.pending: Optional[Tuple[int, float]] = None  # (side, quantity) awaiting its fill
+        self.ticks = 0
+        self.orders = 0
+        self.last_price = float("nan")
+
+    def on_price(self, price: float) -> None:
+        if self.pending is not None:
+            side, quantity = self.pending
+            self.position += side * quantity
+            self.cash -= side * quantity * price
+            self.pending = None
+        self.ticks += 1
+        self.last_price = price
+        z = self.zscore.update(price)
+        if not self.zscore.ready:
+            return
+        order = live_order(self.position, z, self.devfactor, self.stake)
+        if order is not None:
+            self.pending = order
+            self.orders += 1
+
+    @property
+    def value(self) -> float:
+        return self.cash + self.position * self.last_price
+
+
+@dataclass
+class ReplayResult:
+    ticks: int
+    orders: int
+    final_value: float
+    seconds: float
+    dates: List[np.datetime64] = field(default_factory=list)   # UTC days
+    values: List[float] = field(default_factory=list)          # equity at each day's last tick
+
+
+def price_stream(store, symbol: str, interval: str, start=None, end=None,
+                 rows: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """(ts, price) array pairs per stored chunk: trade prices for ticks, closes for bars."""
+    from DataPipeline.intraday import CHUNK_ROWS, TICK
+
+    column = "price" if interval == TICK else "close"
+    for chunk in store.chunks(symbol, interval, start, end, rows=rows or CHUNK_ROWS):
+        yield chunk["ts"], chunk[column]
+
+
+def replay(chunks: Iterable[Tuple[np.ndarray, np.ndarray]], initial_cash: float,
+           period: int = DEFAULTS["period"], devfactor: float = DEFAULTS["devfactor"],
+           stake: int = DEFAULTS["stake"]) -> ReplayResult:
+    """Feed every price of `chunks` to a ReplayTrader, one tick at a time."""
+    trader = ReplayTrader(initial_cash, period, devfactor, stake)
+    on_price = trader.on_price
+    dates, values = [], []
+    day = None
+    t0 = time.perf_counter()
+    for ts, prices in chunks:
+        days = ts // NS_PER_DAY
+        # Split the chunk at UTC day boundaries and mark to market at each one
+        cuts = np.flatnonzero(days[1:] != days[:-1]) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, len(days)]):
+            if day is not None and days[lo] != day:
+                dates.append(np.datetime64(int(day), "D"))
+                values.append(trader.value)
+            day = days[lo]
+            for price in prices[lo:hi].tolist():
+                on_price(price)
+    if day is not None:
+        dates.append(np.datetime64(int(day), "D"))
+        values.append(trader.value)
+    final = trader.value if trader.ticks else initial_cash
+    return ReplayResult(trader.ticks, trader.orders, final, time.perf_counter() - t0, dates, values)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Replay intraday bars/ticks through the live rules")
+    parser.add_argument("--symbol", required=True, help="symbol in the intraday store")
+    parser.add_argument("--interval", default="1m", help='stored bar size, e.g. "1m", or "tick"')
+    parser.add_argument("--start", type=str, default=None, help="first day (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", type=str, default=None, help="last day, inclusive")
+    parser.add_argument("--cash", type=float, default=100_000, help="Initial capital (USD).")
+    parser.add_argument("--period", type=int, default=DEFAULTS["period"], help="look-back in ticks")
+    parser.add_argument("--devfactor", type=float, default=DEFAULTS["devfactor"], help="z-score threshold")
+    parser.add_argument("--stake", type=int, default=DEFAULTS["stake"], help="shares per entry")
+    parser.add_argument("--chunk-rows", type=int, default=None, help="records per memory-mapped chunk")
+    parser.add_argument("--output", type=str, default=None, help="write the daily P&L JSON here")
+    args = parser.parse_args(argv)
+
+    from DataPipeline.intraday import IntradayStore
+
+    store = IntradayStore()
+    result = replay(price_stream(store, args.symbol, args.interval, args.start, args.end, args.chunk_rows),
+                    args.cash, args.period, args.devfactor, args.stake)
+    if not result.ticks:
+        print(f"No {args.interval} data for {args.symbol} in {store.root}")
+        return
+    rate = result.ticks / max(result.seconds, 1e-9)
+    print(f"Replayed {result.ticks:,} {args.interval} prices over {len(result.dates)} days "
+          f"in {result.seconds:.2f}s ({rate:,.0f}/s), {result.orders} orders")
+    print(f"Starting Portfolio Value: {args.cash:,.2f}")
+    print(f"Final Portfolio Value:   {result.final_value:,.2f}")
+
+    from Backtester.metrics import compute_metrics
+
+    metrics = compute_metrics(result.values)
+    if metrics:
+        print(f"Sharpe Ratio (daily): {metrics['sharpe']:.2f}")
+        print(f"Max Drawdown: {metrics['max_drawdown']:.2%}")
+    if args.output:
+        from Backtester.backtest import write_pnl_json
+        write_pnl_json(args.output, np.array(result.dates), result.values)
+        print(f"P&L series written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
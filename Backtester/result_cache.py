@@ -0,0 +1,178 @@
+# Backtester/result_cache.py
+
+"""
+Content-addressed cache of backtest results.
+
+A result is stored under a key hashing together
+  * the price slice it ran on (dates and OHLCV, see slice_hash),
+  * the code that produced it (code_version: the source of the strategy
+    and engine files), and
+  * every parameter (strategy, engine, cash, period, ...),
+so a hit is only possible when re-running would give the same answer:
+new or revised bars, an edited strategy or a different parameter all miss.
+
+Entries are small JSON files fanned out over 256 subdirectories.  The cache
+is bounded: when it grows past `max_bytes` the least recently used entries
+(oldest mtime; a hit touches its file) are deleted.
+
+Used by run_backtest (--no-cache to bypass), the sweep and walk-forward.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+import functools
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_CACHE_DIR = Path(os.getenv("BACKTEST_CACHE", ROOT / "Backtester" / ".backtest_cache"))
+DEFAULT_MAX_BYTES = int(float(os.getenv("BACKTEST_CACHE_MB", 256)) * 2 ** 20)
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# Source files whose contents determine a strategy's results on each engine
+_STRATEGY_SOURCES = {
+    "mean_reversion": ["strategies/mean_reversion.py"],
+    "enhanced": ["strategies/mean_reversion_rsi.py"],
+}
+_ENGINE_SOURCES = {
+    "backtrader": ["backtest.py", "feeds.py", "signals.py", "indicator_cache.py"],
+    "vectorized": ["vectorized.py", "signals.py", "indicator_cache.py"],
+}
+
+
+def slice_hash(df: pd.DataFrame) -> str:
+    """Content hash of a price slice (dates and OHLCV)."""
+    import numpy as np
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(df.index.values.astype("datetime64[ns]").astype(np.int64).tobytes())
+    for col in PRICE_COLUMNS:
+        h.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def code_version(strategy: str, engine: str) -> str:
+    """Hash of the strategy and engine source files, so editing either invalidates results."""
+    h = hashlib.blake2b(digest_size=8)
+    for rel in _STRATEGY_SOURCES.get(strategy, []) + _ENGINE_SOURCES.get(engine, []):
+        h.update(rel.encode())
+        h.update((ROOT / "Backtester" / rel).read_bytes())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    One JSON file per key.  Writes go through a temp file and os.replace so
+    a crashed run never leaves a truncated entry.  `max_bytes=None` never
+    evicts (call evict() later, e.g. from the parent of a process pool).
+    Subclasses store other formats by overriding SUFFIX, _load and _dump
+    (see Backtester/indicator_cache.py).
+    """
+
+    SUFFIX = ".json"
+
+    def __init__(self, root=None, enabled: bool = True,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root is not None else DEFAULT_CACHE_DIR
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes: Optional[int] = None  # total entry size, scanned on first write
+
+    @staticmethod
+    def key(data_hash: str, **params) -> str:
+        blob = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.blake2b(f"{data_hash}|{blob}".encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{self.SUFFIX}"
+
+    def _load(self, path: Path):
+        with open(path) as f:
+            return json.load(f)
+
+    def _dump(self, path: Path, value) -> None:
+        with open(path, "w") as f:
+            json.dump(value, f)
+
+    def get(self, key: str):
+        """The cached value, or None on a miss (or when disabled); counts hits and misses."""
+        if not self.enabled:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            value = self._load(path)
+            os.utime(path)  # mark as recently used
+        except (FileNotFoundError, ValueError):  # ValueError: a corrupt entry
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value) -> None:
+        if not self.enabled:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        self._dump(tmp, value)
+        size = tmp.stat().st_size
+        os.replace(tmp, path)
+        if self.max_bytes is None:
+            return
+        if self._bytes is None:
+            self._bytes = sum(st.st_size for _, st in self._entries())
+        else:
+            self._bytes += size
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def get_or_compute(self, key: str, compute):
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def _entries(self):
+        if not self.root.is_dir():
+            return
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        yield entry.path, entry.stat()
+                    except FileNotFoundError:
+                        continue  # evicted by another process
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Delete least recently used entries until the cache is within 90% of max_bytes."""
+        limit = max_bytes if max_bytes is not None else self.max_bytes
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime_ns)
+        total = sum(st.st_size for _, st in entries)
+        removed = 0
+        if limit is not None and total > limit:
+            for path, st in entries:
+                if total <= 0.9 * limit:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= st.st_size
+                removed += 1
+        self._bytes = total
+        self.evictions += removed
+        return removed
@@ -0,0 +1,235 @@
+# Backtester/results.py
+
+"""
+Binary store for P&L series: one file per sweep.
+
+Pretty-printed JSON costs ~60 bytes and a strftime per bar.  A result file
+packs each series as an int32 column of day offsets (days since
+1970-01-01) followed by a float64 column of portfolio values, and ends
+with a JSON header describing every series (key, symbol, strategy,
+params, metrics, byte offset, length):
+
+    b"TFPNL001"                  magic
+    series 0: int32 days[n0], padding to 8 bytes, float64 values[n0]
+    series 1: ...
+    header JSON (utf-8)
+    uint64 header offset, b"TFPNL001"
+
+The header sits at the end so a sweep can stream series into the file
+without knowing their count up front.  Readers memory-map the file and
+parse only the header; series(key) reads just that series' bytes, with
+the values as a zero-copy view into the map.
+
+Import an existing JSON sweep (API/pnl_sweep/<SYMBOL>/pnl_*.json):
+    python Backtester/results.py import API/pnl_sweep
+    python Backtester/results.py show API/pnl_sweep/AAPL.pnl [KEY]
+"""
+
+import os
+import re
+import json
+import struct
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backtester.metrics import compute_metrics
+
+MAGIC = b"TFPNL001"
+FOOTER = struct.Struct("<Q8s")
+SUFFIX = ".pnl"
+
+# pnl_<period>_<devfactor>_<stake>.json and the enhanced variant (see sweep.pnl_filename)
+_SWEEP_NAME = re.compile(
+    r"^pnl_(?:(?P<enhanced>enhanced)_)?(?P<period>\d+)_(?P<devfactor>[\d.]+)_(?P<stake>\d+)"
+    r"(?:_(?P<rsi_period>\d+)_(?P<rsi_lower>[\d.]+)_(?P<rsi_upper>[\d.]+))?$"
+)
+
+
+def to_day_offsets(dates) -> np.ndarray:
+    """Dates (anything DatetimeIndex accepts) -> int32 days since 1970-01-01."""
+    return pd.DatetimeIndex(dates).values.astype("datetime64[D]").astype(np.int32)
+
+
+class ResultWriter:
+    """
+    Stream series into a result file.  The file is written under a temp
+    name and renamed on close(), so readers never see a partial file.
+    """
+
+    def __init__(self, path, **meta):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        self._f = open(self._tmp, "wb")
+        self._f.write(MAGIC)
+        self._series: List[dict] = []
+        self._keys = set()
+        self.meta = meta
+
+    def add(self, key: str, dates, values, params: Optional[dict] = None,
+            metrics: Optional[dict] = None, **info) -> None:
+        """Append one series; `dates` and `values` are aligned, dates ascending."""
+        if key in self._keys:
+            raise ValueError(f"duplicate series key '{key}'")
+        days = to_day_offsets(dates)
+        values = np.ascontiguousarray(values, dtype="<f8")
+        if len(days) != len(values):
+            raise ValueError(f"{key}: {len(days)} dates but {len(values)} values")
+
+        offset = self._f.tell()
+        self._f.write(days.astype("<i4").tobytes())
+        pad = (-self._f.tell()) % 8
+        self._f.write(b"\0" * pad)
+        self._f.write(values.tobytes())
+
+        entry = {"key": key, "offset": offset, "length": int(len(values))}
+        entry.update(info)
+        entry["params"] = params or {}
+        entry["metrics"] = metrics if metrics is not None else compute_metrics(values)
+        if len(values):
+            entry["first_date"] = str(days[0].astype("datetime64[D]"))
+            entry["last_date"] = str(days[-1].astype("datetime64[D]"))
+            entry["final_value"] = float(values[-1])
+        self._series.append(entry)
+        self._keys.add(key)
+
+    def close(self) -> Path:
+        header = json.dumps({"version": 1, "meta": self.meta, "series": self._series},
+                            default=float).encode()
+        header_offset = self._f.tell()
+        self._f.write(header)
+        self._f.write(FOOTER.pack(header_offset, MAGIC))
+        self._f.close()
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+            self._tmp.unlink(missing_ok=True)
+
+
+class ResultFile:
+    """Read-only, memory-mapped view of a result file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._buf = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if len(self._buf) < len(MAGIC) + FOOTER.size or bytes(self._buf[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a P&L result file")
+        header_offset, magic = FOOTER.unpack(bytes(self._buf[-FOOTER.size:]))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: truncated result file")
+        header = json.loads(bytes(self._buf[header_offset:len(self._buf) - FOOTER.size]))
+        self.meta: dict = header.get("meta", {})
+        self._index: Dict[str, dict] = {s["key"]: s for s in header["series"]}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def keys(self) -> List[str]:
+        return list(self._index)
+
+    def info(self, key: str) -> dict:
+        return self._index[key]
+
+    def series(self, key: str):
+        """(dates datetime64[D], values float64); values is a zero-copy view into the file."""
+        entry = self._index[key]
+        n, offset = entry["length"], entry["offset"]
+        days = self._buf[offset:offset + 4 * n].view("<i4")
+        start = offset + 4 * n + (-(offset + 4 * n)) % 8
+        values = self._buf[start:start + 8 * n].view("<f8")
+        return days.astype("datetime64[D]"), values
+
+    def frame(self, key: str) -> pd.DataFrame:
+        dates, values = self.series(key)
+        return pd.DataFrame({"value": values}, index=pd.DatetimeIndex(dates, name="date"))
+
+    def summary(self) -> pd.DataFrame:
+        """One row per series with params and metrics (header only, no series data read)."""
+        rows = []
+        for entry in self._index.values():
+            row = {"key": entry["key"]}
+            row.update({k: v for k, v in entry.items()
+                        if k not in ("key", "offset", "params", "metrics")})
+            row.update(entry["params"])
+            row.update(entry["metrics"])
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def parse_sweep_name(stem: str) -> Optional[dict]:
+    """(strategy, params) from a sweep file stem such as 'pnl_20_2.0_100'."""
+    m = _SWEEP_NAME.match(stem)
+    if m is None:
+        return None
+    params = dict(period=int(m["period"]), devfactor=float(m["devfactor"]), stake=int(m["stake"]))
+    if m["enhanced"]:
+        params.update(rsi_period=int(m["rsi_period"]), rsi_lower=float(m["rsi_lower"]),
+                      rsi_upper=float(m["rsi_upper"]))
+        return {"strategy": "enhanced", "params": params}
+    return {"strategy": "mean_reversion", "params": params}
+
+
+def import_json_dir(src_dir, dest=None) -> Path:
+    """Pack every pnl_*.json in `src_dir` into one result file (default: <src_dir>.pnl)."""
+    src_dir = Path(src_dir)
+    dest = Path(dest) if dest else src_dir.with_suffix(SUFFIX)
+    files = sorted(src_dir.glob("pnl_*.json"))
+    with ResultWriter(dest, symbol=src_dir.name, source=str(src_dir)) as writer:
+        for path in files:
+            with open(path) as f:
+                rows = json.load(f)
+            parsed = parse_sweep_name(path.stem) or {"strategy": None, "params": {}}
+            writer.add(
+                path.stem,
+                [row["date"] for row in rows],
+                np.array([row["value"] for row in rows], dtype=np.float64),
+                params=parsed["params"], symbol=src_dir.name, strategy=parsed["strategy"],
+            )
+    json_bytes = sum(p.stat().st_size for p in files)
+    print(f"{len(files)} series: {json_bytes / 1e6:.2f} MB of JSON -> "
+          f"{dest.stat().st_size / 1e6:.2f} MB in {dest}")
+    return dest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binary P&L result files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="convert JSON sweep directories to result files")
+    imp.add_argument("path", help="a sweep root (e.g. API/pnl_sweep) or one symbol directory")
+    show = sub.add_parser("show", help="list the series in a result file, or print one")
+    show.add_argument("file")
+    show.add_argument("key", nargs="?")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        root = Path(args.path)
+        # A sweep root holds one directory per symbol; otherwise treat `path` as that directory
+        dirs = [d for d in sorted(root.iterdir()) if d.is_dir() and any(d.glob("pnl_*.json"))]
+        for d in dirs or [root]:
+            import_json_dir(d)
+    else:
+        results = ResultFile(args.file)
+        if args.key:
+            print(results.frame(args.key).to_string())
+        else:
+            print(results.summary().to_string(index=False))
@@ -0,0 +1,56 @@
+# Backtester/signals.py
+
+"""
+Entry/exit rules of the mean-reversion strategies, kept as plain functions
+so the Backtrader strategies and the live trader make decisions with the
+same code.  Sides are +1 (buy), -1 (sell) and 0 (do nothing).
+"""
+
+# Default look-back, z-score threshold and shares per trade of both
+# strategies; the live traders read them here rather than importing
+# Backtrader for MeanReversionStrategy.params.
+DEFAULTS = dict(period=20, devfactor=2.0, stake=100)
+
+
+def mean_reversion_entry(z: float, devfactor: float) -> int:
+    """Short above +devfactor, long below -devfactor."""
+    if z > devfactor:
+        return -1
+    if z < -devfactor:
+        return 1
+    return 0
+
+
+def enhanced_entry(z: float, rsi: float, devfactor: float,
+                   rsi_lower: float, rsi_upper: float) -> int:
+    """Mean-reversion entry confirmed by RSI (oversold longs, overbought shorts)."""
+    if z < -devfactor and rsi < rsi_lower:
+        return 1
+    if z > devfactor and rsi > rsi_upper:
+        return -1
+    return 0
+
+
+def enhanced_stake(stake: int, z: float) -> int:
+    """Scale the base stake by |z| (never below the base stake)."""
+    return int(stake * max(1.0, abs(z)))
+
+
+def should_exit(position: float, z: float) -> bool:
+    """Close once z crosses back through zero."""
+    return (position > 0 and z >= 0) or (position < 0 and z <= 0)
+
+
+def live_order(position: float, z: float, devfactor: float, stake: int):
+    """
+    The live traders' decision on one tick: (side, quantity) to send as a
+    market order, or None.  Flat: enter `stake` shares on a mean-reversion
+    signal.  In a position: close all of it on should_exit.  Also replayed
+    over stored ticks and minute bars by Backtester/replay.py.
+    """
+    if position == 0:
+        side = mean_reversion_entry(z, devfactor)
+        return (side, stake) if side else None
+    if should_exit(position, z):
+        return (-1 if position > 0 else 1, abs(position))
+    return None
@@ -2,20 +2,36 @@
 
 import backtrader as bt
 
+from Backtester.feeds import ArrayLine
+from Backtester.signals import DEFAULTS, mean_reversion_entry, should_exit
+
 class MeanReversionStrategy(bt.Strategy):
     params = dict(
-        period=20,      # lookback for moving average / std
-        devfactor=2.0,  # z‐score threshold
-        stake=100       # shares per trade
+        period=DEFAULTS["period"],        # lookback for moving average / std
+        devfactor=DEFAULTS["devfactor"],  # z‐score threshold
+        stake=DEFAULTS["stake"],          # shares per trade
+        indicators=None,                  # precomputed SeriesIndicators of the close (Backtester/indicator_cache.py)
     )
 
     def __init__(self):
-        # Standard indicators
-        self.sma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.p.period)
-        self.std = bt.indicators.StandardDeviation(self.data.close, period=self.p.period)
+        if self.p.indicators is not None:
+            # Cached arrays, computed once per period rather than once per run
+            sma, std = self.p.indicators.mean_std(self.p.period)
+            self.sma = ArrayLine(self.data, values=sma, minperiod=self.p.period)
+            self.std = ArrayLine(self.data, values=std, minperiod=self.p.period)
+        else:
+            # Standard indicators
+            self.sma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.p.period)
+            self.std = bt.indicators.StandardDeviation(self.data.close, period=self.p.period)
 
         # List to keep track of portfolio value each bar
         self.value_history = []
+        # (bar index, signed size, price) of every executed order
+        self.fills = []
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.fills.append((len(self.data) - 1, order.executed.size, order.executed.price))
 
     def next(self):
         # 1) Record the portfolio value _before_ making new trades
@@ -24,15 +40,15 @@ class MeanReversionStrategy(bt.Strategy):
         # 2) Compute z-score
         z = (self.data.close[0] - self.sma[0]) / self.std[0]
 
-        # 3) Entry logic if we're flat
+        # 3) Entry logic if we're flat: short above sma + (devfactor × std),
+        #    long below sma − (devfactor × std)
         if not self.position:
-            if z > self.p.devfactor:
-                # If price is > sma + (devfactor × std), go short
+            side = mean_reversion_entry(z, self.p.devfactor)
+            if side < 0:
                 self.sell(size=self.p.stake)
-            elif z < -self.p.devfactor:
-                # If price is < sma − (devfactor × std), go long
+            elif side > 0:
                 self.buy(size=self.p.stake)
         else:
             # 4) Exit when z crosses back through zero
-            if (self.position.size > 0 and z >= 0) or (self.position.size < 0 and z <= 0):
+            if should_exit(self.position.size, z):
                 self.close()
@@ -2,34 +2,51 @@
 
 import backtrader as bt
 
+from Backtester.feeds import ArrayLine
+from Backtester.signals import DEFAULTS, enhanced_entry, enhanced_stake, should_exit
+
 class EnhancedMeanReversionStrategy(bt.Strategy):
     """Mean-reversion strategy enhanced with RSI and dynamic position sizing."""
 
     params = dict(
-        period=20,       # lookback for moving average/std
-        devfactor=2.0,   # z-score threshold
-        stake=100,       # base shares per trade
+        period=DEFAULTS["period"],        # lookback for moving average/std
+        devfactor=DEFAULTS["devfactor"],  # z-score threshold
+        stake=DEFAULTS["stake"],          # base shares per trade
         rsi_period=14,   # RSI calculation period
         rsi_lower=30,    # Oversold threshold
         rsi_upper=70,    # Overbought threshold
+        indicators=None, # precomputed SeriesIndicators of the close (Backtester/indicator_cache.py)
     )
 
     def __init__(self):
-        self.sma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.p.period)
-        self.std = bt.indicators.StandardDeviation(self.data.close, period=self.p.period)
-        self.rsi = bt.indicators.RSI(self.data.close, period=self.p.rsi_period)
+        if self.p.indicators is not None:
+            sma, std = self.p.indicators.mean_std(self.p.period)
+            self.sma = ArrayLine(self.data, values=sma, minperiod=self.p.period)
+            self.std = ArrayLine(self.data, values=std, minperiod=self.p.period)
+            self.rsi = ArrayLine(self.data, values=self.p.indicators.rsi(self.p.rsi_period),
+                                 minperiod=self.p.rsi_period + 1)
+        else:
+            self.sma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.p.period)
+            self.std = bt.indicators.StandardDeviation(self.data.close, period=self.p.period)
+            self.rsi = bt.indicators.RSI(self.data.close, period=self.p.rsi_period)
         self.value_history = []
+        self.fills = []  # (bar index, signed size, price) of every executed order
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.fills.append((len(self.data) - 1, order.executed.size, order.executed.price))
 
     def next(self):
         self.value_history.append(self.broker.getvalue())
         z = (self.data.close[0] - self.sma[0]) / self.std[0]
-        stake_size = int(self.p.stake * max(1.0, abs(z)))
+        stake_size = enhanced_stake(self.p.stake, z)
 
         if not self.position:
-            if z < -self.p.devfactor and self.rsi[0] < self.p.rsi_lower:
+            side = enhanced_entry(z, self.rsi[0], self.p.devfactor, self.p.rsi_lower, self.p.rsi_upper)
+            if side > 0:
                 self.buy(size=stake_size)
-            elif z > self.p.devfactor and self.rsi[0] > self.p.rsi_upper:
+            elif side < 0:
                 self.sell(size=stake_size)
         else:
-            if (self.position.size > 0 and z >= 0) or (self.position.size < 0 and z <= 0):
+            if should_exit(self.position.size, z):
                 self.close()
@@ -0,0 +1,361 @@
+# Backtester/sweep.py
+
+"""
+Parallel parameter sweep over the mean-reversion strategies.
+
+Each symbol's prices are read from the database once and copied into a
+shared-memory block.  Worker processes attach to those blocks when they
+start, so grid points are dispatched as small parameter tuples and no task
+ever pickles or re-reads the price data.  Every grid point writes its P&L
+series as `pnl_<period>_<devfactor>_<stake>.json` (the layout already used
+under API/pnl_sweep/<SYMBOL>/) and one summary.csv collects Sharpe, max
+drawdown and final value for the whole sweep, and the same metrics are
+recorded in the sweep's index (see Backtester/sweep_index.py).  Progress
+is published to the API's live stream on channel "sweep" (common/stream.py),
+one "run" event per finished grid point.  With --format binary the
+series of each symbol are packed into one memory-mappable
+<output-dir>/<SYMBOL>.pnl result file instead (see Backtester/results.py).
+
+Indicators are computed once per symbol and distinct period, not once per
+grid point: the parent fills the indicator cache (Backtester/indicator_cache.py)
+before the pool starts, and workers read those arrays memory-mapped.
+
+Example:
+    python Backtester/sweep.py --symbols AAPL MSFT \\
+        --start 2015-06-09 --end 2025-06-09 \\
+        --periods 10 20 30 --devfactors 1.5 2.0 2.5 --stakes 50 100 200
+"""
+
+from __future__ import annotations
+
+import os
+import argparse
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backtester.backtest import compute_metrics, fetch_data_from_db, run_cerebro, write_pnl_json
+from Backtester.indicator_cache import IndicatorCache, SeriesIndicators
+from Backtester.result_cache import ResultCache, code_version, slice_hash
+
+# Row order of the per-symbol price block in shared memory.  Dates are stored
+# as whole days since the epoch, which float64 represents exactly.
+COLUMNS = ("Date", "Open", "High", "Low", "Close", "Volume")
+
+DEFAULT_OUTPUT_DIR = ROOT / "API" / "pnl_sweep"
+
+# Per-worker views onto the shared price blocks, filled by _attach_prices(),
+# and the Backtrader feed arrays and indicators built over them on first use.
+_PRICES = {}
+_SEGMENTS = []
+_FEEDS = {}
+_INDICATORS = {}
+
+
+def share_prices(frames: dict):
+    """
+    Copy each symbol's OHLCV into its own SharedMemory block laid out as
+    (len(COLUMNS), n_bars) float64.  Returns (segments, specs) where specs
+    maps symbol -> (shm name, shape) for the workers to attach to.
+    """
+    segments, specs = [], {}
+    for symbol, df in frames.items():
+        shape = (len(COLUMNS), len(df))
+        shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * shape[0] * shape[1]))
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        block[0] = df.index.values.astype("datetime64[D]").astype(np.int64)
+        for row, col in enumerate(COLUMNS[1:], start=1):
+            block[row] = df[col].to_numpy(dtype=np.float64)
+        segments.append(shm)
+        specs[symbol] = (shm.name, shape)
+    return segments, specs
+
+
+def _attach_prices(specs: dict):
+    """Pool initializer: map the shared price blocks into this worker."""
+    for symbol, (name, shape) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _SEGMENTS.append(shm)  # keep the mapping alive for the worker's lifetime
+        _PRICES[symbol] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _feed_arrays(symbol: str) -> dict:
+    """Backtrader feed arrays viewing the shared block, built once per worker."""
+    if symbol not in _FEEDS:
+        from Backtester.feeds import block_arrays
+        _FEEDS[symbol] = block_arrays(_PRICES[symbol], COLUMNS)
+    return _FEEDS[symbol]
+
+
+def _indicators(symbol: str, indicator_dir) -> SeriesIndicators:
+    """The symbol's indicators in this worker, backed by the parent's cache when enabled."""
+    if symbol not in _INDICATORS:
+        # Eviction is left to the parent once the pool is done
+        cache = IndicatorCache(indicator_dir, max_bytes=None) if indicator_dir is not None else None
+        _INDICATORS[symbol] = SeriesIndicators(_PRICES[symbol][4], symbol, cache)
+    return _INDICATORS[symbol]
+
+
+def pnl_filename(strategy: str, params: dict) -> str:
+    """File name for one grid point, matching the existing pnl_sweep layout."""
+    name = f"pnl_{params['period']}_{params['devfactor']}_{params['stake']}"
+    if strategy == "enhanced":
+        name = (f"pnl_enhanced_{params['period']}_{params['devfactor']}_{params['stake']}"
+                f"_{params['rsi_period']}_{params['rsi_lower']}_{params['rsi_upper']}")
+    return name + ".json"
+
+
+def run_point(task: tuple) -> dict:
+    """Run one grid point inside a worker and return its summary row."""
+    (symbol, strategy, params, initial_cash, engine, output_dir, fmt, data_hash, cache_dir,
+     exactbars, indicator_dir) = task
+    block = _PRICES[symbol]
+
+    rsi_params = {}
+    if strategy == "enhanced":
+        rsi_params = {k: params[k] for k in ("rsi_period", "rsi_lower", "rsi_upper")}
+
+    # Eviction is left to the parent once the pool is done
+    cache = ResultCache(cache_dir, enabled=cache_dir is not None, max_bytes=None)
+    key = cache.key(data_hash, strategy=strategy, engine=engine, code=code_version(strategy, engine),
+                    cash=initial_cash, **params)
+
+    t0 = time.perf_counter()
+    cached = cache.get(key)
+    if cached is not None:
+        value_history = np.asarray(cached["values"], dtype=np.float64)
+    elif engine == "vectorized":
+        from Backtester.vectorized import simulate
+        result = simulate(
+            block[1], block[4], initial_cash, strategy=strategy,
+            period=params["period"], devfactor=params["devfactor"],
+            stake=params["stake"], indicators=_indicators(symbol, indicator_dir), **rsi_params,
+        )
+        value_history = result.value_history
+    else:
+        value_history = np.asarray(run_cerebro(
+            _feed_arrays(symbol), initial_cash, strategy,
+            params["period"], params["devfactor"], params["stake"],
+            exactbars=exactbars, indicators=_indicators(symbol, indicator_dir), **rsi_params,
+        ))
+    elapsed = time.perf_counter() - t0
+
+    row = {"symbol": symbol, "strategy": strategy, **params}
+    row["final_value"] = float(value_history[-1]) if len(value_history) else initial_cash
+    if cached is not None:
+        row.update(cached["metrics"])
+    else:
+        metrics = compute_metrics(value_history)
+        cache.put(key, {"values": value_history.tolist(), "metrics": metrics})
+        row.update(metrics)
+    row["bars"] = len(value_history)
+    row["cached"] = cached is not None
+    row["seconds"] = elapsed
+
+    if output_dir and fmt == "binary":
+        # Shipped back to the parent, which owns the symbol's result file
+        row["_values"] = value_history
+    elif output_dir:
+        path = os.path.join(output_dir, symbol, pnl_filename(strategy, params))
+        # value_history covers the last len(value_history) bars
+        dates = block[0][len(block[0]) - len(value_history):].astype("datetime64[D]")
+        write_pnl_json(path, dates, value_history.tolist())
+        row["file"] = os.path.relpath(path, output_dir)
+        if len(value_history):
+            row["first_date"] = str(dates[0])
+            row["last_date"] = str(dates[-1])
+    return row
+
+
+def build_grid(strategy: str, periods, devfactors, stakes,
+               rsi_periods=(14,), rsi_lowers=(30,), rsi_uppers=(70,)) -> list:
+    """Cartesian product of the parameter lists as a list of dicts."""
+    grid = []
+    for period, devfactor, stake in itertools.product(periods, devfactors, stakes):
+        point = dict(period=int(period), devfactor=float(devfactor), stake=int(stake))
+        if strategy != "enhanced":
+            grid.append(point)
+            continue
+        for rsi_period, rsi_lower, rsi_upper in itertools.product(rsi_periods, rsi_lowers, rsi_uppers):
+            grid.append(dict(point, rsi_period=int(rsi_period),
+                             rsi_lower=float(rsi_lower), rsi_upper=float(rsi_upper)))
+    return grid
+
+
+def run_sweep(symbols, start: str, end: str, grid: list, strategy: str = "mean_reversion",
+              initial_cash: float = 100_000, engine: str = "vectorized",
+              output_dir=DEFAULT_OUTPUT_DIR, workers: int = None,
+              write_series: bool = True, fmt: str = "json",
+              cache: ResultCache = None, exactbars: int = 1,
+              indicator_cache: IndicatorCache = None, publisher=None) -> pd.DataFrame:
+    """
+    1) Load every symbol once and publish it through shared memory
+    2) Compute each symbol's indicators once per distinct period into
+       `indicator_cache` (already cached ones are skipped)
+    3) Fan the grid (symbols x params) out across a process pool; grid
+       points already in the result cache are read instead of simulated.
+       Each finished point is published as it arrives (`publisher`,
+       default: the live stream)
+       Backtrader runs feed Cerebro straight from the shared block
+       (Backtester/feeds.py) with `exactbars` line buffers
+    4) Write the series (per-run JSON, or one result file per symbol when
+       fmt="binary") and summary.csv with one row per combination
+    """
+    import pandas as pd
+    from common.stream import default_publisher, now_ms
+    from Backtester.results import ResultWriter
+    from Backtester.sweep_index import SweepIndex
+
+    frames = {}
+    for symbol in symbols:
+        df = fetch_data_from_db(symbol, start, end)
+        frames[symbol.upper()] = df
+
+    output_dir = str(output_dir)
+    cache = cache if cache is not None else ResultCache()
+    cache_dir = str(cache.root) if cache.enabled else None
+    indicator_cache = indicator_cache if indicator_cache is not None else IndicatorCache()
+    indicator_dir = str(indicator_cache.root) if indicator_cache.enabled else None
+    hashes = {symbol: slice_hash(df) for symbol, df in frames.items()}
+    tasks = [
+        (symbol, strategy, params, initial_cash, engine, output_dir if write_series else None, fmt,
+         hashes[symbol], cache_dir, exactbars, indicator_dir)
+        for symbol in frames for params in grid
+    ]
+    workers = workers or os.cpu_count() or 1
+    # Batch several grid points per IPC round trip; each one is only milliseconds.
+    chunksize = max(1, len(tasks) // (workers * 8))
+
+    print(f"Sweeping {len(grid)} parameter sets x {len(frames)} symbols on {workers} workers …")
+    publisher = publisher if publisher is not None else default_publisher()
+    publisher.publish("sweep", {"type": "start", "t": now_ms(), "symbols": list(frames), "strategy": strategy,
+                                "engine": engine, "runs": len(tasks)})
+    t0 = time.perf_counter()
+    computed = 0
+    if indicator_cache.enabled:
+        for symbol, df in frames.items():
+            indicators = indicator_cache.series(symbol, df["Close"].to_numpy(dtype=np.float64))
+            indicators.warm(grid)
+            computed += indicators.computed
+    segments, specs = share_prices(frames)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_prices,
+                                 initargs=(specs,)) as pool:
+            rows = []
+            for row in pool.map(run_point, tasks, chunksize=chunksize):
+                rows.append(row)
+                publisher.publish("sweep", {"type": "run", "t": now_ms(), "done": len(rows),
+                                            **{k: v for k, v in row.items() if k != "_values"}})
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    elapsed = time.perf_counter() - t0
+    publisher.publish("sweep", {"type": "done", "t": now_ms(), "runs": len(rows), "seconds": elapsed})
+    if cache.enabled:
+        cache.evict()
+    if indicator_cache.enabled:
+        indicator_cache.evict()
+
+    os.makedirs(output_dir, exist_ok=True)
+    if write_series and fmt == "binary":
+        for symbol, df in frames.items():
+            path = os.path.join(output_dir, f"{symbol}.pnl")
+            with ResultWriter(path, symbol=symbol, strategy=strategy, start=start, end=end,
+                              initial_cash=initial_cash, engine=engine) as writer:
+                for row in rows:
+                    if row["symbol"] != symbol:
+                        continue
+                    values = row.pop("_values")
+                    params = {k: row[k] for k in grid[0]}
+                    name = pnl_filename(strategy, params)[:-len(".json")]
+                    # value_history covers the last len(values) bars
+                    writer.add(name, df.index[len(df) - len(values):], values, params=params,
+                               metrics={k: row[k] for k in ("sharpe", "max_drawdown") if k in row},
+                               symbol=symbol, strategy=strategy)
+                    row["file"] = os.path.basename(path)
+            print(f"Series written to {path}")
+
+    if write_series:
+        index = SweepIndex(output_dir)
+        print(f"Indexed {index.record(rows)} runs in {index.path}")
+
+    summary = pd.DataFrame(rows)
+    summary_path = os.path.join(output_dir, "summary.csv")
+    summary.to_csv(summary_path, index=False)
+    hits = sum(row["cached"] for row in rows)
+    print(f"{len(rows)} runs in {elapsed:.1f}s ({len(rows) / max(elapsed, 1e-9):,.0f} runs/s, "
+          f"{hits} from cache, {computed} indicators computed)")
+    print(f"Summary written to {summary_path}")
+    return summary
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run a parallel parameter sweep.")
+    parser.add_argument("--symbols", nargs="+", required=True, help="Ticker symbols (tables in market_data.db).")
+    parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD).")
+    parser.add_argument("--end", type=str, required=True, help="End date (YYYY-MM-DD).")
+    parser.add_argument("--cash", type=float, default=100_000, help="Initial capital (USD).")
+    parser.add_argument(
+        "--strategy", type=str, default="mean_reversion",
+        choices=["mean_reversion", "enhanced"], help="Which strategy to run",
+    )
+    parser.add_argument("--periods", type=int, nargs="+", default=[10, 20, 30], help="look-back windows")
+    parser.add_argument("--devfactors", type=float, nargs="+", default=[1.5, 2.0, 2.5], help="std-dev thresholds")
+    parser.add_argument("--stakes", type=int, nargs="+", default=[50, 100, 200], help="position sizes")
+    parser.add_argument("--rsi-periods", type=int, nargs="+", default=[14], help="RSI periods (enhanced only)")
+    parser.add_argument("--rsi-lowers", type=float, nargs="+", default=[30], help="RSI oversold levels (enhanced only)")
+    parser.add_argument("--rsi-uppers", type=float, nargs="+", default=[70], help="RSI overbought levels (enhanced only)")
+    parser.add_argument(
+        "--engine", type=str, default="vectorized",
+        choices=["backtrader", "vectorized"], help="simulation engine",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output-dir", type=str, default=str(DEFAULT_OUTPUT_DIR), help="sweep output directory")
+    parser.add_argument("--summary-only", action="store_true", help="skip writing per-run P&L series")
+    parser.add_argument(
+        "--format", choices=["json", "binary"], default="json",
+        help="per-run JSON files, or one binary result file per symbol",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="re-run every grid point")
+    parser.add_argument("--no-indicator-cache", action="store_true",
+                        help="compute indicators in each worker instead of sharing them from disk")
+    parser.add_argument(
+        "--exactbars", type=int, default=1,
+        help="Backtrader exactbars: 1 keeps minimal line buffers per run, 0 full-length (faster)",
+    )
+    args = parser.parse_args(argv)
+
+    grid = build_grid(
+        args.strategy, args.periods, args.devfactors, args.stakes,
+        args.rsi_periods, args.rsi_lowers, args.rsi_uppers,
+    )
+    run_sweep(
+        symbols=[s.upper() for s in args.symbols],
+        start=args.start,
+        end=args.end,
+        grid=grid,
+        strategy=args.strategy,
+        initial_cash=args.cash,
+        engine=args.engine,
+        output_dir=args.output_dir,
+        workers=args.workers,
+        write_series=not args.summary_only,
+        fmt=args.format,
+        cache=ResultCache(enabled=not args.no_cache),
+        exactbars=args.exactbars,
+        indicator_cache=IndicatorCache(enabled=not args.no_indicator_cache),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# Backtester/sweep_index.py
+
+"""
+Metrics index over a sweep directory, for listing and ranking runs without
+opening their series.
+
+Every run of a sweep (one API/pnl_sweep/<SYMBOL>/pnl_*.json file, or one
+series inside an <output-dir>/<SYMBOL>.pnl result file) gets a row in an
+SQLite table holding its symbol, strategy, parameters, Sharpe ratio, max
+drawdown and final value.  The metric columns are indexed, so a top-N
+query over 100k runs is an index walk of N rows.
+
+The index lives next to the sweep (<sweep-dir>/index.sqlite) and is kept
+current two ways:
+  * at write time: run_sweep() records each row it has just written, from
+    the metrics it already computed;
+  * incrementally: refresh() re-scans only the symbol directories whose
+    mtime changed (a file was added or removed), and re-reads only files
+    whose mtime/size differ from what was indexed.  refresh(full=True)
+    re-stats every file, which also catches files rewritten in place.
+
+    python Backtester/sweep_index.py refresh [--full] [--sweep-dir API/pnl_sweep]
+    python Backtester/sweep_index.py top --sort sharpe --limit 10 [--symbol AAPL]
+"""
+
+import os
+import json
+import sqlite3
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, Optional
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backtester.metrics import compute_metrics
+from Backtester.results import SUFFIX, ResultFile, parse_sweep_name
+
+DEFAULT_SWEEP_DIR = ROOT / "API" / "pnl_sweep"
+INDEX_NAME = "index.sqlite"
+
+SORT_COLUMNS = ("sharpe", "max_drawdown", "final_value")
+PARAM_COLUMNS = ("period", "devfactor", "stake", "rsi_period", "rsi_lower", "rsi_upper")
+RUN_COLUMNS = ("id", "source", "key", "symbol", "strategy", *PARAM_COLUMNS,
+               "sharpe", "max_drawdown", "final_value", "bars", "first_date", "last_date")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,          -- file path relative to the sweep dir
+    key TEXT NOT NULL,             -- series key inside a result file, '' for JSON
+    symbol TEXT NOT NULL,
+    strategy TEXT,
+    period INTEGER, devfactor REAL, stake INTEGER,
+    rsi_period INTEGER, rsi_lower REAL, rsi_upper REAL,
+    sharpe REAL, max_drawdown REAL, final_value REAL,
+    bars INTEGER, first_date TEXT, last_date TEXT,
+    UNIQUE (source, key)
+);
+CREATE INDEX IF NOT EXISTS runs_sharpe ON runs (sharpe);
+CREATE INDEX IF NOT EXISTS runs_max_drawdown ON runs (max_drawdown);
+CREATE INDEX IF NOT EXISTS runs_final_value ON runs (final_value);
+CREATE INDEX IF NOT EXISTS runs_symbol ON runs (symbol, strategy);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,         -- relative to the sweep dir; directories end in '/'
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def _finite(x) -> Optional[float]:
+    """SQLite has no NaN: store undefined metrics (flat series) as NULL."""
+    return None if x is None or not np.isfinite(x) else float(x)
+
+
+def _run_row(source: str, key: str, symbol: str, strategy: Optional[str], params: dict,
+             metrics: dict, final_value, bars: int, first_date, last_date) -> tuple:
+    return (source, key, symbol, strategy, *(params.get(p) for p in PARAM_COLUMNS),
+            _finite(metrics.get("sharpe")), _finite(metrics.get("max_drawdown")),
+            _finite(final_value), bars, first_date, last_date)
+
+
+def json_rows(path: Path, source: str) -> List[tuple]:
+    """Index row of one API/pnl_sweep/<SYMBOL>/pnl_*.json file (parses the series)."""
+    with open(path) as f:
+        data = json.load(f)
+    parsed = parse_sweep_name(path.stem) or {"strategy": None, "params": {}}
+    values = np.array([row["value"] for row in data], dtype=np.float64)
+    final_value = values[-1] if len(values) else None
+    first, last = (data[0]["date"][:10], data[-1]["date"][:10]) if data else (None, None)
+    return [_run_row(source, "", path.parent.name, parsed["strategy"], parsed["params"],
+                     compute_metrics(values), final_value, len(values), first, last)]
+
+
+def result_file_rows(path: Path, source: str) -> List[tuple]:
+    """Index rows of every series in a result file, from its header alone."""
+    results = ResultFile(path)
+    rows = []
+    for key in results.keys():
+        entry = results.info(key)
+        symbol = entry.get("symbol") or results.meta.get("symbol") or path.stem
+        rows.append(_run_row(source, key, symbol, entry.get("strategy"), entry["params"],
+                             entry["metrics"], entry.get("final_value"), entry["length"],
+                             entry.get("first_date"), entry.get("last_date")))
+    return rows
+
+
+class SweepIndex:
+    """SQLite metrics index of one sweep directory."""
+
+    def __init__(self, sweep_dir=DEFAULT_SWEEP_DIR, path=None):
+        self.sweep_dir = Path(sweep_dir)
+        self.path = Path(path) if path else self.sweep_dir / INDEX_NAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_lock = threading.Lock()
+        with self.connect() as con:
+            con.executescript(_SCHEMA)
+
+    @contextmanager
+    def connect(self):
+        # A connection per call: cheap for SQLite, and safe from any thread.
+        # WAL lets readers query while a refresh is writing.
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    # --- writing --------------------------------------------------------------
+
+    def _replace(self, con, source: str, rows: Iterable[tuple]) -> int:
+        """Replace every row of `source` and remember its current mtime/size."""
+        con.execute("DELETE FROM runs WHERE source = ?", (source,))
+        cur = con.executemany(
+            f"INSERT INTO runs ({', '.join(RUN_COLUMNS[1:])}) "
+            f"VALUES ({', '.join('?' * (len(RUN_COLUMNS) - 1))})", rows)
+        st = os.stat(self.sweep_dir / source)
+        con.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                    (source, st.st_mtime_ns, st.st_size))
+        return cur.rowcount
+
+    def record(self, rows: List[dict]) -> int:
+        """
+        Index freshly written sweep rows (as returned by sweep.run_point, with
+        their "file" set) without re-reading the series.  Result files are
+        indexed from their header.
+        """
+        by_source = {}
+        for row in rows:
+            if row.get("file"):
+                by_source.setdefault(row["file"], []).append(row)
+        count = 0
+        with self._write_lock, self.connect() as con:
+            for source, group in by_source.items():
+                if source.endswith(SUFFIX):
+                    count += self._replace(con, source, result_file_rows(self.sweep_dir / source, source))
+                    continue
+                for row in group:
+                    params = {p: row[p] for p in PARAM_COLUMNS if p in row}
+                    count += self._replace(con, source, [_run_row(
+                        source, "", row["symbol"], row["strategy"], params, row,
+                        row.get("final_value"), row.get("bars"),
+                        row.get("first_date"), row.get("last_date"))])
+        return count
+
+    def refresh(self, full: bool = False) -> dict:
+        """
+        Bring the index up to date with the sweep directory: index new and
+        changed files, drop rows of deleted ones.  Unless `full`, only symbol
+        directories whose mtime moved since the last refresh are listed.
+        """
+        stats = {"scanned": 0, "indexed": 0, "removed": 0, "runs": 0}
+        if not self.sweep_dir.is_dir():
+            return stats
+        with self._write_lock, self.connect() as con:
+            known = {path: (mtime, size) for path, mtime, size in con.execute("SELECT * FROM files")}
+            seen = set()
+
+            def changed(rel: str, st) -> bool:
+                return known.get(rel) != (st.st_mtime_ns, st.st_size)
+
+            for entry in os.scandir(self.sweep_dir):
+                if entry.is_file() and entry.name.endswith(SUFFIX):
+                    seen.add(entry.name)
+                    stats["scanned"] += 1
+                    if changed(entry.name, entry.stat()):
+                        self._replace(con, entry.name,
+                                      result_file_rows(Path(entry.path), entry.name))
+                        stats["indexed"] += 1
+                elif entry.is_dir():
+                    dir_key = entry.name + "/"
+                    st = entry.stat()
+                    seen.add(dir_key)
+                    if not full and not changed(dir_key, st):
+                        # No file added or removed: keep everything indexed under it
+                        seen.update(p for p in known if p.startswith(dir_key))
+                        continue
+                    for f in os.scandir(entry.path):
+                        if not (f.name.startswith("pnl_") and f.name.endswith(".json")):
+                            continue
+                        rel = f"{entry.name}/{f.name}"
+                        seen.add(rel)
+                        stats["scanned"] += 1
+                        if changed(rel, f.stat()):
+                            self._replace(con, rel, json_rows(Path(f.path), rel))
+                            stats["indexed"] += 1
+                    con.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                                (dir_key, st.st_mtime_ns, st.st_size))
+
+            gone = [(path,) for path in known if path not in seen]
+            con.executemany("DELETE FROM runs WHERE source = ?", gone)
+            con.executemany("DELETE FROM files WHERE path = ?", gone)
+            stats["removed"] = sum(1 for (path,) in gone if not path.endswith("/"))
+            stats["runs"] = con.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        return stats
+
+    # --- reading --------------------------------------------------------------
+
+    def query(self, sort: str = "sharpe", descending: bool = True, limit: int = 50,
+              offset: int = 0, symbol: Optional[str] = None, strategy: Optional[str] = None,
+              min_sharpe: Optional[float] = None, min_final_value: Optional[float] = None,
+              drawdown_floor: Optional[float] = None, **params) -> List[dict]:
+        """
+        Runs matching the filters, ordered by `sort` (walking that column's
+        index).  Runs whose `sort` metric is undefined (a flat series has no
+        Sharpe) are left out.  `params` filter on exact parameter values,
+        e.g. period=20.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"sort must be one of {SORT_COLUMNS}, not {sort!r}")
+        where, args = [f"{sort} IS NOT NULL"], []
+        for column, value in (("symbol", symbol and symbol.upper()), ("strategy", strategy)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        for column, value in params.items():
+            if column not in PARAM_COLUMNS:
+                raise ValueError(f"unknown parameter {column!r}")
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        for clause, value in (("sharpe >= ?", min_sharpe), ("final_value >= ?", min_final_value),
+                              ("max_drawdown >= ?", drawdown_floor)):
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+        sql = (f"SELECT {', '.join(RUN_COLUMNS)} FROM runs WHERE {' AND '.join(where)}"
+               f" ORDER BY {sort} {'DESC' if descending else 'ASC'} LIMIT ? OFFSET ?")
+        with self.connect() as con:
+            cur = con.execute(sql, (*args, int(limit), int(offset)))
+            return [dict(zip(RUN_COLUMNS, row)) for row in cur]
+
+    def get(self, run_id: int) -> Optional[dict]:
+        with self.connect() as con:
+            row = con.execute(f"SELECT {', '.join(RUN_COLUMNS)} FROM runs WHERE id = ?",
+                              (run_id,)).fetchone()
+        return dict(zip(RUN_COLUMNS, row)) if row else None
+
+    def groups(self) -> List[dict]:
+        """Run count and best Sharpe per (symbol, strategy)."""
+        with self.connect() as con:
+            cur = con.execute(
+                "SELECT symbol, strategy, COUNT(*), MAX(sharpe), MAX(final_value) "
+                "FROM runs GROUP BY symbol, strategy ORDER BY symbol, strategy")
+            return [dict(zip(("symbol", "strategy", "runs", "best_sharpe", "best_final_value"), row))
+                    for row in cur]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Metrics index of a sweep directory")
+    parser.add_argument("--sweep-dir", default=str(DEFAULT_SWEEP_DIR), help="sweep output directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ref = sub.add_parser("refresh", help="index new/changed sweep files")
+    ref.add_argument("--full", action="store_true", help="re-stat every file, not just changed dirs")
+    top = sub.add_parser("top", help="print the best runs")
+    top.add_argument("--sort", choices=SORT_COLUMNS, default="sharpe")
+    top.add_argument("--ascending", action="store_true")
+    top.add_argument("--limit", type=int, default=10)
+    top.add_argument("--symbol")
+    top.add_argument("--strategy")
+    args = parser.parse_args()
+
+    index = SweepIndex(args.sweep_dir)
+    if args.command == "refresh":
+        print(index.refresh(full=args.full))
+    else:
+        index.refresh()
+        import pandas as pd
+        rows = index.query(sort=args.sort, descending=not args.ascending, limit=args.limit,
+                           symbol=args.symbol, strategy=args.strategy)
+        print(pd.DataFrame(rows).to_string(index=False) if rows else "no runs indexed")
@@ -0,0 +1,237 @@
+# Backtester/vectorized.py
+
+"""
+Array-based backtest engine for the mean-reversion strategies.
+
+Backtrader walks every bar through Python objects; for the simple
+mean-reversion rules that overhead dominates the run time.  This module
+computes the same indicators (SMA, population std-dev, Wilder RSI) over
+whole NumPy arrays, derives the entry/exit signals in one shot and replays
+the broker's fill rules (market orders filled on the next bar's open,
+orders rejected when cash would go negative) to produce a portfolio value
+series that matches ``strategy.value_history`` from the Backtrader path.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+STRATEGIES = ("mean_reversion", "enhanced")
+
+# Defaults mirror the ``params`` of the Backtrader strategy classes.
+RSI_DEFAULTS = dict(rsi_period=14, rsi_lower=30, rsi_upper=70)
+
+
+@dataclass
+class VectorizedResult:
+    value_history: np.ndarray  # portfolio value per bar, same span as Backtrader
+    position: np.ndarray       # position held during each bar of value_history
+    fill_index: np.ndarray     # bar indices (into the input arrays) of fills
+    fill_size: np.ndarray      # signed fill sizes (positive = buy)
+    fill_price: np.ndarray     # fill prices (bar open)
+    start: int                 # index of the first bar in value_history
+
+
+def rolling_mean_std(close: np.ndarray, period: int):
+    """
+    Rolling SMA and population standard deviation over `period` bars.
+    The first period-1 entries are NaN.  The std uses the same
+    sqrt(|E[x^2] - E[x]^2|) formula as bt.indicators.StandardDeviation.
+    `close` may be 2-D (bars x symbols); every column is rolled at once.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    sma = np.full(close.shape, np.nan)
+    std = np.full(close.shape, np.nan)
+    if len(close) < period:
+        return sma, std
+
+    windows = sliding_window_view(close, period, axis=0)
+    mean = windows.mean(axis=-1)
+    meansq = (windows * windows).mean(axis=-1)
+    sma[period - 1:] = mean
+    std[period - 1:] = np.sqrt(np.abs(meansq - mean * mean))
+    return sma, std
+
+
+def wilder_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder RSI as computed by bt.indicators.RSI: up/down moves smoothed with
+    an SMMA seeded by the simple mean of the first `period` moves.
+    The first `period` entries are NaN.  `close` may be 2-D (bars x symbols).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    rsi = np.full(close.shape, np.nan)
+    if len(close) <= period:
+        return rsi
+
+    diff = np.diff(close, axis=0)
+    up = np.maximum(diff, 0.0)
+    down = np.maximum(-diff, 0.0)
+
+    alpha = 1.0 / period
+    alpha1 = 1.0 - alpha
+    maup = np.empty((len(diff) - period + 1,) + close.shape[1:])
+    madown = np.empty_like(maup)
+    maup[0] = up[:period].mean(axis=0)
+    madown[0] = down[:period].mean(axis=0)
+    if close.ndim == 1:
+        # The SMMA recursion is inherently sequential; run it over plain floats.
+        prev_up, prev_down = maup[0], madown[0]
+        up_l = up[period:].tolist()
+        down_l = down[period:].tolist()
+        for i in range(len(up_l)):
+            prev_up = prev_up * alpha1 + up_l[i] * alpha
+            prev_down = prev_down * alpha1 + down_l[i] * alpha
+            maup[i + 1] = prev_up
+            madown[i + 1] = prev_down
+    else:
+        # Same recursion, one row (all symbols) per step
+        for i in range(len(diff) - period):
+            maup[i + 1] = maup[i] * alpha1 + up[period + i] * alpha
+            madown[i + 1] = madown[i] * alpha1 + down[period + i] * alpha
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = maup / madown
+        rsi[period:] = 100.0 - 100.0 / (1.0 + rs)
+    return rsi
+
+
+def compute_signals(close: np.ndarray, strategy: str, period: int, devfactor: float,
+                    stake: int, rsi_period: int = 14, rsi_lower: float = 30,
+                    rsi_upper: float = 70, indicators=None):
+    """
+    Evaluate the strategy rules for every bar at once.  `close` may be
+    2-D (bars x symbols) to evaluate many symbols in one step.
+    `indicators` (a 1-D close's indicator_cache.SeriesIndicators) supplies
+    precomputed SMA/std-dev and RSI instead of recomputing them.
+
+    Returns (start, z, long_entry, short_entry, size) where `start` is the
+    first bar on which Backtrader would call strategy.next().
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'; expected one of {STRATEGIES}")
+
+    close = np.asarray(close, dtype=np.float64)
+    if indicators is not None:
+        sma, std = indicators.mean_std(period)
+    else:
+        sma, std = rolling_mean_std(close, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (close - sma) / std
+
+    long_entry = z < -devfactor
+    short_entry = z > devfactor
+
+    if strategy == "enhanced":
+        rsi = indicators.rsi(rsi_period) if indicators is not None else wilder_rsi(close, rsi_period)
+        long_entry &= rsi < rsi_lower
+        short_entry &= rsi > rsi_upper
+        # int(stake * max(1, |z|)) -- truncation, as in the Backtrader strategy
+        scale = np.where(np.isfinite(z), np.maximum(1.0, np.abs(z)), 1.0)
+        size = (stake * scale).astype(np.int64)
+        start = max(period, rsi_period + 1) - 1
+    else:
+        size = np.full(close.shape, int(stake), dtype=np.int64)
+        start = period - 1
+
+    return start, z, long_entry, short_entry, size
+
+
+def simulate(open_: np.ndarray, close: np.ndarray, initial_cash: float,
+             strategy: str = "mean_reversion", period: int = 20,
+             devfactor: float = 2.0, stake: int = 100, indicators=None,
+             **rsi_params) -> VectorizedResult:
+    """
+    Run the strategy over aligned open/close arrays, with the indicators
+    from `indicators` (a SeriesIndicators of `close`) when given.
+
+    Signals are computed vectorised; the only per-bar work is the tiny
+    flat/long/short state machine that turns signals into orders.  Value
+    and position series are then rebuilt from the fills with cumulative sums.
+    """
+    open_ = np.asarray(open_, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+
+    params = dict(RSI_DEFAULTS)
+    params.update(rsi_params)
+    start, z, long_entry, short_entry, size = compute_signals(
+        close, strategy, period, devfactor, stake, indicators=indicators, **params
+    )
+
+    fill_index, fill_size = [], []
+    if start < n:
+        z_l = z.tolist()
+        long_l = long_entry.tolist()
+        short_l = short_entry.tolist()
+        size_l = size.tolist()
+        open_l = open_.tolist()
+        close_l = close.tolist()
+
+        pos = 0
+        cash = float(initial_cash)
+        order = 0  # size submitted on the previous bar, filled at this open
+        for i in range(start, n):
+            if order:
+                # The broker rejects (Margin) any order that would leave cash
+                # negative at the creation price (previous close); entries are
+                # checked again at the execution price (this bar's open).
+                rejected = cash - order * close_l[i - 1] < 0.0 or (
+                    pos == 0 and cash - order * open_l[i] < 0.0
+                )
+                if not rejected:
+                    fill_index.append(i)
+                    fill_size.append(order)
+                    cash -= order * open_l[i]
+                    pos += order
+                order = 0
+
+            zi = z_l[i]
+            if pos == 0:
+                if short_l[i]:
+                    order = -size_l[i]
+                elif long_l[i]:
+                    order = size_l[i]
+            elif (pos > 0 and zi >= 0) or (pos < 0 and zi <= 0):
+                order = -pos
+
+    fill_index = np.asarray(fill_index, dtype=np.int64)
+    fill_size = np.asarray(fill_size, dtype=np.float64)
+    fill_price = open_[fill_index]
+
+    # Rebuild position and cash per bar from the fills.
+    trade_size = np.zeros(n)
+    trade_cash = np.zeros(n)
+    trade_size[fill_index] = fill_size
+    trade_cash[fill_index] = fill_size * fill_price
+    position = np.cumsum(trade_size)
+    cash = initial_cash - np.cumsum(trade_cash)
+    value = cash + position * close
+
+    start = min(start, n)
+    return VectorizedResult(
+        value_history=value[start:],
+        position=position[start:],
+        fill_index=fill_index,
+        fill_size=fill_size,
+        fill_price=fill_price,
+        start=start,
+    )
+
+
+def run_vectorized(df: pd.DataFrame, initial_cash: float, strategy: str,
+                   period: int, devfactor: float, stake: int, **rsi_params) -> VectorizedResult:
+    """Convenience wrapper taking the OHLCV DataFrame used by run_backtest()."""
+    return simulate(
+        df["Open"].to_numpy(dtype=np.float64),
+        df["Close"].to_numpy(dtype=np.float64),
+        initial_cash,
+        strategy=strategy,
+        period=period,
+        devfactor=devfactor,
+        stake=stake,
+        **rsi_params,
+    )
@@ -0,0 +1,274 @@
+# Backtester/walkforward.py
+
+"""
+Walk-forward optimization of the mean-reversion strategies.
+
+The history is cut into rolling windows: optimize the parameter grid on a
+`train_months` slice, then run the winning parameters on the following
+`test_months` slice (out of sample), and step forward by `step_months`.
+Windows are anchored at the first bar, and a window is only used once its
+test slice is complete, so extending the history only adds windows at the
+end.
+
+Every (data slice, parameters) result is memoized on disk under a key made
+from a content hash of the slice's OHLCV, the strategy/engine source and
+the parameters (see Backtester/result_cache.py).  Re-running
+the study after a month of new data only computes the new windows; a
+revised bar only invalidates the windows that contain it.
+
+Outputs (under API/walkforward/<SYMBOL>/ by default):
+    walkforward.csv   one row per window: ranges, chosen params, scores
+    pnl_oos.json      out-of-sample test windows chained into one P&L series
+
+Example:
+    python tradingfund.py walkforward --symbol AAPL --start 2015-06-09 --end 2025-06-09 \\
+        --train-months 24 --test-months 6 --periods 10 20 30 --devfactors 1.5 2.0 2.5
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import argparse
+from pathlib import Path
+from typing import Optional
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backtester.backtest import compute_metrics, fetch_data_from_db, run_engine, write_pnl_json
+from Backtester.sweep import build_grid
+from Backtester.result_cache import ResultCache, code_version, slice_hash
+
+# pandas (and, through the engines, Backtrader) is imported inside the
+# functions, so `tradingfund walkforward --help` starts fast.
+
+DEFAULT_CACHE_DIR = Path(os.getenv("WALKFORWARD_CACHE", ROOT / "Backtester" / ".walkforward_cache"))
+DEFAULT_OUTPUT_DIR = ROOT / "API" / "walkforward"
+
+OBJECTIVES = ("sharpe", "final_value")
+
+
+def make_windows(index: pd.DatetimeIndex, train_months: int, test_months: int,
+                 step_months: Optional[int] = None) -> list:
+    """
+    (train_start, test_start, test_end) timestamps of every complete window;
+    train is [train_start, test_start) and test is [test_start, test_end).
+    """
+    import pandas as pd
+
+    if len(index) == 0:
+        raise ValueError("no bars to build walk-forward windows from")
+    if train_months < 1 or test_months < 1 or (step_months is not None and step_months < 1):
+        raise ValueError("train, test and step months must be >= 1")
+    step = step_months or test_months
+    first = index[0].normalize()
+    last = index[-1]
+    windows = []
+    i = 0
+    while True:
+        train_start = first + pd.DateOffset(months=i * step)
+        test_start = train_start + pd.DateOffset(months=train_months)
+        test_end = test_start + pd.DateOffset(months=test_months)
+        if test_end > last + pd.Timedelta(days=1):
+            break
+        windows.append((train_start, test_start, test_end))
+        i += 1
+    return windows
+
+
+def warmup_bars(strategy: str, params: dict) -> int:
+    """Bars the indicators need before the first decision (Backtrader's minperiod - 1)."""
+    if strategy == "enhanced":
+        return max(params["period"], params.get("rsi_period", 14) + 1) - 1
+    return params["period"] - 1
+
+
+class WalkForward:
+    """Run a walk-forward study for one symbol over a parameter grid."""
+
+    def __init__(self, df: pd.DataFrame, grid: list, strategy: str = "mean_reversion",
+                 initial_cash: float = 100_000, engine: str = "vectorized",
+                 objective: str = "sharpe", cache: Optional[ResultCache] = None):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {OBJECTIVES}")
+        self.df = df
+        self.grid = grid
+        self.strategy = strategy
+        self.initial_cash = initial_cash
+        self.engine = engine
+        self.objective = objective
+        self.cache = cache or ResultCache(DEFAULT_CACHE_DIR)
+
+    def _simulate(self, df: pd.DataFrame, params: dict) -> list:
+        rsi_params = {k: params[k] for k in ("rsi_period", "rsi_lower", "rsi_upper") if k in params}
+        return run_engine(df, self.initial_cash, self.strategy, params["period"],
+                          params["devfactor"], params["stake"], self.engine, **rsi_params)
+
+    def _key(self, data_hash: str, role: str, params: dict) -> str:
+        return ResultCache.key(data_hash, role=role, strategy=self.strategy, engine=self.engine,
+                               code=code_version(self.strategy, self.engine),
+                               cash=self.initial_cash, **params)
+
+    def score_train(self, train: pd.DataFrame, data_hash: str, params: dict) -> dict:
+        """In-sample metrics of `params` on the train slice (memoized)."""
+        def compute():
+            values = self._simulate(train, params)
+            final = float(values[-1]) if values else self.initial_cash
+            return {"final_value": final, **compute_metrics(values)}
+        return self.cache.get_or_compute(self._key(data_hash, "train", params), compute)
+
+    def run_test(self, test: pd.DataFrame, data_hash: str, params: dict) -> list:
+        """Out-of-sample value series of `params` on a warm-up + test slice (memoized)."""
+        return self.cache.get_or_compute(self._key(data_hash, "test", params),
+                                         lambda: [float(v) for v in self._simulate(test, params)])
+
+    def best_params(self, train: pd.DataFrame):
+        data_hash = slice_hash(train)
+        best, best_score = None, -np.inf
+        for params in self.grid:
+            score = self.score_train(train, data_hash, params).get(self.objective, np.nan)
+            if score is not None and np.isfinite(score) and score > best_score:
+                best, best_score = params, score
+        return best, best_score
+
+    def run(self, train_months: int, test_months: int, step_months: Optional[int] = None):
+        """
+        Returns (windows DataFrame, out-of-sample dates, out-of-sample values).
+        Each test window starts flat with initial_cash; the stitched series
+        chains the windows' growth so it reads as one account.
+        Raises ValueError when the history is too short for one window.
+        """
+        import pandas as pd
+
+        df = self.df
+        windows = make_windows(df.index, train_months, test_months, step_months)
+        if not windows:
+            raise ValueError(
+                f"{df.index[0].date()} to {df.index[-1].date()} is shorter than one window "
+                f"({train_months} train + {test_months} test months)")
+        rows, oos_dates, oos_values = [], [], []
+        equity = self.initial_cash
+        for n, (train_start, test_start, test_end) in enumerate(windows):
+            train = df[(df.index >= train_start) & (df.index < test_start)]
+            if train.empty:
+                # A gap in the history (e.g. a halted or delisted period): nothing to fit on
+                print(f"Window {n}: no bars in {train_start.date()} to {test_start.date()}, skipped")
+                continue
+            params, score = self.best_params(train)
+            row = {
+                "window": n,
+                "train_start": train.index[0].date(), "train_end": train.index[-1].date(),
+            }
+            lo = int(df.index.searchsorted(test_start))
+            hi = int(df.index.searchsorted(test_end))
+            if params is None or hi <= lo:
+                rows.append(row)
+                continue
+
+            # Prepend the warm-up bars so the first decision lands on the first test bar
+            warm = warmup_bars(self.strategy, params)
+            if lo < warm:
+                # Too close to the first bar for a full warm-up: start trading once it is complete
+                if hi <= warm:
+                    print(f"Window {n}: test ends inside the {warm}-bar warm-up, skipped")
+                    rows.append(row)
+                    continue
+                print(f"Window {n}: test starts inside the {warm}-bar warm-up, "
+                      f"moved to {df.index[warm].date()}")
+                lo = warm
+            test = df.iloc[lo - warm:hi]
+            values = np.asarray(self.run_test(test, slice_hash(test), params))
+            values = values[len(values) - (hi - lo):]
+
+            growth = values / values[0]
+            oos_dates.extend(df.index[lo:hi])
+            oos_values.extend((equity * growth).tolist())
+            equity *= growth[-1]
+
+            metrics = compute_metrics(values)
+            row.update({
+                "test_start": df.index[lo].date(), "test_end": df.index[hi - 1].date(),
+                **params,
+                f"is_{self.objective}": score,
+                "oos_return": float(growth[-1] - 1.0),
+                "oos_sharpe": metrics.get("sharpe", np.nan),
+                "oos_max_drawdown": metrics.get("max_drawdown", np.nan),
+            })
+            rows.append(row)
+        return pd.DataFrame(rows), pd.DatetimeIndex(oos_dates), oos_values
+
+
+def run_walkforward(symbol: str, start: str, end: str, grid: list,
+                    train_months: int = 24, test_months: int = 6, step_months: Optional[int] = None,
+                    strategy: str = "mean_reversion", initial_cash: float = 100_000,
+                    engine: str = "vectorized", objective: str = "sharpe",
+                    output_dir=DEFAULT_OUTPUT_DIR, cache: Optional[ResultCache] = None) -> pd.DataFrame:
+    """Load `symbol`, run the study, write walkforward.csv and pnl_oos.json."""
+    df = fetch_data_from_db(symbol, start, end)
+    if df.empty:
+        raise ValueError(f"no {symbol.upper()} bars between {start or 'the first'} and {end or 'the last'} date")
+    cache = cache or ResultCache(DEFAULT_CACHE_DIR)
+    study = WalkForward(df, grid, strategy, initial_cash, engine, objective, cache)
+
+    t0 = time.perf_counter()
+    windows, dates, values = study.run(train_months, test_months, step_months)
+    elapsed = time.perf_counter() - t0
+
+    out = Path(output_dir) / symbol.upper()
+    out.mkdir(parents=True, exist_ok=True)
+    windows.to_csv(out / "walkforward.csv", index=False)
+    write_pnl_json(str(out / "pnl_oos.json"), dates, values)
+
+    print(f"{len(windows)} windows x {len(grid)} parameter sets in {elapsed:.1f}s "
+          f"(cache: {cache.hits} hits, {cache.misses} misses)")
+    if values:
+        metrics = compute_metrics(values)
+        print(f"Out-of-sample final value: {values[-1]:,.2f}")
+        if metrics:
+            print(f"Out-of-sample Sharpe: {metrics['sharpe']:.2f}  Max Drawdown: {metrics['max_drawdown']:.2%}")
+    print(f"Results written to {out}")
+    return windows
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Walk-forward optimization with memoized windows.")
+    parser.add_argument("--symbol", type=str, required=True, help="Ticker symbol (table in market_data.db).")
+    parser.add_argument("--start", type=str, default=None, help="Start date (YYYY-MM-DD).")
+    parser.add_argument("--end", type=str, default=None, help="End date (YYYY-MM-DD).")
+    parser.add_argument("--cash", type=float, default=100_000, help="Initial capital (USD).")
+    parser.add_argument(
+        "--strategy", type=str, default="mean_reversion",
+        choices=["mean_reversion", "enhanced"], help="Which strategy to run",
+    )
+    parser.add_argument("--train-months", type=int, default=24, help="in-sample window length")
+    parser.add_argument("--test-months", type=int, default=6, help="out-of-sample window length")
+    parser.add_argument("--step-months", type=int, default=None, help="window step (default: test months)")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="sharpe", help="in-sample score to maximize")
+    parser.add_argument("--periods", type=int, nargs="+", default=[10, 20, 30], help="look-back windows")
+    parser.add_argument("--devfactors", type=float, nargs="+", default=[1.5, 2.0, 2.5], help="std-dev thresholds")
+    parser.add_argument("--stakes", type=int, nargs="+", default=[50, 100, 200], help="shares per trade")
+    parser.add_argument("--rsi-periods", type=int, nargs="+", default=[14], help="RSI periods (enhanced only)")
+    parser.add_argument("--rsi-lowers", type=float, nargs="+", default=[30], help="RSI oversold levels (enhanced only)")
+    parser.add_argument("--rsi-uppers", type=float, nargs="+", default=[70], help="RSI overbought levels (enhanced only)")
+    parser.add_argument("--engine", choices=["vectorized", "backtrader"], default="vectorized")
+    parser.add_argument("--output-dir", type=str, default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument("--cache-dir", type=str, default=str(DEFAULT_CACHE_DIR))
+    parser.add_argument("--no-cache", action="store_true", help="recompute every window")
+    args = parser.parse_args(argv)
+
+    grid = build_grid(args.strategy, args.periods, args.devfactors, args.stakes,
+                      args.rsi_periods, args.rsi_lowers, args.rsi_uppers)
+    run_walkforward(
+        args.symbol, args.start, args.end, grid,
+        train_months=args.train_months, test_months=args.test_months, step_months=args.step_months,
+        strategy=args.strategy, initial_cash=args.cash, engine=args.engine, objective=args.objective,
+        output_dir=args.output_dir, cache=ResultCache(args.cache_dir, enabled=not args.no_cache),
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,271 @@
+# DataPipeline/crypto.py
+
+"""
+Crypto prices from Binance (or CRYPTO_EXCHANGE) through ccxt.
+
+* fetch_crypto pages through one symbol's candles sequentially.
+* fetch_crypto_trades pages through recent trades (ticks).
+* backfill is the bulk mode.  It splits [since, until) into windows of
+  one page (PAGE_LIMIT candles) each and fetches every window of every
+  symbol concurrently over one shared ccxt async client.  That client
+  loads its markets once, and its built-in throttle keeps all requests
+  under the exchange rate limit.  A semaphore caps the requests in
+  flight.  Pages are written straight into a preallocated structured
+  array (DataPipeline/intraday.py's BAR_DTYPE) rather than collected as
+  lists, and the result can go directly into the IntradayStore.
+
+    python DataPipeline/crypto.py backfill BTC/USDT ETH/USDT --timeframe 1m --since 2025-01-01
+    python DataPipeline/crypto.py backfill BTC/USDT --timeframe 1m --since 2025-01-01 --fake
+
+--fake runs against DataPipeline/fake_exchange.py and a temporary store.
+"""
+
+import os
 import time
+import asyncio
+import argparse
+import functools
+import tempfile
 from datetime import datetime
-from typing import List
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from DataPipeline.intraday import BAR_DTYPE
+
+# ccxt and pandas are imported on first use.
+
+EXCHANGE_ID = os.getenv("CRYPTO_EXCHANGE", "binance")
+PAGE_LIMIT = 1000
+RETRIES = 4
+
+
+@functools.lru_cache(maxsize=None)
+def get_exchange():
+    """The shared synchronous ccxt client, so markets are loaded once per process."""
+    import ccxt
+
+    return getattr(ccxt, EXCHANGE_ID)({"enableRateLimit": True})
 
-import ccxt
-import pandas as pd
 
+def _to_ms(value) -> Optional[int]:
+    """Epoch milliseconds for a datetime, date string or ms int (None passes through)."""
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    return int(np.datetime64(value, "ms").astype(np.int64))
 
-def fetch_crypto(symbol: str) -> pd.DataFrame:
-    """Fetch daily OHLCV for a crypto symbol using ccxt (Binance)."""
-    exchange = ccxt.binance()
-    all_rows: List[List] = []
-    since = None
+
+def _fill(out: np.ndarray, page) -> int:
+    """Copy ccxt OHLCV rows [[ts_ms, o, h, l, c, v], ...] into `out`; returns the row count."""
+    rows = np.asarray(page, dtype=np.float64).reshape(-1, 6)
+    n = len(rows)
+    out["ts"][:n] = rows[:, 0].astype(np.int64) * 1_000_000
+    for i, name in enumerate(("open", "high", "low", "close", "volume"), start=1):
+        out[name][:n] = rows[:, i]
+    return n
+
+
+def _frame(records: np.ndarray):
+    import pandas as pd
+
+    index = pd.DatetimeIndex(records["ts"].view("datetime64[ns]"), name="Date")
+    return pd.DataFrame({name.capitalize(): records[name] for name in BAR_DTYPE.names[1:]}, index=index)
+
+
+def fetch_crypto(symbol: str, since=None, timeframe: str = "1d", exchange=None):
+    """
+    Fetch OHLCV for a crypto symbol using ccxt (Binance).
+    - since: datetime (or epoch milliseconds) of the first bar wanted; None
+      pages through the whole history.  Incremental ingestion passes the
+      stored watermark so only the missing bars are downloaded.
+    - timeframe: bar size; daily by default, "1m" etc. for the intraday store.
+    Returns a DataFrame of Open/High/Low/Close/Volume indexed by Date (UTC).
+    """
+    exchange = exchange or get_exchange()
+    step = exchange.parse_timeframe(timeframe) * 1000
+    since = _to_ms(since)
+    pages: List[np.ndarray] = []
     while True:
-        data = exchange.fetch_ohlcv(symbol, timeframe="1d", since=since, limit=1000)
+        data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=PAGE_LIMIT)
         if not data:
             break
-        all_rows.extend(data)
-        since = data[-1][0] + 24 * 60 * 60 * 1000
-        if len(data) < 1000:
+        page = np.empty(len(data), dtype=BAR_DTYPE)
+        _fill(page, data)
+        pages.append(page)
+        since = data[-1][0] + step
+        if len(data) < PAGE_LIMIT:
+            break
+    return _frame(np.concatenate(pages) if pages else np.empty(0, dtype=BAR_DTYPE))
+
+
+def fetch_crypto_trades(symbol: str, since=None, until=None, exchange=None):
+    """
+    Fetch individual trades (ticks) for a crypto symbol from Binance, as a
+    DataFrame of Price and Size indexed by trade time (UTC).  `since`
+    defaults to the last hour; paging stops at `until` (default: now).
+    """
+    import pandas as pd
+
+    exchange = exchange or get_exchange()
+    now = exchange.milliseconds()
+    since, until = _to_ms(since), _to_ms(until)
+    since = now - 3_600_000 if since is None else since
+    until = now if until is None else until
+
+    rows: List[tuple] = []
+    while since < until:
+        trades = exchange.fetch_trades(symbol, since=since, limit=1000)
+        if not trades:
+            break
+        last = trades[-1]["timestamp"]
+        if len(trades) < 1000:
+            rows.extend((t["timestamp"], t["price"], t["amount"]) for t in trades)
             break
-        time.sleep(exchange.rateLimit / 1000)
+        if last == trades[0]["timestamp"]:
+            # A whole page inside one millisecond: keep it and move on
+            rows.extend((t["timestamp"], t["price"], t["amount"]) for t in trades)
+            since = last + 1
+        else:
+            # The last millisecond may continue on the next page; fetch it again there
+            rows.extend((t["timestamp"], t["price"], t["amount"]) for t in trades if t["timestamp"] < last)
+            since = last
 
-    df = pd.DataFrame(all_rows, columns=["Date", "Open", "High", "Low", "Close", "Volume"])
+    df = pd.DataFrame(rows, columns=["Date", "Price", "Size"])
+    df = df[df["Date"] <= until]
     df["Date"] = pd.to_datetime(df["Date"], unit="ms")
-    df.set_index("Date", inplace=True)
-    return df
+    return df.set_index("Date")
+
+
+# --- concurrent windowed backfill ------------------------------------------------
+
+def windows(since_ms: int, until_ms: int, step_ms: int, limit: int = PAGE_LIMIT) -> List[Tuple[int, int]]:
+    """[start, end) ranges of at most `limit` candles covering [since_ms, until_ms)."""
+    span = step_ms * limit
+    return [(t, min(t + span, until_ms)) for t in range(since_ms, until_ms, span)]
+
+
+async def _request(exchange, semaphore: asyncio.Semaphore, symbol: str, timeframe: str,
+                   since: int, limit: int, retries: int = RETRIES):
+    """fetch_ohlcv with at most `semaphore` requests in flight and retries on network errors."""
+    import ccxt
+    from DataPipeline.scheduler import backoff_delay
+
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                return await exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+        except (ccxt.NetworkError, ccxt.RateLimitExceeded, ConnectionError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff_delay(attempt, base=0.5, cap=10.0))
+
+
+async def fetch_window(exchange, semaphore: asyncio.Semaphore, symbol: str, timeframe: str,
+                       start: int, end: int, limit: int = PAGE_LIMIT) -> np.ndarray:
+    """Candles with start <= ts < end (ms), paged into one preallocated record array."""
+    step = exchange.parse_timeframe(timeframe) * 1000
+    out = np.empty(-(-(end - start) // step), dtype=BAR_DTYPE)
+    n, since = 0, start
+    while since < end and n < len(out):
+        page = await _request(exchange, semaphore, symbol, timeframe, since, min(limit, len(out) - n))
+        page = [row for row in page if row[0] < end] if page and page[-1][0] >= end else page
+        if not page:
+            break
+        n += _fill(out[n:], page)
+        since = int(page[-1][0]) + step
+    return out[:n]
+
+
+async def _first_candle(exchange, semaphore, symbol: str, timeframe: str) -> Optional[int]:
+    page = await _request(exchange, semaphore, symbol, timeframe, 0, 1)
+    return int(page[0][0]) if page else None
+
+
+async def backfill(exchange, symbols, timeframe: str = "1m", since=None, until=None,
+                   concurrency: int = 8, store=None, limit: int = PAGE_LIMIT) -> Dict[str, object]:
+    """
+    Fetch `symbols` over [since, until) with every window in flight at once
+    (at most `concurrency` requests at a time) on the one `exchange`.
+    `since` may be a dict of per-symbol starts; None starts at the first
+    listed candle.  Returns {symbol: records}, or {symbol: rows written}
+    when `store` (an IntradayStore) is given.
+    """
+    await exchange.load_markets()
+    semaphore = asyncio.Semaphore(concurrency)
+    step = exchange.parse_timeframe(timeframe) * 1000
+    until_ms = _to_ms(until) if until is not None else exchange.milliseconds()
+    until_ms -= until_ms % step  # only closed candles
+
+    async def one(symbol: str):
+        start = _to_ms(since.get(symbol) if isinstance(since, dict) else since)
+        if start is None:
+            start = await _first_candle(exchange, semaphore, symbol, timeframe)
+            if start is None:
+                return symbol, np.empty(0, dtype=BAR_DTYPE)
+        start -= start % step
+        parts = await asyncio.gather(*(fetch_window(exchange, semaphore, symbol, timeframe, lo, hi, limit)
+                                       for lo, hi in windows(start, until_ms, step, limit)))
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=BAR_DTYPE)
+        if store is not None:
+            return symbol, store.write(symbol, timeframe, records)
+        return symbol, records
+
+    return dict(await asyncio.gather(*(one(symbol) for symbol in symbols)))
+
+
+async def run_backfill(symbols, timeframe: str = "1m", since=None, until=None,
+                       concurrency: int = 8, store=None, exchange=None) -> Dict[str, object]:
+    """backfill() on a new shared ccxt async client (or `exchange`), closed afterwards."""
+    if exchange is None:
+        import ccxt.async_support as ccxt_async
+        exchange = getattr(ccxt_async, EXCHANGE_ID)({"enableRateLimit": True})
+    try:
+        return await backfill(exchange, symbols, timeframe, since, until, concurrency, store)
+    finally:
+        await exchange.close()
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Crypto candle backfill into the intraday store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fill = sub.add_parser("backfill", help="fetch candle history concurrently in windows")
+    fill.add_argument("symbols", nargs="+", help="exchange symbols, e.g. BTC/USDT")
+    fill.add_argument("--timeframe", default="1m", help='candle size: "1m", "5m", "1h", "1d", ...')
+    fill.add_argument("--since", type=str, default=None, help="first candle (default: first listed)")
+    fill.add_argument("--until", type=str, default=None, help="stop before this time (default: now)")
+    fill.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    fill.add_argument("--fake", action="store_true", help="use the in-process fake exchange and a temp store")
+    args = parser.parse_args(argv)
+
+    from DataPipeline.intraday import IntradayStore
+
+    exchange = None
+    tmp = tempfile.TemporaryDirectory() if args.fake else None
+    if args.fake:
+        from DataPipeline.fake_exchange import FakeExchange
+        exchange = FakeExchange(error_rate=0.02, seed=0)
+    store = IntradayStore(tmp.name if tmp else None)
+
+    t0 = time.perf_counter()
+    counts = asyncio.run(run_backfill(args.symbols, args.timeframe, args.since, args.until,
+                                      args.concurrency, store, exchange))
+    elapsed = time.perf_counter() - t0
+    for symbol, rows in counts.items():
+        print(f"{symbol:<12}{rows:>12,} {args.timeframe} candles  last {store.last_ts(symbol, args.timeframe)}")
+    total = sum(counts.values())
+    line = f"{total:,} candles in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f}/s) into {store.root}"
+    if exchange is not None:
+        line += f"; {exchange.requests} requests, {exchange.errors} retried, max {exchange.max_in_flight} in flight"
+    print(line)
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
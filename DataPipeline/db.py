@@ -1,9 +1,6 @@
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
 from dotenv import load_dotenv
 
 # Load .env variables (e.g. DB_PATH)
@@ -29,10 +26,48 @@ def resolve_db_path() -> Path:
 # Resolve and construct DB path
 DB_PATH = resolve_db_path()
 
-# Create the SQLite engine
-engine = create_engine(
-    f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False}
-)
+_engine = None
+_session_factory = None
+
+
+def get_engine():
+    """The SQLite engine, created on first use so importing this module stays cheap."""
+    global _engine
+    if _engine is None:
+        from sqlalchemy import create_engine, event
+
+        _engine = create_engine(
+            f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False}
+        )
+        event.listen(_engine, "connect", _set_sqlite_pragmas)
+    return _engine
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune every new connection for bulk loads that run alongside readers:
+    WAL lets the API and backtests keep reading while ingestion writes,
+    busy_timeout waits for the write lock instead of failing with
+    "database is locked", and synchronous=NORMAL is safe under WAL.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    cursor.close()
+
+
+def __getattr__(name):
+    # `engine` and `SessionLocal` are built lazily on first access
+    global _session_factory
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        if _session_factory is None:
+            from sqlalchemy.orm import sessionmaker
 
-# Create a configured session class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+        return _session_factory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,96 @@
+# DataPipeline/fake_exchange.py
+
+"""
+In-process stand-in for a ccxt async exchange, for exercising the crypto
+backfill without the network.  FakeExchange implements the slice of
+ccxt.async_support.Exchange that DataPipeline/crypto.py uses
+(load_markets, parse_timeframe, milliseconds, fetch_ohlcv, close).
+
+Candles are a deterministic function of (symbol, timestamp), so any two
+windows agree where they overlap and a backfill can be checked against
+candles(symbol, ...) directly.  Each request sleeps a random latency,
+fails with probability `error_rate`, and is counted; `max_in_flight` and
+the request timestamps show how many ran concurrently and how fast.
+"""
+
+import asyncio
+import random
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3_600, "d": 86_400, "w": 604_800}
+
+
+class FakeExchange:
+    """Subset of ccxt.async_support.Exchange backed by synthetic candles."""
+
+    id = "fake"
+
+    def __init__(self, latency=(0.005, 0.02), error_rate: float = 0.0,
+                 listed_ms: int = 1_500_000_000_000, rate_limit_ms: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.listed_ms = listed_ms      # first candle of every symbol
+        self.rateLimit = rate_limit_ms  # ms between requests, as ccxt's attribute
+        self._rng = random.Random(seed)
+        self._last_request = 0.0
+        self._throttle = asyncio.Lock()
+        self.markets_loaded = 0
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    @staticmethod
+    def parse_timeframe(timeframe: str) -> int:
+        """Seconds per candle, like ccxt.Exchange.parse_timeframe."""
+        return int(timeframe[:-1]) * _UNIT_SECONDS[timeframe[-1]]
+
+    def milliseconds(self) -> int:
+        return int(time.time() * 1000)
+
+    async def load_markets(self, reload: bool = False) -> Dict[str, dict]:
+        self.markets_loaded += 1
+        return {}
+
+    async def close(self):
+        self.closed = True
+
+    def candles(self, symbol: str, timeframe: str, since: int, limit: int) -> List[list]:
+        """The candles a perfect exchange returns: [ts_ms, open, high, low, close, volume]."""
+        step = self.parse_timeframe(timeframe) * 1000
+        first = max(since, self.listed_ms)
+        first += -(first - self.listed_ms) % step  # align to the candle grid
+        ts = first + step * np.arange(limit, dtype=np.int64)
+        ts = ts[ts <= self.milliseconds() - step]
+        phase = zlib.crc32(symbol.encode()) % 1000
+        close = 100.0 * np.exp(0.2 * np.sin(ts / 8.64e7 + phase) + 0.01 * np.sin(ts / 6e5))
+        open_ = 100.0 * np.exp(0.2 * np.sin((ts - step) / 8.64e7 + phase) + 0.01 * np.sin((ts - step) / 6e5))
+        rows = np.column_stack([ts, open_, np.maximum(open_, close) * 1.001,
+                                np.minimum(open_, close) * 0.999, close, (ts // step) % 997 + 1.0])
+        return rows.tolist()
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", since: Optional[int] = None,
+                          limit: int = 1000, params=None) -> List[list]:
+        if self.rateLimit:
+            async with self._throttle:
+                wait = self._last_request + self.rateLimit / 1000 - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_request = time.monotonic()
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._rng.uniform(*self.latency))
+            if self._rng.random() < self.error_rate:
+                self.errors += 1
+                raise ConnectionError(f"fake exchange: transient error for {symbol}")
+            return self.candles(symbol, timeframe, self.listed_ms if since is None else since, limit)
+        finally:
+            self.in_flight -= 1
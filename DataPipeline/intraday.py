@@ -0,0 +1,308 @@
+# DataPipeline/intraday.py
+
+"""
+Intraday prices: minute bars and trade ticks in a time-partitioned store.
+
+Layout (one raw NumPy record file per symbol, interval and UTC month):
+
+    <root>/<SYMBOL>/<interval>/<YYYY-MM>.npy
+
+`interval` is a bar size ("1m", "5m", "1h", ...) holding BAR_DTYPE records
+(48 bytes: ts + OHLCV) or "tick" holding TICK_DTYPE records (24 bytes: ts,
+price, size).  ts is int64 nanoseconds since the epoch (UTC) and every
+partition is sorted by it.  A month of one-minute bars is ~2 MB, and
+partitions are opened with mmap_mode="r", so chunks() streams any date
+range in fixed-size slices and readers never hold more than one chunk.
+Writes rewrite only the months they touch, atomically.
+
+The root is INTRADAY_PATH (default DataPipeline/intraday/).
+
+    python DataPipeline/intraday.py ingest AAPL --source yahoo --interval 1m
+    python DataPipeline/intraday.py ingest BTC/USDT --source crypto --interval 1m --since 2025-01-01
+    python DataPipeline/intraday.py ingest BTC/USDT --source crypto --interval tick --since 2025-06-01
+    python DataPipeline/intraday.py ingest SYN --source synthetic --interval 1m --days 365
+    python DataPipeline/intraday.py info SYN
+
+Replay them through the live trader's rules with Backtester/replay.py.
+"""
+
+import os
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional
+import sys
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
+
+DATA_DIR = Path(__file__).parent
+TICK = "tick"
+
+BAR_DTYPE = np.dtype([("ts", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+                      ("close", "<f8"), ("volume", "<f8")])
+TICK_DTYPE = np.dtype([("ts", "<i8"), ("price", "<f8"), ("size", "<f8")])
+
+CHUNK_ROWS = 65_536
+
+# Incremental ingestion re-fetches this much before the stored watermark
+RECONCILE = timedelta(minutes=5)
+
+_UNITS = {"s": "s", "m": "m", "h": "h", "d": "D"}
+
+
+def resolve_intraday_path() -> Path:
+    """Return the intraday store root, defaulting to DataPipeline/intraday."""
+    configured = os.getenv("INTRADAY_PATH")
+    if not configured:
+        return DATA_DIR / "intraday"
+    candidate = Path(configured)
+    return candidate if candidate.is_absolute() else DATA_DIR / candidate
+
+
+def dtype_for(interval: str) -> np.dtype:
+    return TICK_DTYPE if interval == TICK else BAR_DTYPE
+
+
+def interval_ns(interval: str) -> int:
+    """Length of a bar interval such as "1m", "5m" or "1h" in nanoseconds."""
+    step = np.timedelta64(int(interval[:-1]), _UNITS[interval[-1].lower()])
+    return int(step.astype("timedelta64[ns]").astype(np.int64))
+
+
+def _ns(value) -> Optional[int]:
+    """int64 ns since the epoch for a date/datetime/string bound, or None."""
+    if value is None:
+        return None
+    return int(np.datetime64(value, "ns").astype(np.int64))
+
+
+def _end_ns(value) -> Optional[int]:
+    """Like _ns, but a bare date ("2025-06-30") covers that whole day."""
+    if value is None:
+        return None
+    end = np.datetime64(value)
+    if np.datetime_data(end.dtype)[0] in ("Y", "M", "W", "D"):
+        return _ns(end.astype("datetime64[D]") + np.timedelta64(1, "D")) - 1
+    return _ns(end)
+
+
+def _month(ts_ns: np.ndarray) -> np.ndarray:
+    return ts_ns.astype("datetime64[ns]").astype("datetime64[M]")
+
+
+def frame_records(df, interval: str) -> np.ndarray:
+    """
+    Records for a DataFrame indexed by (tz-aware or UTC-naive) timestamps:
+    OHLCV columns for bars, price/size for ticks.
+    """
+    import pandas as pd
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    out = np.empty(len(df), dtype=dtype_for(interval))
+    out["ts"] = index.values.astype("datetime64[ns]").view(np.int64)
+    columns = {name: name.capitalize() for name in out.dtype.names if name != "ts"}
+    for name, col in columns.items():
+        source = df[col] if col in df.columns else df[name]
+        out[name] = source.to_numpy(dtype=np.float64)
+    return out
+
+
+class IntradayStore:
+    """Month-partitioned record files per symbol and interval (see module docstring)."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else resolve_intraday_path()
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / symbol.upper().replace("/", "-") / interval
+
+    def symbols(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def intervals(self, symbol: str) -> List[str]:
+        base = self.root / symbol.upper().replace("/", "-")
+        return sorted(p.name for p in base.iterdir() if p.is_dir()) if base.is_dir() else []
+
+    def partitions(self, symbol: str, interval: str, start=None, end=None) -> List[Path]:
+        """Partition files overlapping [start, end], oldest first."""
+        base = self._dir(symbol, interval)
+        if not base.is_dir():
+            return []
+        first = None if start is None else str(np.datetime64(start, "M"))
+        last = None if end is None else str(np.datetime64(end, "M"))
+        return [p for p in sorted(base.glob("*.npy"))
+                if (first is None or p.stem >= first) and (last is None or p.stem <= last)]
+
+    def write(self, symbol: str, interval: str, records: np.ndarray) -> int:
+        """
+        Merge `records` into the store.  In every month they touch, stored
+        rows inside the new rows' [first, last] ts range are replaced, so
+        re-ingesting an overlapping window never duplicates data.
+        Returns the number of records written.
+        """
+        records = np.sort(np.asarray(records, dtype=dtype_for(interval)), order="ts", kind="stable")
+        if not len(records):
+            return 0
+        base = self._dir(symbol, interval)
+        base.mkdir(parents=True, exist_ok=True)
+        months = _month(records["ts"])
+        bounds = np.flatnonzero(np.diff(months.astype(np.int64))) + 1
+        for part in np.split(records, bounds):
+            path = base / f"{_month(part['ts'][:1])[0]}.npy"
+            if path.exists():
+                old = np.load(path)
+                keep = (old["ts"] < part["ts"][0]) | (old["ts"] > part["ts"][-1])
+                part = np.sort(np.concatenate([old[keep], part]), order="ts", kind="stable")
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, part, allow_pickle=False)
+            os.replace(tmp, path)
+        return len(records)
+
+    def last_ts(self, symbol: str, interval: str) -> Optional[np.datetime64]:
+        """Watermark: the latest stored timestamp, or None."""
+        parts = self.partitions(symbol, interval)
+        if not parts:
+            return None
+        ts = np.load(parts[-1], mmap_mode="r")["ts"]
+        return np.datetime64(int(ts[-1]), "ns") if len(ts) else None
+
+    def chunks(self, symbol: str, interval: str, start=None, end=None,
+               rows: int = CHUNK_ROWS) -> Iterator[np.ndarray]:
+        """
+        Yield read-only memmap slices of at most `rows` records with
+        start <= ts <= end, in time order.  Only the current chunk's pages
+        are touched, so memory stays flat however long the range is.
+        """
+        lo_ns, hi_ns = _ns(start), _end_ns(end)
+        for path in self.partitions(symbol, interval, start, end):
+            data = np.load(path, mmap_mode="r")
+            ts = data["ts"]
+            lo = 0 if lo_ns is None else int(np.searchsorted(ts, lo_ns, side="left"))
+            hi = len(ts) if hi_ns is None else int(np.searchsorted(ts, hi_ns, side="right"))
+            for i in range(lo, hi, rows):
+                yield data[i:min(i + rows, hi)]
+
+    def read(self, symbol: str, interval: str, start=None, end=None):
+        """The records in [start, end] as a DataFrame indexed by Date (UTC)."""
+        import pandas as pd
+
+        parts = list(self.chunks(symbol, interval, start, end))
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=dtype_for(interval))
+        index = pd.DatetimeIndex(records["ts"].view("datetime64[ns]"), name="Date")
+        return pd.DataFrame({name.capitalize(): records[name] for name in records.dtype.names
+                             if name != "ts"}, index=index)
+
+
+# --- sources ----------------------------------------------------------------
+
+def synthetic_records(interval: str, start, days: int, seed: int = 0,
+                      ticks_per_minute: int = 20) -> np.ndarray:
+    """Random-walk bars (24/7) or ticks, for offline runs and benchmarks."""
+    rng = np.random.default_rng(seed)
+    t0 = _ns(start)
+    if interval == TICK:
+        n = days * 1440 * ticks_per_minute
+        gaps = rng.exponential(60e9 / ticks_per_minute, n).astype(np.int64) + 1
+        out = np.empty(n, dtype=TICK_DTYPE)
+        out["ts"] = t0 + np.cumsum(gaps)
+        out["price"] = 100.0 * np.exp(np.cumsum(rng.normal(0, 2e-4, n)))
+        out["size"] = rng.integers(1, 500, n)
+        return out
+    step = interval_ns(interval)
+    n = days * int(86_400e9 // step)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 8e-4, n)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    spread = np.abs(rng.normal(0, 4e-4, n))
+    out = np.empty(n, dtype=BAR_DTYPE)
+    out["ts"] = t0 + step * np.arange(n, dtype=np.int64)
+    out["open"], out["close"] = open_, close
+    out["high"] = np.maximum(open_, close) * (1 + spread)
+    out["low"] = np.minimum(open_, close) * (1 - spread)
+    out["volume"] = rng.integers(1_000, 100_000, n)
+    return out
+
+
+def fetch_records(source: str, symbol: str, interval: str, since: Optional[datetime]) -> np.ndarray:
+    """Download intraday bars (yahoo, crypto) or trade ticks (crypto) since `since`."""
+    if source == "yahoo":
+        if interval == TICK:
+            raise ValueError("Yahoo Finance has no tick data; use --source crypto")
+        from DataPipeline.pipeline import fetch_price_yahoo
+        # Yahoo keeps about 30 days of 1m bars and serves at most 7 per request
+        df = fetch_price_yahoo(symbol, period="7d", start=since, interval=interval)
+        return frame_records(df, interval)
+    if source == "crypto":
+        from DataPipeline import crypto
+        if interval == TICK:
+            return frame_records(crypto.fetch_crypto_trades(symbol, since), interval)
+        return frame_records(crypto.fetch_crypto(symbol, since, timeframe=interval), interval)
+    raise ValueError(f"Unknown source '{source}'")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Intraday bar and tick store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="download (or generate) bars/ticks into the store")
+    ingest.add_argument("symbols", nargs="+")
+    ingest.add_argument("--source", choices=["yahoo", "crypto", "synthetic"], default="yahoo")
+    ingest.add_argument("--interval", default="1m", help='bar size such as "1m" or "5m", or "tick"')
+    ingest.add_argument("--since", type=str, default=None,
+                        help="first timestamp to fetch (default: the stored watermark)")
+    ingest.add_argument("--days", type=int, default=30, help="synthetic history length")
+
+    info = sub.add_parser("info", help="list stored intervals and partitions")
+    info.add_argument("symbols", nargs="*")
+    args = parser.parse_args(argv)
+
+    store = IntradayStore()
+    if args.command == "info":
+        for symbol in args.symbols or store.symbols():
+            for interval in store.intervals(symbol):
+                parts = store.partitions(symbol, interval)
+                rows = sum(len(np.load(p, mmap_mode="r")) for p in parts)
+                size = sum(p.stat().st_size for p in parts)
+                print(f"{symbol:<10}{interval:<6}{len(parts):>4} partitions{rows:>12,} rows"
+                      f"{size / 2 ** 20:>9.1f} MiB  {parts[0].stem} .. {parts[-1].stem}  "
+                      f"last {store.last_ts(symbol, interval)}")
+        return
+
+    since = {}
+    for symbol in args.symbols:
+        since[symbol] = datetime.fromisoformat(args.since) if args.since else None
+        watermark = store.last_ts(symbol, args.interval)
+        if since[symbol] is None and watermark is not None:
+            since[symbol] = watermark.astype("datetime64[us]").item() - RECONCILE
+
+    if args.source == "crypto" and args.interval != TICK:
+        # Every symbol's history in concurrent windows on one exchange client
+        import asyncio
+        from DataPipeline.crypto import run_backfill
+        counts = asyncio.run(run_backfill(args.symbols, args.interval, since, store=store))
+    else:
+        counts = {}
+        for symbol in args.symbols:
+            if args.source == "synthetic":
+                start = args.since or str(np.datetime64("today", "D") - np.timedelta64(args.days, "D"))
+                records = synthetic_records(args.interval, start, args.days, seed=sum(map(ord, symbol)))
+            else:
+                records = fetch_records(args.source, symbol, args.interval, since[symbol])
+            counts[symbol] = store.write(symbol, args.interval, records)
+    for symbol, written in counts.items():
+        print(f"Stored {written:,} {args.interval} records for {symbol} under {store._dir(symbol, args.interval)}")
+
+if __name__ == "__main__":
+    main()
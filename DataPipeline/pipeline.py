@@ -1,10 +1,11 @@
 # DataPipeline/pipeline.py
 
+from __future__ import annotations
+
 import time
 import os
 from pathlib import Path
 import sys
-import pandas as pd
 from datetime import datetime, timedelta
 import argparse
 
@@ -12,32 +13,57 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-import yfinance as yf  # yfinance handles rate‐limiting/retries
-from DataPipeline.db import engine   # SQLAlchemy engine from DataPipeline/db.py
 from dotenv import load_dotenv
 
+# pandas, yfinance and the price store (SQLAlchemy) are imported on first
+# use, so `pipeline.py --help` and importers of this module start fast.
+
 # Load environment variables (DB_PATH, etc.) from DataPipeline/.env
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
 
+# Incremental runs re-fetch this many calendar days before the watermark so
+# that bars the vendor revised after we stored them are reconciled.
+RECONCILE_DAYS = int(os.getenv("RECONCILE_DAYS", 5))
+
+# Requests per second allowed against Yahoo Finance across all workers.
+YAHOO_RATE = float(os.getenv("YAHOO_RATE", 2.0))
+
+# Requests per second allowed against the crypto exchange (DataPipeline/crypto.py).
+CRYPTO_RATE = float(os.getenv("CRYPTO_RATE", 5.0))
+
 
-def parse_arguments() -> argparse.Namespace:
+def parse_arguments(argv=None, prog=None) -> argparse.Namespace:
     """Parse command-line arguments for start and end dates."""
-    parser = argparse.ArgumentParser(description="Ingest market data")
+    parser = argparse.ArgumentParser(prog=prog, description="Ingest market data")
     parser.add_argument("--start", type=str, help="start date YYYY-MM-DD")
     parser.add_argument("--end", type=str, help="end date YYYY-MM-DD")
-    return parser.parse_args()
+    parser.add_argument(
+        "--full", action="store_true",
+        help="re-download the full history instead of appending from the last stored date",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="concurrent fetch threads")
+    return parser.parse_args(argv)
 
 
-def fetch_price_yahoo(symbol: str, period: str = "max") -> pd.DataFrame:
+def fetch_price_yahoo(symbol: str, period: str = "max", start: datetime = None,
+                      interval: str = "1d") -> pd.DataFrame:
     """
     Download OHLCV for `symbol` using yfinance.
     - period: string like "1y", "2y", "max", etc.
+    - start: if given, only bars from this date onwards are requested
+      (overrides `period`; used for incremental ingestion).
+    - interval: bar size; "1m"/"5m"/... are stored by DataPipeline/intraday.py.
     Returns a DataFrame with a timezone-aware Date index (we strip tz later),
     and columns: ["Open","High","Low","Close","Volume","Dividends","Stock Splits","Adj Close"].
     """
+    import yfinance as yf  # yfinance handles rate‐limiting/retries
+
     ticker = yf.Ticker(symbol)
-    df = ticker.history(period=period, interval="1d", auto_adjust=False)
+    if start is not None:
+        df = ticker.history(start=start.strftime("%Y-%m-%d"), interval=interval, auto_adjust=False)
+    else:
+        df = ticker.history(period=period, interval=interval, auto_adjust=False)
 
     # Ensure the index is named "Date"
     df.index.name = "Date"
@@ -47,29 +73,86 @@ def fetch_price_yahoo(symbol: str, period: str = "max") -> pd.DataFrame:
     return df
 
 
-def save_to_db(symbol: str, df: pd.DataFrame, start_date: datetime, end_date: datetime):
+def _clip(df: pd.DataFrame, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """Strip the tz from the index and keep rows within [start_date, end_date]."""
+    # Remove timezone information so comparisons to naive datetimes work
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    mask = (df.index >= start_date) & (df.index <= end_date)
+    return df.loc[mask]
+
+
+def save_to_db(symbol: str, df: pd.DataFrame, start_date: datetime, end_date: datetime,
+               upsert: bool = False, store=None):
     """
-    Write DataFrame to a SQL table named after the symbol (overwrite if exists).
+    Write DataFrame to the price store (PRICE_STORE: a SQL table or a columnar
+    directory named after the symbol), overwriting any existing data -- or,
+    with upsert=True, only the rows dated on/after the first row of `df`.
     We strip the tz from the index before filtering by start/end dates.
+    `store` defaults to get_store() (SQLite on the DataPipeline engine).
+    Returns the number of rows written.
     """
-    # 1) Remove timezone information so comparisons to naive datetimes work
-    if df.index.tz is not None:
-        df.index = df.index.tz_localize(None)
+    from DataPipeline.store import get_store
 
-    # 2) Filter by the requested date range
-    mask = (df.index >= start_date) & (df.index <= end_date)
-    df_filtered = df.loc[mask]
+    # 1) Filter by the requested date range
+    df_filtered = _clip(df, start_date, end_date)
 
-    # 3) Uppercase the table name
+    # 2) Uppercase the table name
     table_name = symbol.upper()
 
-    # 4) Write to SQLite via SQLAlchemy engine; index label = "Date"
-    df_filtered.to_sql(name=table_name, con=engine, if_exists="replace", index_label="Date")
-    print(f"Saved {len(df_filtered)} rows for {symbol} to table `{table_name}`.")
+    # 3) Write through the configured store; SQLite uses index label = "Date"
+    store = store or get_store()
+    if upsert:
+        store.upsert(table_name, df_filtered)
+        print(f"Upserted {len(df_filtered)} rows for {symbol} into {store.backend} table `{table_name}`.")
+    else:
+        store.write(table_name, df_filtered)
+        print(f"Saved {len(df_filtered)} rows for {symbol} to {store.backend} table `{table_name}`.")
+    return len(df_filtered)
 
 
-if __name__ == "__main__":
-    args = parse_arguments()
+def fetch_since(table: str, start_date: datetime, full: bool = False, store=None):
+    """
+    First date to request for `table`: RECONCILE_DAYS before the stored
+    watermark, or None when the full history is needed.
+    """
+    import pandas as pd
+    from DataPipeline.store import get_store
+
+    store = store or get_store()
+    watermark = None if full else store.last_date(table)
+    if watermark is None:
+        return None
+    since = max(watermark - timedelta(days=RECONCILE_DAYS), pd.Timestamp(start_date))
+    print(f"  {table}: last stored {watermark.date()}, fetching from {since.date()}")
+    return since
+
+
+def fetch_yahoo_since(symbol: str, since) -> pd.DataFrame:
+    """Provider fetch() for Yahoo: full history when since is None."""
+    if since is None:
+        return fetch_price_yahoo(symbol, period="max")
+    return fetch_price_yahoo(symbol, start=since)
+
+
+def fetch_crypto_since(symbol: str, since) -> pd.DataFrame:
+    """
+    Provider fetch() for daily crypto candles via ccxt: full history when
+    since is None.  The frame gets Yahoo's columns (no dividends or splits,
+    Adj Close = Close) so it matches the CRYPTO_* tables first filled from Yahoo.
+    """
+    from DataPipeline.crypto import fetch_crypto
+
+    # ccxt returns only the latest page without a start, so page from the epoch
+    df = fetch_crypto(symbol, since=0 if since is None else since)
+    df["Dividends"] = 0.0
+    df["Stock Splits"] = 0.0
+    df["Adj Close"] = df["Close"]
+    return df[["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits", "Adj Close"]]
+
+
+def main(argv=None, prog=None):
+    args = parse_arguments(argv, prog)
     today = datetime.today()
     start_date = (
         datetime.strptime(args.start, "%Y-%m-%d")
@@ -83,37 +166,24 @@ if __name__ == "__main__":
 
     # List of symbols you want to ingest
     symbols = ["AAPL", "MSFT", "GOOGL"]
-    crypto_symbols = ["BTC-USD", "ETH-USD", "SOL-USD", "DOGE-USD"]
-
-    for sym in symbols:
-        print(f"Downloading {sym} …")
-        try:
-            # 1) Download the full history (“max”), then slice by date
-            df = fetch_price_yahoo(sym, period="max")
-            save_to_db(sym, df, start_date, end_date)
-            time.sleep(2)  # polite pause between requests
-        except Exception as e:
-            print(f"❗ Error fetching {sym}: {e}")
-            print("    Waiting 10 seconds and retrying once…")
-            time.sleep(10)
-            try:
-                df = fetch_price_yahoo(sym, period="max")
-                save_to_db(sym, df, start_date, end_date)
-                time.sleep(2)
-            except Exception as e2:
-                print(f"❌ Second attempt failed for {sym}: {e2}")
-                # Skip to next symbol without crashing
-                continue
-
-    for csym in crypto_symbols:
-        print(f"Downloading crypto {csym} …")
-        try:
-            df = fetch_price_yahoo(csym, period="max")
-            table = f"CRYPTO_{csym.replace('-', '')}"
-            save_to_db(table, df, start_date, end_date)
-            time.sleep(2)
-        except Exception as e:
-            print(f"❗ Error fetching {csym}: {e}")
-            continue
+    crypto_symbols = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "DOGE/USDT"]
+
+    from DataPipeline.scheduler import IngestionScheduler, Job, Provider, print_report
+
+    # One token bucket per vendor
+    yahoo = Provider("yahoo", fetch_yahoo_since, rate=YAHOO_RATE, burst=YAHOO_RATE)
+    crypto = Provider("crypto", fetch_crypto_since, rate=CRYPTO_RATE, burst=CRYPTO_RATE)
+    jobs = [Job(sym, sym, yahoo) for sym in symbols]
+    # USDT pairs keep the CRYPTO_<BASE>USD tables the backtests already read
+    jobs += [Job(csym, f"CRYPTO_{csym.split('/')[0]}USD", crypto) for csym in crypto_symbols]
+
+    scheduler = IngestionScheduler(start_date, end_date, workers=args.workers, full=args.full)
+    t0 = time.perf_counter()
+    timings = scheduler.run(jobs)
+    print_report(timings, time.perf_counter() - t0)
 
     print("Data ingestion complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+# DataPipeline/store.py
+
+"""
+Pluggable price storage.
+
+Two backends share the same small interface (write / upsert / last_date /
+read / read_arrays / symbols):
+
+* SQLiteStore   -- one table per symbol in market_data.db, bulk-loaded.
+* ColumnarStore -- one directory per symbol holding a raw NumPy file per
+                   column plus a manifest.json.  Files are opened with
+                   mmap_mode="r", so reads are zero-copy views, and the sorted
+                   int64 Date column answers date-range queries with a binary
+                   search instead of loading and filtering the whole table.
+
+The backend is chosen with PRICE_STORE ("sqlite" or "columnar") and the
+columnar root with STORE_PATH, both read from the environment / .env the
+same way DB_PATH is.
+
+Migrate an existing database:
+    python DataPipeline/store.py --to-columnar
+"""
+
+import os
+import json
+import shutil
+import argparse
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
+
+DATA_DIR = Path(__file__).parent
+MANIFEST = "manifest.json"
+
+# How SQLAlchemy's DATETIME type (and therefore pandas.to_sql) stores dates
+# in SQLite; text in this format sorts chronologically.
+SQLITE_DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def resolve_store_path() -> Path:
+    """Return the columnar store root, defaulting to DataPipeline/columnar."""
+    configured = os.getenv("STORE_PATH")
+    if not configured:
+        return DATA_DIR / "columnar"
+    candidate = Path(configured)
+    return candidate if candidate.is_absolute() else DATA_DIR / candidate
+
+
+def _sql_type(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "BIGINT"
+    if pd.api.types.is_float_dtype(dtype):
+        return "FLOAT"
+    return "TEXT"
+
+
+def _bounds(start, end):
+    start = pd.to_datetime(start) if start is not None else None
+    end = pd.to_datetime(end) if end is not None else None
+    return start, end
+
+
+class SQLiteStore:
+    """
+    One SQLite table per symbol, Date as PRIMARY KEY.
+
+    Writes bypass pandas.to_sql: rows go through a single executemany inside
+    one BEGIN IMMEDIATE transaction on the raw connection, so a replace or
+    upsert is atomic and readers (API, backtests) keep seeing the previous
+    version until COMMIT.  WAL and the other pragmas are set per connection
+    in DataPipeline/db.py.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, engine=None):
+        if engine is None:
+            from DataPipeline.db import get_engine
+            engine = get_engine()
+        self.engine = engine
+        self._tables = {}
+
+    def _table(self, symbol: str):
+        # Reflect each table once per store instead of on every read
+        table = self._tables.get(symbol)
+        if table is None:
+            from sqlalchemy import MetaData, Table
+            table = Table(symbol, MetaData(), autoload_with=self.engine)
+            self._tables[symbol] = table
+        return table
+
+    @contextmanager
+    def _transaction(self):
+        """Yield a cursor inside an explicit write transaction."""
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            level = conn.isolation_level
+            conn.isolation_level = None  # we issue BEGIN/COMMIT ourselves
+            cur = conn.cursor()
+            try:
+                cur.execute("BEGIN IMMEDIATE")
+                try:
+                    yield cur
+                    cur.execute("COMMIT")
+                except BaseException:
+                    cur.execute("ROLLBACK")
+                    raise
+            finally:
+                cur.close()
+                conn.isolation_level = level
+        finally:
+            raw.close()
+
+    @staticmethod
+    def _insert(cur, symbol: str, df: pd.DataFrame):
+        """executemany INSERT OR REPLACE of every row of `df` (Date from the index)."""
+        names = ", ".join(f'"{col}"' for col in ["Date", *df.columns])
+        marks = ", ".join("?" * (len(df.columns) + 1))
+        dates = pd.DatetimeIndex(df.index).strftime(SQLITE_DATE_FORMAT).tolist()
+        columns = [df[col].tolist() for col in df.columns]  # native Python scalars
+        cur.executemany(
+            f'INSERT OR REPLACE INTO "{symbol}" ({names}) VALUES ({marks})',
+            zip(dates, *columns),
+        )
+
+    def symbols(self) -> List[str]:
+        from sqlalchemy import inspect
+        return sorted(inspect(self.engine).get_table_names())
+
+    def has(self, symbol: str) -> bool:
+        from sqlalchemy import inspect
+        return inspect(self.engine).has_table(symbol.upper())
+
+    def write(self, symbol: str, df: pd.DataFrame):
+        """Replace the table for `symbol` with `df` in one transaction."""
+        symbol = symbol.upper()
+        columns = ", ".join(f'"{col}" {_sql_type(df[col].dtype)}' for col in df.columns)
+        with self._transaction() as cur:
+            cur.execute(f'DROP TABLE IF EXISTS "{symbol}"')
+            cur.execute(f'CREATE TABLE "{symbol}" ("Date" DATETIME PRIMARY KEY, {columns})')
+            self._insert(cur, symbol, df)
+        self._tables.pop(symbol, None)
+
+    def last_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Watermark: the latest stored Date for `symbol`, or None."""
+        if not self.has(symbol):
+            return None
+        from sqlalchemy import func, select
+        table = self._table(symbol.upper())
+        with self.engine.connect() as conn:
+            last = conn.execute(select(func.max(table.c.Date))).scalar()
+        return pd.Timestamp(last) if last is not None else None
+
+    def upsert(self, symbol: str, df: pd.DataFrame):
+        """
+        Replace every stored row dated on/after the first row of `df` with
+        `df`, in one transaction.  Older rows are left untouched.
+        """
+        symbol = symbol.upper()
+        if not self.has(symbol):
+            self.write(symbol, df)
+            return
+        if df.empty:
+            return
+        first = df.index.min().strftime(SQLITE_DATE_FORMAT)
+        with self._transaction() as cur:
+            # Tables written by pandas.to_sql have no key on Date; make sure
+            # the delete (and later range reads) can use an index.
+            cur.execute(f'CREATE INDEX IF NOT EXISTS "ix_{symbol}_Date" ON "{symbol}" ("Date")')
+            cur.execute(f'DELETE FROM "{symbol}" WHERE "Date" >= ?', (first,))
+            self._insert(cur, symbol, df)
+
+    def read(self, symbol: str, start=None, end=None, columns=None) -> pd.DataFrame:
+        """Rows of `symbol` with start <= Date <= end, indexed by Date."""
+        from sqlalchemy import select
+        table = self._table(symbol.upper())
+        start, end = _bounds(start, end)
+        if columns:
+            stmt = select(table.c.Date, *(table.c[col] for col in columns))
+        else:
+            stmt = select(table)
+        if start is not None:
+            stmt = stmt.where(table.c.Date >= start.to_pydatetime())
+        if end is not None:
+            stmt = stmt.where(table.c.Date <= end.to_pydatetime())
+        return pd.read_sql(stmt.order_by(table.c.Date), con=self.engine,
+                           index_col="Date", parse_dates=["Date"])
+
+    def read_arrays(self, symbol: str, start=None, end=None, columns=None) -> Dict[str, np.ndarray]:
+        df = self.read(symbol, start, end, columns)
+        arrays = {"Date": df.index.values.astype("datetime64[ns]").view(np.int64)}
+        arrays.update({col: df[col].to_numpy() for col in df.columns})
+        return arrays
+
+
+class ColumnarStore:
+    """
+    Memory-mappable column files:
+
+        <root>/<SYMBOL>/manifest.json   {"rows": n, "columns": {name: dtype}, ...}
+        <root>/<SYMBOL>/Date.npy        int64 ns since epoch, sorted ascending
+        <root>/<SYMBOL>/<column>.npy    one array per OHLCV column
+    """
+
+    backend = "columnar"
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else resolve_store_path()
+
+    def _dir(self, symbol: str) -> Path:
+        return self.root / symbol.upper()
+
+    def symbols(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / MANIFEST).is_file())
+
+    def has(self, symbol: str) -> bool:
+        return (self._dir(symbol) / MANIFEST).is_file()
+
+    def manifest(self, symbol: str) -> dict:
+        path = self._dir(symbol) / MANIFEST
+        if not path.is_file():
+            raise KeyError(f"No columnar data for {symbol} under {self.root}")
+        with open(path) as f:
+            return json.load(f)
+
+    def write(self, symbol: str, df: pd.DataFrame):
+        """Replace `symbol` with `df` (sorted by date, duplicate dates dropped)."""
+        symbol = symbol.upper()
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        dates = pd.DatetimeIndex(df.index)
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+
+        columns = {"Date": dates.values.astype("datetime64[ns]").view(np.int64)}
+        for col in df.columns:
+            columns[col] = np.ascontiguousarray(df[col].to_numpy())
+
+        # Write into a temp dir and swap it in, so readers never see half a symbol
+        final = self._dir(symbol)
+        tmp = final.with_name(f".{symbol}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name, values in columns.items():
+            np.save(tmp / f"{name}.npy", values, allow_pickle=False)
+        manifest = {
+            "symbol": symbol,
+            "rows": len(df),
+            "columns": {name: str(values.dtype) for name, values in columns.items()},
+            "first": str(dates[0]) if len(dates) else None,
+            "last": str(dates[-1]) if len(dates) else None,
+        }
+        with open(tmp / MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        old = final.with_name(f".{symbol}.old")
+        shutil.rmtree(old, ignore_errors=True)
+        if final.exists():
+            final.rename(old)
+        tmp.rename(final)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def last_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Watermark: the latest stored Date for `symbol`, or None."""
+        if not self.has(symbol):
+            return None
+        dates = np.load(self._dir(symbol) / "Date.npy", mmap_mode="r")
+        return pd.Timestamp(int(dates[-1])) if len(dates) else None
+
+    def upsert(self, symbol: str, df: pd.DataFrame):
+        """
+        Replace every stored row dated on/after the first row of `df` with
+        `df`.  The older prefix is reused as-is and the symbol is rewritten
+        atomically.
+        """
+        if not self.has(symbol):
+            self.write(symbol, df)
+            return
+        if df.empty:
+            return
+        kept = self.read(symbol, end=df.index.min() - pd.Timedelta(1, "ns"))
+        self.write(symbol, pd.concat([kept, df.reindex(columns=kept.columns)]))
+
+    def read_arrays(self, symbol: str, start=None, end=None, columns=None) -> Dict[str, np.ndarray]:
+        """
+        Zero-copy read: every column (or just `columns`) comes back as a
+        read-only memmap view sliced to start <= Date <= end via binary
+        search on the Date column.
+        """
+        manifest = self.manifest(symbol)
+        base = self._dir(symbol)
+        dates = np.load(base / "Date.npy", mmap_mode="r")
+
+        start, end = _bounds(start, end)
+        lo = 0 if start is None else int(np.searchsorted(dates, start.value, side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, end.value, side="right"))
+
+        arrays = {"Date": dates[lo:hi]}
+        for name in columns or manifest["columns"]:
+            if name != "Date":
+                arrays[name] = np.load(base / f"{name}.npy", mmap_mode="r")[lo:hi]
+        return arrays
+
+    def read(self, symbol: str, start=None, end=None, columns=None) -> pd.DataFrame:
+        """Rows of `symbol` with start <= Date <= end, indexed by Date."""
+        arrays = self.read_arrays(symbol, start, end, columns)
+        index = pd.DatetimeIndex(np.asarray(arrays.pop("Date")).view("datetime64[ns]"), name="Date")
+        return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def get_store(backend: Optional[str] = None, engine=None):
+    """Return the configured price store (PRICE_STORE, default "sqlite")."""
+    backend = (backend or os.getenv("PRICE_STORE") or "sqlite").lower()
+    if backend == "sqlite":
+        return SQLiteStore(engine)
+    if backend == "columnar":
+        return ColumnarStore()
+    raise ValueError(f"Unknown PRICE_STORE '{backend}'; expected 'sqlite' or 'columnar'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the price store")
+    parser.add_argument(
+        "--to-columnar", action="store_true",
+        help="copy every SQLite table into the columnar store",
+    )
+    args = parser.parse_args()
+
+    if args.to_columnar:
+        source = SQLiteStore()
+        target = ColumnarStore()
+        for sym in source.symbols():
+            df = source.read(sym)
+            target.write(sym, df)
+            print(f"Copied {len(df)} rows for {sym} to {target.root / sym}")
+    else:
+        parser.print_help()
@@ -0,0 +1,140 @@
+# LiveTrader/fake_ib.py
+
+"""
+In-process stand-in for the IB gateway, for exercising the live traders
+without TWS.  FakeIB implements the slice of ib_insync.IB the traders use
+(connect, historical bars, market data, orders, pendingTickersEvent) and
+uses the real ib_insync Ticker/Trade/OrderStatus objects, so the trader
+code cannot tell the difference.
+
+Prices are seeded random walks per symbol; market orders fill at the last
+price after a random latency, so some fills are slow while others are fast.
+"""
+
+import asyncio
+import math
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from eventkit import Event
+from ib_insync import BarData, OrderStatus, Ticker, TickData, Trade
+
+# IB tick type for a last-trade price
+LAST = 4
+
+
+class FakeIB:
+    """Subset of ib_insync.IB backed by simulated prices and fills."""
+
+    def __init__(self, fill_latency=(0.01, 0.5), volatility: float = 5e-4,
+                 seed: Optional[int] = None):
+        self.fill_latency = fill_latency
+        self.volatility = volatility
+        self._rng = random.Random(seed)
+        self._connected = False
+        self._next_order_id = 1
+        self._tickers: Dict[str, Ticker] = {}
+        self._prices: Dict[str, float] = {}
+        self.trades = []
+
+        self.pendingTickersEvent = Event("pendingTickersEvent")
+        self.disconnectedEvent = Event("disconnectedEvent")
+
+    # --- connection -------------------------------------------------------
+
+    async def connectAsync(self, host: str = "127.0.0.1", port: int = 7497, clientId: int = 1, **kwargs):
+        self._connected = True
+        return self
+
+    def connect(self, *args, **kwargs):
+        self._connected = True
+        return self
+
+    def isConnected(self) -> bool:
+        return self._connected
+
+    def disconnect(self):
+        if self._connected:
+            self._connected = False
+            self.disconnectedEvent.emit()
+
+    # --- data -------------------------------------------------------------
+
+    def _price(self, symbol: str) -> float:
+        if symbol not in self._prices:
+            self._prices[symbol] = 50.0 + zlib.crc32(symbol.encode()) % 450
+        return self._prices[symbol]
+
+    def reqHistoricalData(self, contract, endDateTime="", durationStr="20 D", barSizeSetting="1 day",
+                          whatToShow="ADJUSTED_LAST", useRTH=True, formatDate=1, **kwargs):
+        days = int(durationStr.split()[0])
+        rng = random.Random(zlib.crc32(contract.symbol.encode()))
+        price = self._price(contract.symbol)
+        closes = [price]
+        for _ in range(days - 1):
+            closes.append(closes[-1] * math.exp(rng.gauss(0.0, 0.01)))
+        closes.reverse()  # walk backwards from the current price
+        today = datetime.now(timezone.utc).date()
+        return [
+            BarData(date=today - timedelta(days=days - i), open=c, high=c, low=c, close=c)
+            for i, c in enumerate(closes)
+        ]
+
+    async def reqHistoricalDataAsync(self, contract, *args, **kwargs):
+        await asyncio.sleep(self._rng.uniform(0.0, 0.05))
+        return self.reqHistoricalData(contract, *args, **kwargs)
+
+    def reqMktData(self, contract, genericTickList: str = "", snapshot: bool = False,
+                   regulatorySnapshot: bool = False, mktDataOptions=None) -> Ticker:
+        ticker = Ticker(contract=contract)
+        self._tickers[contract.symbol] = ticker
+        self._price(contract.symbol)
+        return ticker
+
+    def cancelMktData(self, contract):
+        self._tickers.pop(contract.symbol, None)
+
+    async def stream(self, interval: float = 0.1, duration: Optional[float] = None):
+        """Push one last-trade tick per subscribed symbol every `interval` seconds."""
+        loop = asyncio.get_running_loop()
+        stop_at = None if duration is None else loop.time() + duration
+        while self._connected and (stop_at is None or loop.time() < stop_at):
+            now = datetime.now(timezone.utc)
+            updated = set()
+            for symbol, ticker in list(self._tickers.items()):
+                price = self._prices[symbol] * math.exp(self._rng.gauss(0.0, self.volatility))
+                self._prices[symbol] = price
+                ticker.time = now
+                ticker.last = price
+                ticker.lastSize = 100
+                ticker.ticks = [TickData(now, LAST, price, 100)]
+                updated.add(ticker)
+            if updated:
+                self.pendingTickersEvent.emit(updated)
+            await asyncio.sleep(interval)
+
+    # --- orders -----------------------------------------------------------
+
+    def placeOrder(self, contract, order) -> Trade:
+        order.orderId = self._next_order_id
+        self._next_order_id += 1
+        trade = Trade(contract, order, OrderStatus(orderId=order.orderId, status="Submitted",
+                                                   remaining=order.totalQuantity))
+        self.trades.append(trade)
+        delay = self._rng.uniform(*self.fill_latency)
+        asyncio.get_running_loop().call_later(delay, self._fill, trade)
+        return trade
+
+    def _fill(self, trade: Trade):
+        if not self._connected:
+            return
+        price = self._prices[trade.contract.symbol]
+        status = trade.orderStatus
+        status.status = "Filled"
+        status.filled = trade.order.totalQuantity
+        status.remaining = 0
+        status.avgFillPrice = status.lastFillPrice = price
+        trade.statusEvent.emit(trade)
+        trade.filledEvent.emit(trade)
@@ -0,0 +1,297 @@
+# LiveTrader/latency.py
+
+"""
+Low-overhead latency instrumentation for the live traders.
+
+Spans are measured with time.perf_counter_ns (monotonic) for these stages:
+
+    tick           whole handling of one price update
+    indicator      streaming indicator update
+    decision       entry/exit rules
+    submit         placeOrder call
+    tick_to_order  price update received -> placeOrder returned
+    fill           placeOrder returned -> order done acknowledged
+
+The hot path only reads the clock and writes one slot of a preallocated
+ring.  The ring has a single writer (the event loop), so no locks are
+needed; a background task snapshots it periodically and a worker thread
+folds the spans into per-stage HDR-style histograms (log buckets with
+linear sub-buckets, ~3% relative error) and appends them to a binary file.
+
+    python LiveTrader/latency.py report            # newest span file
+    python LiveTrader/latency.py report FILE --by-symbol
+    python LiveTrader/latency.py overhead          # cost per recorded span
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+STAGES = ("tick", "indicator", "decision", "submit", "tick_to_order", "fill")
+TICK, INDICATOR, DECISION, SUBMIT, TICK_TO_ORDER, FILL = range(len(STAGES))
+
+# On-disk record of one span
+SPAN_DTYPE = np.dtype([("stage", "u1"), ("symbol", "<u2"), ("start_ns", "<i8"), ("dur_ns", "<i8")])
+
+DEFAULT_DIR = Path(os.getenv("LATENCY_DIR", Path(__file__).resolve().parent / "latency"))
+
+now = time.perf_counter_ns
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of non-negative integer latencies (ns).
+
+    Values below 2**precision are stored exactly; above that each power of
+    two is split into 2**(precision - 1) linear sub-buckets, so the bucket
+    width is at most 2**-(precision - 1) of the value.
+    """
+
+    __slots__ = ("precision", "_half", "_max_shift", "counts", "count", "total", "min", "max")
+
+    def __init__(self, precision: int = 6, max_bits: int = 40):
+        self.precision = precision
+        self._half = 1 << (precision - 1)
+        self._max_shift = max_bits - precision
+        self.counts = [0] * ((self._max_shift + 2) * self._half)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.precision
+        if shift <= 0:
+            return value
+        if shift > self._max_shift:
+            shift = self._max_shift
+            value = (1 << (self._max_shift + self.precision)) - 1
+        return (shift << (self.precision - 1)) + (value >> shift)
+
+    def _bucket_value(self, index: int) -> int:
+        """Upper bound of a bucket."""
+        if index < 2 * self._half:
+            return index
+        shift = (index >> (self.precision - 1)) - 1
+        mantissa = index - (shift << (self.precision - 1))
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        if value < 0:
+            value = 0
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, q: float) -> int:
+        if not self.count:
+            return 0
+        target = max(1, int(np.ceil(self.count * q / 100.0)))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(self._bucket_value(i), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class LatencyRecorder:
+    """
+    Per-stage histograms plus a ring of raw spans, flushed to `path`.
+
+    Call span(stage, start_ns, symbol_id) at the end of each stage; it
+    returns the end timestamp so consecutive stages can be chained.
+    """
+
+    def __init__(self, symbols: List[str], path: Optional[Path] = None,
+                 capacity: int = 1 << 16, enabled: bool = True):
+        self.enabled = enabled
+        self.symbols = list(symbols)
+        self.histograms = [LatencyHistogram() for _ in STAGES]
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self._head = 0       # total spans written (only the writer advances it)
+        self._tail = 0       # total spans flushed
+        self.dropped = 0
+        self.path = Path(path) if path else None
+        self._origin = (now(), datetime.now().isoformat())
+        self._flusher: Optional[asyncio.Task] = None
+        # One worker so flushes are applied in order and never overlap
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="latency-flush")
+        if self.path is not None:
+            self._write_meta()
+
+    def symbol_id(self, symbol: str) -> int:
+        try:
+            return self.symbols.index(symbol)
+        except ValueError:
+            self.symbols.append(symbol)
+            if self.path is not None:
+                self._write_meta()
+            return len(self.symbols) - 1
+
+    def span(self, stage: int, start_ns: int, symbol: int = 0) -> int:
+        end = now()
+        if self.enabled:
+            self._ring[self._head % self.capacity] = (stage, symbol, start_ns, end - start_ns)
+            self._head += 1
+        return end
+
+    # --- flushing -----------------------------------------------------------
+
+    def _write_meta(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "stages": list(STAGES),
+            "symbols": self.symbols,
+            "clock": "perf_counter_ns",
+            "clock_origin_ns": self._origin[0],
+            "wall_origin": self._origin[1],
+        }
+        self.path.with_suffix(".json").write_text(json.dumps(meta, indent=2))
+
+    def _snapshot(self) -> list:
+        """Take the spans written since the last flush (runs on the writer's thread)."""
+        head = self._head
+        if head - self._tail > self.capacity:
+            self.dropped += head - self._tail - self.capacity
+            self._tail = head - self.capacity
+        spans = [self._ring[i % self.capacity] for i in range(self._tail, head)]
+        self._tail = head
+        return spans
+
+    def _consume(self, spans: list) -> None:
+        """Fold spans into the histograms and append them to the span file."""
+        if not spans:
+            return
+        histograms = self.histograms
+        for stage, _, _, dur in spans:
+            histograms[stage].record(dur)
+        if self.path is not None:
+            records = np.array(spans, dtype=SPAN_DTYPE)
+            with open(self.path, "ab") as f:
+                records.tofile(f)
+
+    async def flush(self) -> None:
+        spans = self._snapshot()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._consume, spans)
+
+    async def _flush_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def start(self, interval: float = 1.0) -> None:
+        """Start the background flusher on the running loop."""
+        if self._flusher is None:
+            self._flusher = asyncio.ensure_future(self._flush_forever(interval))
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    def print_summary(self) -> None:
+        print_table({name: h for name, h in zip(STAGES, self.histograms)})
+        if self.dropped:
+            print(f"{self.dropped} spans dropped (ring overflow)")
+
+
+def default_path() -> Path:
+    return DEFAULT_DIR / f"spans_{datetime.now():%Y%m%d_%H%M%S}.bin"
+
+
+def print_table(histograms: Dict[str, LatencyHistogram]) -> None:
+    print(f"{'stage':<22}{'count':>9}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}"
+          f"{'p99.9 us':>10}{'max us':>10}")
+    for name, h in histograms.items():
+        if not h.count:
+            continue
+        p = [h.percentile(q) / 1000.0 for q in (50, 90, 99, 99.9)]
+        print(f"{name:<22}{h.count:>9}{p[0]:>10.1f}{p[1]:>10.1f}{p[2]:>10.1f}{p[3]:>10.1f}"
+              f"{h.max / 1000.0:>10.1f}")
+
+
+def load_spans(path: Path):
+    """Return (records, meta) for a span file written by LatencyRecorder."""
+    meta = json.loads(Path(path).with_suffix(".json").read_text())
+    return np.fromfile(path, dtype=SPAN_DTYPE), meta
+
+
+def report(path: Path, by_symbol: bool = False) -> None:
+    records, meta = load_spans(path)
+    print(f"{path} ({len(records)} spans, started {meta['wall_origin']})")
+    groups = {None: records}
+    if by_symbol:
+        groups = {sym: records[records["symbol"] == i] for i, sym in enumerate(meta["symbols"])}
+    for label, group in groups.items():
+        if label is not None:
+            print(f"\n{label}")
+        histograms = {}
+        for i, stage in enumerate(meta["stages"]):
+            h = LatencyHistogram()
+            for value in group["dur_ns"][group["stage"] == i].tolist():
+                h.record(value)
+            histograms[stage] = h
+        print_table(histograms)
+
+
+def measure_overhead(n: int = 1_000_000) -> None:
+    """Print the cost of one span() call, enabled and disabled."""
+    for enabled in (True, False):
+        rec = LatencyRecorder(["X"], capacity=1 << 16, enabled=enabled)
+        t0 = now()
+        for _ in range(n):
+            rec.span(INDICATOR, now())
+        per = (now() - t0) / n
+        print(f"span() {'enabled' if enabled else 'disabled':<9}: {per:.0f} ns per call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live trading latency reports")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="summarize a span file")
+    rep.add_argument("path", nargs="?", help="span file (default: newest in LATENCY_DIR)")
+    rep.add_argument("--by-symbol", action="store_true")
+    sub.add_parser("overhead", help="measure the per-span instrumentation cost")
+    args = parser.parse_args()
+
+    if args.command == "overhead":
+        measure_overhead()
+    else:
+        path = Path(args.path) if args.path else None
+        if path is None:
+            files = sorted(DEFAULT_DIR.glob("spans_*.bin"))
+            if not files:
+                sys.exit(f"No span files in {DEFAULT_DIR}")
+            path = files[-1]
+        report(path, by_symbol=args.by_symbol)
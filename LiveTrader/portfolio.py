@@ -0,0 +1,278 @@
+# LiveTrader/portfolio.py
+
+"""Multi-symbol live trading on a single IB connection.
+
+PortfolioTrader subscribes every symbol's market data on one ib_insync
+connection and reacts to ``pendingTickersEvent`` pushes instead of polling.
+Orders are tracked through their ``statusEvent`` callbacks, so a slow fill
+only blocks new decisions for its own symbol; every other symbol keeps
+trading.  Each symbol runs the same mean-reversion rules and streaming
+indicators as LiveTrader/trader.py.  Tick-to-order and fill latencies are
+recorded with LiveTrader/latency.py.  Portfolio value (at most every
+`publish_interval` seconds) and fills are published to the API's live
+stream on channel "live/portfolio" (see common/stream.py).
+
+Run against IB (paper trading first!):
+    python LiveTrader/portfolio.py AAPL MSFT NVDA
+
+or against the in-process fake gateway (no TWS needed):
+    python LiveTrader/portfolio.py AAPL MSFT NVDA --fake --duration 30
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import math
+import time
+import asyncio
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+from dotenv import load_dotenv
+
+# ib_insync (and the eventkit/nest_asyncio stack it pulls in) is imported
+# where an IB connection or order is made, so `trade --help` stays fast.
+if TYPE_CHECKING:
+    from ib_insync import Stock, Trade
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from common.stream import default_publisher, now_ms
+from Backtester.indicators import RollingZScore
+from Backtester.signals import DEFAULTS, live_order
+from LiveTrader import latency
+from LiveTrader.latency import LatencyRecorder
+
+# IB tick types carrying a last-trade price (live and delayed)
+LAST_TICK_TYPES = {4, 68}
+
+
+@dataclass
+class SymbolBook:
+    """Per-symbol trading state."""
+    symbol: str
+    contract: Stock
+    zscore: RollingZScore
+    sid: int = 0                      # symbol id in the latency recorder
+    position: float = 0
+    pending: Optional[Trade] = None   # working order, if any
+    submitted_ns: int = 0             # monotonic time the pending order was placed
+    ticks: int = 0
+    orders: int = 0
+    last_price: float = math.nan
+    z: float = math.nan
+
+
+class PortfolioTrader:
+    """Trades many stocks from one IB connection and one event loop."""
+
+    def __init__(self, symbols: Iterable[str], ib=None, period: Optional[int] = None,
+                 devfactor: Optional[float] = None, stake: Optional[int] = None,
+                 recorder: Optional[LatencyRecorder] = None, cash: float = 100_000.0,
+                 publisher=None, publish_interval: float = 1.0):
+        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
+        self.host = os.getenv("IB_HOST", "127.0.0.1")
+        self.port = int(os.getenv("IB_PORT", 7497))
+        self.client_id = int(os.getenv("IB_CLIENT_ID", 1))
+
+        # Strategy parameters default to MeanReversionStrategy's
+        self.period = period or DEFAULTS["period"]
+        self.devfactor = devfactor or DEFAULTS["devfactor"]
+        self.stake = stake or DEFAULTS["stake"]
+
+        from ib_insync import IB, Stock
+
+        self.ib = ib if ib is not None else IB()
+        symbols = [symbol.upper() for symbol in symbols]
+        self.latency = recorder if recorder is not None else LatencyRecorder(symbols, latency.default_path())
+        self.books: Dict[str, SymbolBook] = {}
+        for symbol in symbols:
+            self.books[symbol] = SymbolBook(symbol, Stock(symbol, "SMART", "USD"), RollingZScore(self.period),
+                                            sid=self.latency.symbol_id(symbol))
+        self._stopped = asyncio.Event()
+
+        # Live P&L for the dashboard: UDP to the API, or e.g. an in-process Hub
+        self.cash = cash
+        self.publisher = publisher if publisher is not None else default_publisher()
+        self.publish_interval = publish_interval
+        self._published_at = -math.inf
+
+    async def connect(self):
+        await self.ib.connectAsync(self.host, self.port, clientId=self.client_id)
+        print(f"Connected to IB at {self.host}:{self.port} (clientId={self.client_id})")
+
+    def disconnect(self):
+        if self.ib.isConnected():
+            self.ib.disconnect()
+
+    async def fetch_history(self):
+        """Seed every symbol's indicators with its last `period` daily closes, concurrently."""
+        async def seed(book: SymbolBook):
+            bars = await self.ib.reqHistoricalDataAsync(
+                book.contract,
+                endDateTime="",
+                durationStr=f"{self.period} D",
+                barSizeSetting="1 day",
+                whatToShow="ADJUSTED_LAST",
+                useRTH=True,
+                formatDate=1,
+            )
+            book.zscore.seed(bar.close for bar in bars)
+            return len(bars)
+
+        counts = await asyncio.gather(*(seed(book) for book in self.books.values()))
+        print(f"Loaded {sum(counts)} historical closes for {len(self.books)} symbols")
+
+    def subscribe(self):
+        for book in self.books.values():
+            self.ib.reqMktData(book.contract, "", False, False)
+        self.ib.pendingTickersEvent += self.on_tickers
+        self.ib.disconnectedEvent += self.stop
+
+    # --- event handlers -----------------------------------------------------
+
+    def on_tickers(self, tickers):
+        """pendingTickersEvent handler: feed each new last-trade price to its symbol."""
+        for ticker in tickers:
+            t_tick = latency.now()
+            book = self.books.get(ticker.contract.symbol)
+            if book is None:
+                continue
+            if not any(t.tickType in LAST_TICK_TYPES for t in ticker.ticks):
+                continue  # bid/ask-only update
+            price = ticker.last
+            if price is None or math.isnan(price):
+                continue
+            self.on_price(book, price, t_tick)
+            self.latency.span(latency.TICK, t_tick, book.sid)
+        self.publish_value()
+
+    def value(self) -> float:
+        """Cash plus every open position at its symbol's last price."""
+        return self.cash + sum(book.position * book.last_price for book in self.books.values() if book.position)
+
+    def publish_value(self):
+        now = time.monotonic()
+        if now - self._published_at >= self.publish_interval:
+            self._published_at = now
+            self.publisher.publish("live/portfolio", {"type": "value", "t": now_ms(), "value": self.value()})
+
+    def on_price(self, book: SymbolBook, price: float, t_tick: int):
+        book.ticks += 1
+        book.last_price = price
+        book.z = z = book.zscore.update(price)
+        t = self.latency.span(latency.INDICATOR, t_tick, book.sid)
+        if book.pending is not None or not book.zscore.ready:
+            return
+
+        order = live_order(book.position, z, self.devfactor, self.stake)
+        self.latency.span(latency.DECISION, t, book.sid)
+        if order is not None:
+            side, quantity = order
+            self.submit(book, "BUY" if side > 0 else "SELL", quantity, price, z, t_tick)
+
+    def submit(self, book: SymbolBook, action: str, quantity: float, price: float, z: float,
+               t_tick: int):
+        from ib_insync import MarketOrder
+
+        t = latency.now()
+        trade = self.ib.placeOrder(book.contract, MarketOrder(action, quantity))
+        book.submitted_ns = self.latency.span(latency.SUBMIT, t, book.sid)
+        self.latency.span(latency.TICK_TO_ORDER, t_tick, book.sid)
+        book.pending = trade
+        book.orders += 1
+        trade.statusEvent += self.on_order_status
+        print(f"{datetime.now()}: {book.symbol:<6} {action:<4} {quantity} @ {price:.2f} (z={z:.2f})")
+
+    def on_order_status(self, trade: Trade):
+        """Apply the filled quantity once the order is done (filled, cancelled or rejected)."""
+        status = trade.orderStatus
+        if not (trade.isDone() or status.status == "Inactive"):
+            return
+        book = self.books[trade.contract.symbol]
+        if book.pending is not trade:
+            return
+        self.latency.span(latency.FILL, book.submitted_ns, book.sid)
+        sign = 1 if trade.order.action == "BUY" else -1
+        book.position += sign * status.filled
+        book.pending = None
+        if status.filled:
+            self.cash -= sign * status.filled * status.avgFillPrice
+            self.publisher.publish("live/portfolio", {
+                "type": "fill", "t": now_ms(), "symbol": book.symbol, "action": trade.order.action,
+                "quantity": status.filled, "price": status.avgFillPrice, "position": book.position,
+            })
+        trade.statusEvent -= self.on_order_status
+        print(f"{datetime.now()}: {book.symbol:<6} {status.status} {status.filled} @ "
+              f"{status.avgFillPrice:.2f} -> position {book.position}")
+
+    # --- lifecycle ----------------------------------------------------------
+
+    def stop(self, *args):
+        self._stopped.set()
+
+    async def run(self):
+        await self.connect()
+        try:
+            await self.fetch_history()
+            self.latency.start()
+            self.subscribe()
+            await self._stopped.wait()
+        finally:
+            self.ib.pendingTickersEvent -= self.on_tickers
+            self.disconnect()
+            await self.latency.close()
+
+    def print_summary(self):
+        print(f"{'symbol':<8}{'ticks':>8}{'orders':>8}{'position':>10}{'last':>10}{'z':>8}")
+        for book in self.books.values():
+            print(f"{book.symbol:<8}{book.ticks:>8}{book.orders:>8}{book.position:>10}"
+                  f"{book.last_price:>10.2f}{book.z:>8.2f}")
+        print()
+        self.latency.print_summary()
+        if self.latency.path is not None:
+            print(f"Spans written to {self.latency.path}")
+
+
+async def run_fake(symbols, duration: float, interval: float, seed: Optional[int] = None):
+    """Trade `symbols` against FakeIB for `duration` seconds."""
+    from LiveTrader.fake_ib import FakeIB
+
+    ib = FakeIB(seed=seed)
+    trader = PortfolioTrader(symbols, ib=ib)
+    runner = asyncio.ensure_future(trader.run())
+    while not ib.isConnected():
+        await asyncio.sleep(0.01)
+    await ib.stream(interval=interval, duration=duration)
+    trader.stop()
+    await runner
+    trader.print_summary()
+    return trader
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Trade several symbols on one IB connection")
+    parser.add_argument("symbols", nargs="+", help="stock symbols, e.g. AAPL MSFT")
+    parser.add_argument("--fake", action="store_true", help="use the in-process fake gateway")
+    parser.add_argument("--duration", type=float, default=30.0, help="fake session length (s)")
+    parser.add_argument("--interval", type=float, default=0.05, help="fake tick interval (s)")
+    args = parser.parse_args(argv)
+
+    if args.fake:
+        asyncio.run(run_fake(args.symbols, args.duration, args.interval, seed=0))
+    else:
+        trader = PortfolioTrader(args.symbols)
+        try:
+            asyncio.run(trader.run())
+        finally:
+            trader.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,35 @@ This script connects to Interactive Brokers and implements a very simple
 mean-reversion strategy based on the existing Backtester logic.  It fetches
 historical data to seed the indicators and then reacts to live price updates.
 
+Portfolio value (every tick) and fills are published to the API's live
+stream on channel "live/<SYMBOL>" (see common/stream.py).
+
 It is intentionally minimal and meant as a starting point.  Run in paper
 trading first!  Requires ib_insync and access to the IB Gateway or TWS.
 """
 
 import os
 import sys
+import math
 import asyncio
 from datetime import datetime
-from typing import List
+from typing import Optional
 
-import numpy as np
-import pandas as pd
-from ib_insync import IB, Stock, util, MarketOrder
 from dotenv import load_dotenv
 
-# Reuse the mean reversion parameters from the backtester
-from Backtester.strategies.mean_reversion import MeanReversionStrategy
+# Reuse the mean reversion parameters, indicators and rules from the backtester
+from common.stream import default_publisher, now_ms
+from Backtester.indicators import RollingZScore
+from Backtester.signals import DEFAULTS, live_order
+from LiveTrader import latency
+from LiveTrader.latency import LatencyRecorder
 
 
 class LiveMeanReversionTrader:
     """Connects to IB and trades a single stock live."""
 
-    def __init__(self, symbol: str, cash: float = 100_000.0):
+    def __init__(self, symbol: str, cash: float = 100_000.0, ib=None, publisher=None,
+                 recorder: Optional[LatencyRecorder] = None):
         load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
         self.host = os.getenv("IB_HOST", "127.0.0.1")
         self.port = int(os.getenv("IB_PORT", 7497))
@@ -35,17 +41,29 @@ class LiveMeanReversionTrader:
         self.symbol = symbol.upper()
         self.cash = cash
 
-        self.ib = IB()
+        # ib_insync is imported here and in place(), not at module level
+        from ib_insync import IB, Stock
+
+        self.ib = ib if ib is not None else IB()
         self.contract = Stock(self.symbol, "SMART", "USD")
 
         # Strategy parameters match MeanReversionStrategy defaults
-        self.period = MeanReversionStrategy.params.period
-        self.devfactor = MeanReversionStrategy.params.devfactor
-        self.stake = MeanReversionStrategy.params.stake
+        self.period = DEFAULTS["period"]
+        self.devfactor = DEFAULTS["devfactor"]
+        self.stake = DEFAULTS["stake"]
 
-        self.prices: List[float] = []
+        # O(1) rolling SMA/std over the last `period` prices (fixed memory)
+        self.zscore = RollingZScore(self.period)
         self.position = 0
 
+        # Tick-to-order / fill latency spans (see LiveTrader/latency.py); pass
+        # LatencyRecorder([symbol], enabled=False) to record nothing
+        self.latency = recorder if recorder is not None else LatencyRecorder([self.symbol], latency.default_path())
+
+        # Live P&L for the dashboard: UDP to the API, or e.g. an in-process Hub
+        self.publisher = publisher if publisher is not None else default_publisher()
+        self.channel = f"live/{self.symbol}"
+
     def connect(self):
         self.ib.connect(self.host, self.port, clientId=self.client_id)
         print(f"Connected to IB at {self.host}:{self.port} (clientId={self.client_id})")
@@ -65,56 +83,81 @@ class LiveMeanReversionTrader:
             useRTH=True,
             formatDate=1,
         )
-        df = util.df(bars)
-        self.prices = df["close"].tolist()
-        print(f"Loaded {len(self.prices)} historical closes for {self.symbol}")
+        self.zscore.seed(bar.close for bar in bars)
+        print(f"Loaded {len(bars)} historical closes for {self.symbol}")
 
     def compute_z(self, price: float) -> float:
-        window = self.prices[-self.period :]
-        sma = np.mean(window)
-        std = np.std(window)
-        if std == 0:
-            return 0.0
-        return (price - sma) / std
+        """Add `price` to the rolling window and return its z-score."""
+        return self.zscore.update(price)
+
+    def place(self, action: str, quantity: float, t_tick: int):
+        """placeOrder with submit and tick-to-order spans."""
+        from ib_insync import MarketOrder
+
+        t = latency.now()
+        trade = self.ib.placeOrder(self.contract, MarketOrder(action, quantity))
+        submitted = self.latency.span(latency.SUBMIT, t)
+        self.latency.span(latency.TICK_TO_ORDER, t_tick)
+        return trade, submitted
+
+    async def wait_done(self, trade, submitted: int):
+        """Wait for the order to be filled or cancelled; record the fill span, book and publish the fill."""
+        while not trade.isDone():
+            await trade.statusEvent
+        self.latency.span(latency.FILL, submitted)
+        status = trade.orderStatus
+        if status.filled:
+            side = 1 if trade.order.action == "BUY" else -1
+            self.cash -= side * status.filled * status.avgFillPrice
+            self.publisher.publish(self.channel, {
+                "type": "fill", "t": now_ms(), "symbol": self.symbol, "action": trade.order.action,
+                "quantity": status.filled, "price": status.avgFillPrice, "position": self.position,
+            })
 
     async def run(self):
         self.connect()
         self.fetch_history()
 
         ticker = self.ib.reqMktData(self.contract, snapshot=False)
+        self.latency.start()
 
         try:
             while True:
                 await self.ib.sleep(1)
-                if ticker.last is None:
+                # ib_insync reports a missing last price as NaN
+                if ticker.last is None or math.isnan(ticker.last):
                     continue
                 price = ticker.last
-                self.prices.append(price)
+                # Mark to market before the tick span starts, so publishing isn't timed
+                self.publisher.publish(self.channel, {
+                    "type": "value", "t": now_ms(), "value": self.cash + self.position * price,
+                    "price": price, "position": self.position,
+                })
+                t_tick = latency.now()
                 z = self.compute_z(price)
+                t = self.latency.span(latency.INDICATOR, t_tick)
+
+                order = live_order(self.position, z, self.devfactor, self.stake)
+                self.latency.span(latency.DECISION, t)
 
+                if order is None:
+                    self.latency.span(latency.TICK, t_tick)
+                    continue
+                side, quantity = order
+                action = "BUY" if side > 0 else "SELL"
                 if self.position == 0:
-                    if z > self.devfactor:
-                        order = MarketOrder("SELL", self.stake)
-                        trade = self.ib.placeOrder(self.contract, order)
-                        self.position -= self.stake
-                        print(f"{datetime.now()}: SELL {self.stake} @ {price:.2f} (z={z:.2f})")
-                        await trade.completed
-                    elif z < -self.devfactor:
-                        order = MarketOrder("BUY", self.stake)
-                        trade = self.ib.placeOrder(self.contract, order)
-                        self.position += self.stake
-                        print(f"{datetime.now()}: BUY  {self.stake} @ {price:.2f} (z={z:.2f})")
-                        await trade.completed
+                    position, label = side * quantity, f"{action:<4} {quantity}"
                 else:
-                    if (self.position > 0 and z >= 0) or (self.position < 0 and z <= 0):
-                        side = "SELL" if self.position > 0 else "BUY"
-                        order = MarketOrder(side, abs(self.position))
-                        trade = self.ib.placeOrder(self.contract, order)
-                        print(f"{datetime.now()}: CLOSE {self.position} @ {price:.2f} (z={z:.2f})")
-                        self.position = 0
-                        await trade.completed
+                    position, label = 0, f"CLOSE {self.position}"
+                trade, submitted = self.place(action, quantity, t_tick)
+                self.latency.span(latency.TICK, t_tick)
+                self.position = position
+                print(f"{datetime.now()}: {label} @ {price:.2f} (z={z:.2f})")
+                await self.wait_done(trade, submitted)
         finally:
             self.disconnect()
+            await self.latency.close()
+            self.latency.print_summary()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+# benchmarks/api_load.py
+
+"""
+Load-test the API with many concurrent keep-alive clients, the way a room
+full of dashboards polls it.
+
+Each client opens one HTTP/1.1 connection and requests the given paths in
+turn for `--duration` seconds.  Throughput and latency percentiles are
+printed per run.  With --workers the script starts `uvicorn API.main:app
+--workers N` itself for each N, so throughput can be compared as workers
+are added:
+
+    python benchmarks/api_load.py --workers 1 2 4 --clients 500 \\
+        --path "/prices?symbol=AAPL&start=2024-01-01" "/pnl?symbol=AAPL&strategy=mean_reversion"
+
+or point it at a running server with --url http://127.0.0.1:8000.
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+async def client(host: str, port: int, paths, deadline: float, latencies: list, errors: list):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as exc:
+        errors.append(repr(exc))
+        return
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            t0 = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: */*\r\n\r\n".encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            if status >= 400:
+                errors.append(status)
+    except (OSError, asyncio.IncompleteReadError) as exc:
+        errors.append(repr(exc))
+    finally:
+        writer.close()
+
+
+async def load(url: str, paths, clients: int, duration: float) -> dict:
+    parts = urlsplit(url)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(parts.hostname, parts.port or 80, paths, deadline, latencies, errors)
+                           for _ in range(clients)))
+    elapsed = time.perf_counter() - t0
+    ms = np.array(latencies) * 1e3 if latencies else np.zeros(1)
+    return {"requests": len(latencies), "errors": len(errors), "rps": len(latencies) / elapsed,
+            "p50": np.percentile(ms, 50), "p99": np.percentile(ms, 99), "max": ms.max()}
+
+
+def wait_healthy(url: str, timeout: float = 30.0):
+    import urllib.request
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-client load test of the API")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="server base URL")
+    parser.add_argument("--workers", type=int, nargs="*", default=None,
+                        help="start uvicorn with each of these worker counts (omit to use --url as is)")
+    parser.add_argument("--clients", type=int, default=500, help="concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--path", nargs="+", default=["/health"], help="paths requested round-robin")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for workers in args.workers or [None]:
+        server = None
+        if workers is not None:
+            port = urlsplit(args.url).port or 8765
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "API.main:app", "--port", str(port),
+                 "--workers", str(workers), "--log-level", "warning", "--backlog", "4096"],
+                cwd=ROOT,
+            )
+        try:
+            wait_healthy(args.url)
+            r = asyncio.run(load(args.url, args.path, args.clients, args.duration))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        print(f"{workers or '-':>8}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10.0f}"
+              f"{r['p50']:>9.1f}{r['p99']:>9.1f}{r['max']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/indicators.py
+
+"""
+Benchmark the streaming indicators against the old list + np.mean/np.std
+approach over a simulated session of 1-second ticks.
+
+For each implementation the run is split into equal slices and the median
+and p99 per-tick latency plus traced memory are printed per slice: the
+streaming version should stay flat, the list version grows.  The streaming
+z-scores and RSI are also checked against the array versions in
+Backtester/vectorized.py.
+
+    python benchmarks/indicators.py --ticks 23400 --period 20
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backtester.indicators import RollingZScore, WilderRSI
+from Backtester.vectorized import rolling_mean_std, wilder_rsi
+
+
+def synthetic_ticks(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0, 2e-4, n)))
+
+
+class ListZScore:
+    """The previous LiveTrader implementation, kept for comparison."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.prices = []
+
+    def update(self, price: float) -> float:
+        self.prices.append(price)
+        window = self.prices[-self.period:]
+        std = np.std(window)
+        if std == 0:
+            return 0.0
+        return (price - np.mean(window)) / std
+
+
+def profile(name: str, indicator, ticks: np.ndarray, slices: int) -> np.ndarray:
+    out = np.empty(len(ticks))
+    lat = np.empty(len(ticks))
+    bounds = np.linspace(0, len(ticks), slices + 1).astype(int)
+    prices = ticks.tolist()
+    rows = []
+    tracemalloc.start()
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        for i in range(lo, hi):
+            t0 = time.perf_counter_ns()
+            out[i] = indicator.update(prices[i])
+            lat[i] = time.perf_counter_ns() - t0
+        rows.append((lo, hi, tracemalloc.get_traced_memory()[0]))
+    tracemalloc.stop()
+
+    print(f"\n{name}")
+    print(f"{'ticks':>12}{'median us':>12}{'p99 us':>10}{'memory KiB':>13}")
+    for lo, hi, current in rows:
+        chunk = lat[lo:hi] / 1000.0
+        print(f"{lo:>5}-{hi:<6}{np.median(chunk):>12.2f}{np.percentile(chunk, 99):>10.2f}"
+              f"{current / 1024:>13.1f}")
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming vs list-based live indicators")
+    parser.add_argument("--ticks", type=int, default=23_400, help="ticks to replay (23,400 = 6.5h of 1s ticks)")
+    parser.add_argument("--period", type=int, default=20)
+    parser.add_argument("--rsi-period", type=int, default=14)
+    parser.add_argument("--slices", type=int, default=6)
+    args = parser.parse_args()
+
+    ticks = synthetic_ticks(args.ticks)
+    z_stream = profile("streaming (RollingZScore)", RollingZScore(args.period), ticks, args.slices)
+    z_list = profile("list + np.mean/np.std", ListZScore(args.period), ticks, args.slices)
+    rsi_stream = profile("streaming (WilderRSI)", WilderRSI(args.rsi_period), ticks, args.slices)
+
+    sma, std = rolling_mean_std(ticks, args.period)
+    z_vec = (ticks - sma) / std
+    ready = slice(args.period - 1, None)
+    rsi_vec = wilder_rsi(ticks, args.rsi_period)
+    print("\nmax |z streaming - z vectorized|: "
+          f"{np.max(np.abs(z_stream[ready] - z_vec[ready])):.3e}")
+    print("max |z streaming - z list|:       "
+          f"{np.max(np.abs(z_stream[ready] - z_list[ready])):.3e}")
+    print("max |rsi streaming - rsi vectorized|: "
+          f"{np.nanmax(np.abs(rsi_stream - rsi_vec)):.3e}")
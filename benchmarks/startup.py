@@ -0,0 +1,109 @@
+# benchmarks/startup.py
+
+"""
+Startup time of the command-line entry points.
+
+Each `tradingfund <command> --help` is run in a fresh interpreter under
+`python -X importtime`.  The script reports the median wall time, the
+import time summed over top-level modules, the slowest imports, and
+which heavy dependencies were loaded.  None of those dependencies should
+be needed just to print help.
+
+    python benchmarks/startup.py                  # table
+    python benchmarks/startup.py --json out.json  # also save the numbers
+    python benchmarks/startup.py --check          # exit 1 on a regression (for CI)
+
+--check fails if any command imports a module from --forbid, or if its
+median wall time exceeds --max-ms.  With --baseline it also fails when a
+command got more than --tolerance slower than the saved numbers.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+COMMANDS = ("ingest", "backtest", "sweep", "walkforward", "serve", "trade", "intraday", "replay",
+            "robustness", "portfolio")
+FORBIDDEN = ("pandas", "backtrader", "sqlalchemy", "yfinance", "ccxt", "fastapi", "ib_insync")
+
+
+def parse_importtime(stderr: str) -> dict:
+    """{module: (self_us, cumulative_us)} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative))
+    return modules
+
+
+def measure(command: str, runs: int) -> dict:
+    walls, modules = [], {}
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "tradingfund.py", command, "--help"],
+                              cwd=ROOT, capture_output=True, text=True)
+        walls.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            raise RuntimeError(f"`tradingfund {command} --help` failed:\n{proc.stderr[-2000:]}")
+        modules = parse_importtime(proc.stderr)
+    top = {name: cum for name, (_, cum) in modules.items() if "." not in name}
+    return {
+        "wall_ms": statistics.median(walls) * 1e3,
+        "import_ms": sum(self_us for self_us, _ in modules.values()) / 1e3,
+        "modules": len(modules),
+        "slowest": sorted(top.items(), key=lambda kv: -kv[1])[:5],
+        "loaded": sorted(set(modules)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of the tradingfund CLI commands")
+    parser.add_argument("--commands", nargs="+", default=list(COMMANDS), choices=COMMANDS)
+    parser.add_argument("--runs", type=int, default=5, help="interpreter launches per command")
+    parser.add_argument("--json", type=str, default=None, help="write the results to this file")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a budget is exceeded")
+    parser.add_argument("--forbid", nargs="*", default=list(FORBIDDEN),
+                        help="modules that must not be imported by `<command> --help`")
+    parser.add_argument("--max-ms", type=float, default=1000.0, help="wall-time budget per command")
+    parser.add_argument("--baseline", type=str, default=None, help="earlier --json output to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown against the baseline (0.5 = +50%%)")
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+    results, failures = {}, []
+    print(f"{'command':<13}{'wall ms':>9}{'import ms':>11}{'modules':>9}  slowest top-level imports (ms)")
+    for command in args.commands:
+        r = measure(command, args.runs)
+        results[command] = {k: v for k, v in r.items() if k != "loaded"}
+        slowest = ", ".join(f"{name} {us / 1e3:.0f}" for name, us in r["slowest"])
+        print(f"{command:<13}{r['wall_ms']:>9.0f}{r['import_ms']:>11.0f}{r['modules']:>9}  {slowest}")
+
+        heavy = [m for m in args.forbid if m in r["loaded"]]
+        if heavy:
+            failures.append(f"{command}: imports {', '.join(heavy)}")
+        if r["wall_ms"] > args.max_ms:
+            failures.append(f"{command}: {r['wall_ms']:.0f} ms > {args.max_ms:.0f} ms budget")
+        before = baseline.get(command, {}).get("wall_ms")
+        if before and r["wall_ms"] > before * (1 + args.tolerance):
+            failures.append(f"{command}: {r['wall_ms']:.0f} ms vs {before:.0f} ms baseline")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.json}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+# benchmarks/suite.py
+
+"""
+Offline benchmark suite for the hot paths: bulk DB write, data load, a
+single backtest, sweep throughput, intraday replay, Monte Carlo
+robustness resampling and API request latency.
+
+Everything runs on synthetic OHLCV fixtures built in a temporary
+directory, so no network, market_data.db or API/pnl_* files are needed
+and nothing in the repo is touched.
+
+    python benchmarks/suite.py                        # quick sizes (1k-100k bars, 1-10 symbols)
+    python benchmarks/suite.py --full                 # 1k-1M bars, 1-1000 symbols
+    python benchmarks/suite.py --cases backtest api   # a subset
+    python benchmarks/suite.py --json base.json       # save the numbers
+    python benchmarks/suite.py --baseline base.json   # compare; exit 1 on a regression
+
+Each benchmark is timed --repeat times and the best run is kept.  With
+--baseline, a benchmark more than --threshold slower than the saved run
+(0.25 = +25%) is reported as a regression and the script exits 1, so a CI
+job can keep a baseline JSON per machine and compare every change to it.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tests.fixtures import synthetic_ohlcv
+
+CASES = ("db_write", "data_load", "backtest", "sweep", "replay", "robustness", "api")
+
+# Fixture sizes per mode: bars per symbol, symbols per portfolio/sweep
+SIZES = {
+    "quick": dict(bars=(1_000, 10_000, 100_000), backtrader_bars=(1_000, 10_000),
+                  sweep_symbols=(1, 10), portfolio_symbols=(1, 10, 100), grid=(3, 3, 1),
+                  replay_days=(30,), resamples=(1_000, 10_000)),
+    "full": dict(bars=(1_000, 10_000, 100_000, 1_000_000), backtrader_bars=(1_000, 10_000, 100_000),
+                 sweep_symbols=(1, 10, 100), portfolio_symbols=(1, 10, 100, 1000), grid=(3, 3, 3),
+                 replay_days=(30, 365), resamples=(1_000, 10_000, 100_000)),
+}
+DAILY_BARS = 2520  # ten years of business days: sweeps, portfolios and the API
+
+
+def sqlite_store(path: Path):
+    """A SQLiteStore on its own engine, with the pipeline's connection pragmas."""
+    from sqlalchemy import create_engine, event
+    from DataPipeline.db import _set_sqlite_pragmas
+    from DataPipeline.store import SQLiteStore
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return SQLiteStore(engine)
+
+
+def best_of(fn, repeat: int) -> float:
+    """Fastest of `repeat` calls of fn(), in seconds."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def quiet(fn):
+    """fn with its progress prints swallowed."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def bench_db_write(tmp: Path, sizes: dict, repeat: int) -> dict:
+    """save_to_db() of one symbol into a SQLite table and a columnar directory."""
+    from DataPipeline.pipeline import save_to_db
+    from DataPipeline.store import ColumnarStore
+
+    stores = {"sqlite": sqlite_store(tmp / "write.db"), "columnar": ColumnarStore(tmp / "write_columnar")}
+    results = {}
+    for bars in sizes["bars"]:
+        df = synthetic_ohlcv(bars)
+        start, end = df.index[0], df.index[-1]
+        for name, store in stores.items():
+            seconds = best_of(quiet(lambda: save_to_db("SYN", df, start, end, store=store)), repeat)
+            results[f"db_write[{name},bars={bars}]"] = {"seconds": seconds, "rows_per_s": bars / seconds}
+    return results
+
+
+def bench_data_load(tmp: Path, sizes: dict, repeat: int) -> dict:
+    """Reading a whole symbol back as the backtester does, from both stores."""
+    from DataPipeline.store import ColumnarStore
+
+    stores = {"sqlite": sqlite_store(tmp / "load.db"), "columnar": ColumnarStore(tmp / "load_columnar")}
+    results = {}
+    for bars in sizes["bars"]:
+        df = synthetic_ohlcv(bars)
+        symbol = f"SYN{bars}"
+        for name, store in stores.items():
+            store.write(symbol, df)
+            seconds = best_of(lambda: store.read(symbol), repeat)
+            results[f"data_load[{name},bars={bars}]"] = {"seconds": seconds, "rows_per_s": bars / seconds}
+        arrays = stores["columnar"].read_arrays
+        seconds = best_of(lambda: np.asarray(arrays(symbol)["Close"]).sum(), repeat)
+        results[f"data_load[columnar_arrays,bars={bars}]"] = {"seconds": seconds,
+                                                              "rows_per_s": bars / seconds}
+    return results
+
+
+def bench_backtest(tmp: Path, sizes: dict, repeat: int) -> dict:
+    """One default-parameter backtest on each engine; portfolio simulation across symbols."""
+    from Backtester.backtest import run_engine
+    from Backtester.portfolio import simulate_portfolio, synthetic_panel
+    from Backtester.signals import DEFAULTS
+
+    results = {}
+    for bars in sizes["bars"]:
+        df = synthetic_ohlcv(bars)
+        for strategy in ("mean_reversion", "enhanced"):
+            engines = ["vectorized"] + (["backtrader"] if bars in sizes["backtrader_bars"] else [])
+            for engine in engines:
+                run = lambda: run_engine(df, 100_000, strategy, engine=engine, **DEFAULTS)
+                seconds = best_of(run, 1 if engine == "backtrader" else repeat)
+                results[f"backtest[{engine},{strategy},bars={bars}]"] = {
+                    "seconds": seconds, "bars_per_s": bars / seconds}
+    for n_symbols in sizes["portfolio_symbols"]:
+        panel = synthetic_panel(n_symbols, DAILY_BARS)
+        seconds = best_of(lambda: simulate_portfolio(panel, 1_000_000, **DEFAULTS), repeat)
+        results[f"backtest[portfolio,symbols={n_symbols}]"] = {
+            "seconds": seconds, "bars_per_s": n_symbols * DAILY_BARS / seconds}
+    return results
+
+
+def bench_sweep(tmp: Path, sizes: dict, repeat: int) -> dict:
+    """
+    run_sweep() over a small grid, end to end through the process pool,
+    without the result cache; indicators come from a cache in `tmp`.
+    """
+    import Backtester.backtest as backtest
+    from Backtester.indicator_cache import IndicatorCache
+    from Backtester.result_cache import ResultCache
+    from Backtester.sweep import build_grid, run_sweep
+
+    n_periods, n_devfactors, n_stakes = sizes["grid"]
+    grid = build_grid("mean_reversion", (10, 20, 30)[:n_periods], (1.5, 2.0, 2.5)[:n_devfactors],
+                      (100, 50, 200)[:n_stakes])
+    store = sqlite_store(tmp / "sweep.db")
+    symbols = [f"SYN{i}" for i in range(max(sizes["sweep_symbols"]))]
+    for i, symbol in enumerate(symbols):
+        store.write(symbol, synthetic_ohlcv(DAILY_BARS, seed=i))
+
+    previous, backtest._store = backtest._store, store  # fetch_data_from_db reads the fixture DB
+    results = {}
+    try:
+        for n_symbols in sizes["sweep_symbols"]:
+            run = quiet(lambda: run_sweep(symbols[:n_symbols], "1990-01-01", "2030-01-01", grid,
+                                          output_dir=tmp / "sweep_out", write_series=False,
+                                          cache=ResultCache(enabled=False),
+                                          indicator_cache=IndicatorCache(tmp / "indicator_cache")))
+            seconds = best_of(run, repeat)
+            runs = n_symbols * len(grid)
+            results[f"sweep[symbols={n_symbols},grid={len(grid)}]"] = {"seconds": seconds,
+                                                                      "runs_per_s": runs / seconds}
+    finally:
+        backtest._store = previous
+    return results
+
+
+def bench_replay(tmp: Path, sizes: dict, repeat: int) -> dict:
+    """Minute bars streamed from the intraday store through the live trading rules."""
+    from Backtester.replay import price_stream, replay
+    from DataPipeline.intraday import IntradayStore, synthetic_records
+
+    store = IntradayStore(tmp / "intraday")
+    results = {}
+    for days in sizes["replay_days"]:
+        symbol = f"SYN{days}"
+        store.write(symbol, "1m", synthetic_records("1m", "2025-01-01", days))
+        seconds = best_of(lambda: replay(price_stream(store, symbol, "1m"), 100_000), repeat)
+        results[f"replay[1m,days={days}]"] = {"seconds": seconds, "ticks_per_s": days * 1440 / seconds}
+    return results
+
+
+def bench_robustness(tmp: Path, sizes: dict, repeat: int) -> dict:
+    """Block-bootstrap and entry-jitter resamples of one ten-year backtest, in NumPy batches."""
+    from Backtester.robustness import robustness
+    from Backtester.signals import DEFAULTS
+
+    df = synthetic_ohlcv(DAILY_BARS)
+    open_, close = df["Open"].to_numpy(), df["Close"].to_numpy()
+    grid = [dict(period=DEFAULTS["period"], devfactor=DEFAULTS["devfactor"], stake=DEFAULTS["stake"])]
+    results = {}
+    for n in sizes["resamples"]:
+        for method in ("bootstrap", "jitter"):
+            run = lambda: robustness(open_, close, grid, resamples=n, methods=(method,), workers=1)
+            seconds = best_of(run, repeat)
+            results[f"robustness[{method},resamples={n}]"] = {"seconds": seconds,
+                                                             "resamples_per_s": n / seconds}
+    return results
+
+
+def bench_api(tmp: Path, sizes: dict, repeat: int) -> dict:
+    """Request latency through the full ASGI stack (in-process client, no sockets)."""
+    from Backtester.backtest import run_engine, write_pnl_json
+    from Backtester.signals import DEFAULTS
+
+    df = synthetic_ohlcv(DAILY_BARS)
+    sqlite_store(tmp / "api.db").write("SYN", df)
+    values = run_engine(df, 100_000, "mean_reversion", engine="vectorized", **DEFAULTS)
+    write_pnl_json(str(tmp / "pnl_syn_mean_reversion.json"), df.index[len(df) - len(values):], values)
+
+    # API.main reads its paths at import time
+    os.environ.update(DB_PATH=str(tmp / "api.db"), PNL_DIR=str(tmp), SWEEP_DIR=str(tmp / "sweeps"),
+                      LIVE_STREAM="off")
+    from fastapi.testclient import TestClient
+    from API.main import app
+
+    paths = {
+        "pnl": "/pnl?symbol=SYN&strategy=mean_reversion",
+        "pnl_lttb": "/pnl?symbol=SYN&strategy=mean_reversion&max_points=500",
+        "prices": "/prices?symbol=SYN&start=1995-01-01&end=1995-12-31",
+        "prices_all": "/prices?symbol=SYN",
+        "metrics": "/metrics?symbol=SYN",
+    }
+    requests = 50 * repeat
+    results = {}
+    with TestClient(app) as client:
+        for name, path in paths.items():
+            client.get(path).raise_for_status()  # warm caches and the connection pool
+            latencies = []
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                client.get(path)
+                latencies.append(time.perf_counter() - t0)
+            results[f"api[{name}]"] = {
+                "seconds": statistics.median(latencies),
+                "p99_ms": float(np.percentile(latencies, 99) * 1e3),
+            }
+    return results
+
+
+BENCHMARKS = {
+    "db_write": bench_db_write,
+    "data_load": bench_data_load,
+    "backtest": bench_backtest,
+    "sweep": bench_sweep,
+    "replay": bench_replay,
+    "robustness": bench_robustness,
+    "api": bench_api,
+}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Names of benchmarks more than `threshold` slower than in `baseline`."""
+    regressions = []
+    for name, r in results.items():
+        before = baseline.get(name, {}).get("seconds")
+        if before and r["seconds"] > before * (1 + threshold):
+            regressions.append(f"{name}: {r['seconds'] * 1e3:.2f} ms vs {before * 1e3:.2f} ms baseline "
+                               f"(+{r['seconds'] / before - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks on synthetic OHLCV fixtures")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    parser.add_argument("--full", action="store_true", help="large sizes (up to 1M bars, 1000 symbols)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark (best is kept)")
+    parser.add_argument("--json", type=str, default=None, help="write the results to this file")
+    parser.add_argument("--baseline", type=str, default=None, help="earlier --json output to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = +25%%)")
+    args = parser.parse_args()
+
+    sizes = SIZES["full" if args.full else "quick"]
+    baseline = json.loads(Path(args.baseline).read_text())["results"] if args.baseline else {}
+    results = {}
+    tmp = Path(tempfile.mkdtemp(prefix="tradingfund-bench-"))
+    print(f"{'benchmark':<52}{'ms':>11}{'vs base':>9}  throughput")
+    try:
+        for case in args.cases:
+            for name, r in BENCHMARKS[case](tmp, sizes, args.repeat).items():
+                results[name] = r
+                before = baseline.get(name, {}).get("seconds")
+                delta = f"{r['seconds'] / before - 1:+.0%}" if before else "-"
+                extra = ", ".join(f"{k} {v:,.0f}" for k, v in r.items() if k != "seconds")
+                print(f"{name:<52}{r['seconds'] * 1e3:>11.2f}{delta:>9}  {extra}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.json:
+        meta = {"python": platform.python_version(), "numpy": np.__version__,
+                "machine": platform.machine(), "cpus": os.cpu_count(),
+                "mode": "full" if args.full else "quick", "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        Path(args.json).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.json}")
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# common/stream.py
+
+"""
+Publishing side of the live P&L stream (the API serves it on GET /stream).
+
+Live traders (portfolio value and fills) and sweeps (one event per
+finished grid point) run in their own processes.  Each event is sent as
+one JSON datagram over UDP to LIVE_STREAM_ADDR (default 127.0.0.1:8765),
+where the API's StreamListener hands it to its Hub (see API/stream.py).
+Sending never blocks, never waits for the API and never fails the
+trading loop: if nothing is listening, the event is lost.
+
+This module only uses the standard library, so trader and sweep
+processes can import it without FastAPI or the API package.
+"""
+
+import os
+import json
+import time
+import socket
+from typing import Tuple
+
+DEFAULT_ADDR = os.getenv("LIVE_STREAM_ADDR", "127.0.0.1:8765")
+MAX_DATAGRAM = 65_000
+
+
+def parse_addr(addr: str) -> Tuple[str, int]:
+    host, _, port = addr.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class UDPPublisher:
+    """Fire-and-forget JSON datagrams to the API's StreamListener."""
+
+    def __init__(self, addr: str = DEFAULT_ADDR):
+        self.addr = parse_addr(addr)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sent = 0
+        self.failed = 0
+
+    def publish(self, channel: str, event: dict) -> None:
+        payload = json.dumps({"channel": channel, "event": event}, separators=(",", ":"), default=float)
+        try:
+            if len(payload) > MAX_DATAGRAM:
+                raise ValueError("event too large for one datagram")
+            self.sock.sendto(payload.encode(), self.addr)
+            self.sent += 1
+        except (OSError, ValueError):
+            self.failed += 1  # nobody listening / buffer full: the stream is best-effort
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class NullPublisher:
+    def publish(self, channel: str, event: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def stream_enabled() -> bool:
+    return os.getenv("LIVE_STREAM", "on").lower() not in ("0", "off", "false", "no")
+
+
+def default_publisher():
+    """UDPPublisher to LIVE_STREAM_ADDR, or a no-op when LIVE_STREAM=off."""
+    return UDPPublisher() if stream_enabled() else NullPublisher()
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
@@ -1,7 +1,7 @@
 // Dashboard/src/App.tsx
 
 import React, { useEffect, useState } from "react";
-import { api } from "./api/client";
+import { api, baseURL } from "./api/client";
 import PnlChart from "./components/PnlChart";
 
 interface PnlPoint {
@@ -9,19 +9,58 @@ interface PnlPoint {
   value: number;
 }
 
+// The chart is ~800px wide; the API downsamples (LTTB) to this many points.
+const MAX_POINTS = 800;
+// Live mode keeps only the most recent points streamed from /stream.
+const MAX_LIVE_POINTS = 2000;
+
+interface LiveValue {
+  t: number; // epoch milliseconds
+  value: number;
+}
+
+const toPoint = (e: LiveValue): PnlPoint => ({
+  date: new Date(e.t).toISOString().slice(0, 19),
+  value: e.value,
+});
+
 function App() {
   const [pnlData, setPnlData] = useState<PnlPoint[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [symbol, setSymbol] = useState("AAPL");
   const [strategy, setStrategy] = useState("mean_reversion");
+  const [live, setLive] = useState(false);
 
   useEffect(() => {
+    if (!live) return;
+    // One snapshot of recent values, then one "value" event per update. After
+    // a "dropped" event the server closes the stream and EventSource
+    // reconnects, which starts again from a fresh snapshot.
+    setLoading(true);
+    setPnlData([]);
+    const source = new EventSource(`${baseURL}/stream?channel=live/${symbol}`);
+    source.addEventListener("snapshot", (msg) => {
+      const snapshot = JSON.parse((msg as MessageEvent).data);
+      setPnlData((snapshot.value ?? []).slice(-MAX_LIVE_POINTS).map(toPoint));
+      setError(null);
+      setLoading(false);
+    });
+    source.addEventListener("value", (msg) => {
+      const point = toPoint(JSON.parse((msg as MessageEvent).data));
+      setPnlData((prev) => [...prev.slice(1 - MAX_LIVE_POINTS), point]);
+    });
+    source.onerror = () => setError("Live stream disconnected, retrying…");
+    return () => source.close();
+  }, [live, symbol]);
+
+  useEffect(() => {
+    if (live) return;
     const fetchPnl = async () => {
       setLoading(true);
       try {
         const response = await api.get<PnlPoint[]>(
-          `/pnl?symbol=${symbol}&strategy=${strategy}`
+          `/pnl?symbol=${symbol}&strategy=${strategy}&max_points=${MAX_POINTS}`
         );
         setPnlData(response.data);
         setError(null);
@@ -33,7 +72,7 @@ function App() {
       }
     };
     fetchPnl();
-  }, [symbol, strategy]);
+  }, [live, symbol, strategy]);
 
   return (
     <div style={{ maxWidth: 800, margin: "0 auto", padding: 20 }}>
@@ -57,6 +96,11 @@ function App() {
             <option value="enhanced">Enhanced</option>
           </select>
         </label>
+        &nbsp;&nbsp;
+        <label>
+          <input type="checkbox" checked={live} onChange={(e) => setLive(e.target.checked)} />
+          &nbsp;Live
+        </label>
       </div>
       <p>
         Default view shows Apple (AAPL) running the <em>mean_reversion</em> backtest pulled from
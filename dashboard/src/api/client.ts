@@ -2,7 +2,7 @@
 
 import axios from "axios";
 
-const baseURL = process.env.REACT_APP_API_URL ?? "http://localhost:8000";
+export const baseURL = process.env.REACT_APP_API_URL ?? "http://localhost:8000";
 
 export const api = axios.create({
   baseURL, // point to our FastAPI service
@@ -0,0 +1,28 @@
+# tests/fixtures.py
+
+"""Synthetic price data shared by the tests and benchmarks/suite.py."""
+
+import numpy as np
+
+
+def synthetic_ohlcv(n_bars: int, seed: int = 0):
+    """
+    Random-walk OHLCV indexed by Date, with the columns yfinance delivers.
+    Business days while they fit in pandas' Timestamp range, hourly beyond.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    freq = "B" if n_bars <= 50_000 else "h"
+    dates = pd.date_range("1990-01-01", periods=n_bars, freq=freq, name="Date")
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+    open_ = close * np.exp(rng.normal(0, 0.003, n_bars))
+    spread = np.abs(rng.normal(0, 0.01, n_bars))
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + spread),
+        "Low": np.minimum(open_, close) * (1 - spread),
+        "Close": close,
+        "Adj Close": close,
+        "Volume": rng.integers(100_000, 10_000_000, n_bars).astype(np.float64),
+    }, index=dates)
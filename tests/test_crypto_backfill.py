@@ -0,0 +1,68 @@
+# tests/test_crypto_backfill.py
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from DataPipeline.crypto import backfill, run_backfill, windows
+from DataPipeline.fake_exchange import FakeExchange
+from DataPipeline.intraday import IntradayStore
+
+MINUTE = 60_000
+LISTED = 1_500_000_000_000
+UNTIL = LISTED + 5_000 * MINUTE + 30_000  # mid-candle: only closed candles are fetched
+
+
+def exchange(**kwargs):
+    kwargs.setdefault("latency", (0.0, 0.002))
+    return FakeExchange(listed_ms=LISTED, **kwargs)
+
+
+def assert_gap_free(records, first_ms, until_ms, step=MINUTE):
+    ts_ms = records["ts"] // 1_000_000
+    assert ts_ms[0] == first_ms
+    assert ts_ms[-1] == until_ms - until_ms % step - step
+    assert np.all(np.diff(ts_ms) == step)  # no gaps, no duplicates, in order
+
+
+def test_windows_tile_the_range():
+    spans = windows(LISTED, UNTIL, MINUTE, limit=300)
+    assert spans[0][0] == LISTED and spans[-1][1] == UNTIL
+    assert all(hi == lo for (_, hi), (lo, _) in zip(spans, spans[1:]))
+    assert all(0 < hi - lo <= 300 * MINUTE for lo, hi in spans)
+    assert windows(LISTED, LISTED, MINUTE) == []
+
+
+def test_backfill_is_gap_free_despite_errors(monkeypatch):
+    monkeypatch.setattr("DataPipeline.scheduler.backoff_delay", lambda *args, **kwargs: 0.0)
+    fake = exchange(error_rate=0.1, seed=3)
+    since = {"BTC/USDT": None, "ETH/USDT": LISTED + 1_234 * MINUTE + 5}  # unaligned start
+    out = asyncio.run(backfill(fake, list(since), "1m", since=since, until=UNTIL,
+                               concurrency=4, limit=300))
+
+    assert fake.errors > 0
+    assert fake.max_in_flight <= 4
+    assert_gap_free(out["BTC/USDT"], LISTED, UNTIL)
+    assert_gap_free(out["ETH/USDT"], LISTED + 1_234 * MINUTE, UNTIL)
+    for symbol, records in out.items():
+        expected = np.asarray(fake.candles(symbol, "1m", int(records["ts"][0] // 1_000_000), len(records)))
+        np.testing.assert_array_equal(records["close"], expected[:, 4])
+
+
+def test_run_backfill_writes_store(tmp_path):
+    fake = exchange(seed=0)
+    store = IntradayStore(tmp_path)
+    counts = asyncio.run(run_backfill(["BTC/USDT"], "1m", since=LISTED, until=UNTIL,
+                                      store=store, exchange=fake))
+    assert counts == {"BTC/USDT": 5_000}
+    assert fake.closed
+    assert store.last_ts("BTC/USDT", "1m") == np.datetime64(UNTIL - 30_000 - MINUTE, "ms")
+    assert_gap_free(np.concatenate(list(store.chunks("BTC/USDT", "1m"))), LISTED, UNTIL)
+
+
+def test_backfill_gives_up_on_persistent_errors(monkeypatch):
+    monkeypatch.setattr("DataPipeline.scheduler.backoff_delay", lambda *args, **kwargs: 0.0)
+    with pytest.raises(ConnectionError):
+        asyncio.run(backfill(exchange(error_rate=1.0, seed=0), ["BTC/USDT"], "1m",
+                             since=LISTED, until=LISTED + 10 * MINUTE))
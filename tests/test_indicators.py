@@ -0,0 +1,57 @@
+# tests/test_indicators.py
+
+"""The streaming indicators must match the array versions the backtests use, bar for bar."""
+
+import numpy as np
+import pytest
+
+from Backtester.indicators import RingBuffer, RollingZScore, WilderRSI
+from Backtester.vectorized import rolling_mean_std, wilder_rsi
+
+
+@pytest.fixture(scope="module")
+def closes():
+    rng = np.random.default_rng(11)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, 3000)))
+
+
+def stream(indicator, prices):
+    return np.array([indicator.update(p) for p in prices.tolist()])
+
+
+@pytest.mark.parametrize("period", [2, 14, 30])
+def test_wilder_rsi_matches_vectorized(closes, period):
+    rsi = WilderRSI(period)
+    streamed = stream(rsi, closes)
+    expected = wilder_rsi(closes, period)
+    # NaN through the warm-up (period moves), then equal on every bar
+    np.testing.assert_array_equal(np.isnan(streamed), np.isnan(expected))
+    assert np.isnan(streamed[:period]).all() and rsi.ready
+    np.testing.assert_allclose(streamed[period:], expected[period:], rtol=1e-9)
+    assert rsi.value == streamed[-1]
+
+
+def test_wilder_rsi_seed_then_update(closes):
+    rsi = WilderRSI(14)
+    rsi.seed(closes[:100])
+    rest = stream(rsi, closes[100:])
+    np.testing.assert_allclose(rest, wilder_rsi(closes, 14)[100:], rtol=1e-9)
+
+
+def test_wilder_rsi_only_up_moves():
+    rsi = WilderRSI(3)
+    assert stream(rsi, np.arange(1.0, 8.0))[-1] == 100.0
+
+
+@pytest.mark.parametrize("period", [5, 20])
+def test_rolling_zscore_matches_vectorized(closes, period):
+    streamed = stream(RollingZScore(period), closes)
+    sma, std = rolling_mean_std(closes, period)
+    ready = slice(period - 1, None)
+    np.testing.assert_allclose(streamed[ready], ((closes - sma) / std)[ready], rtol=1e-6, atol=1e-9)
+
+
+def test_ring_buffer_evicts_oldest():
+    buf = RingBuffer(3)
+    assert [buf.push(v) for v in (1.0, 2.0, 3.0, 4.0)] == [None, None, None, 1.0]
+    assert buf.full and buf.values() == [2.0, 3.0, 4.0]
@@ -0,0 +1,54 @@
+# tests/test_pnl_dates.py
+
+"""P&L series start after the indicator warm-up, so their dates must too."""
+
+import json
+
+import pytest
+
+from Backtester import backtest, sweep
+from Backtester.indicator_cache import IndicatorCache
+from Backtester.result_cache import ResultCache
+from tests.fixtures import synthetic_ohlcv
+
+PERIOD = 20
+
+
+class NullPublisher:
+    def publish(self, channel, message):
+        pass
+
+
+@pytest.fixture
+def df(monkeypatch):
+    df = synthetic_ohlcv(300, seed=5)
+    monkeypatch.setattr(backtest, "fetch_data_from_db", lambda *a, **k: df)
+    monkeypatch.setattr(sweep, "fetch_data_from_db", lambda *a, **k: df)
+    return df
+
+
+def assert_tail_aligned(df, pnl):
+    dates = df.index[len(df) - len(pnl):].strftime("%Y-%m-%d").tolist()
+    assert [p["date"] for p in pnl] == dates
+    assert pnl[0]["date"] == df.index[PERIOD - 1].strftime("%Y-%m-%d")
+    assert pnl[-1]["date"] == df.index[-1].strftime("%Y-%m-%d")
+
+
+@pytest.mark.parametrize("engine", ["backtrader", "vectorized"])
+def test_backtest_json_dates(df, tmp_path, engine):
+    output = tmp_path / "pnl.json"
+    backtest.run_backtest("SYN", None, None, 100_000, str(output), "mean_reversion",
+                          PERIOD, 2.0, 100, engine=engine, cache=ResultCache(tmp_path / "cache"))
+    assert_tail_aligned(df, json.loads(output.read_text()))
+
+
+def test_sweep_json_dates(df, tmp_path):
+    grid = sweep.build_grid("mean_reversion", [PERIOD], [2.0], [100])
+    summary = sweep.run_sweep(["SYN"], None, None, grid, output_dir=tmp_path / "out", workers=1,
+                              cache=ResultCache(tmp_path / "cache"),
+                              indicator_cache=IndicatorCache(tmp_path / "ind"),
+                              publisher=NullPublisher())
+    row = summary.iloc[0]
+    pnl = json.loads((tmp_path / "out" / row["file"]).read_text())
+    assert_tail_aligned(df, pnl)
+    assert (row["first_date"], row["last_date"]) == (pnl[0]["date"], pnl[-1]["date"])
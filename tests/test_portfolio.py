@@ -0,0 +1,47 @@
+# tests/test_portfolio.py
+
+import numpy as np
+import pytest
+
+from Backtester import vectorized
+from Backtester.portfolio import STRATEGIES, Panel, simulate_portfolio, synthetic_panel
+
+
+def test_strategies_match_the_engine():
+    assert STRATEGIES == vectorized.STRATEGIES
+
+
+@pytest.mark.parametrize("strategy", ["mean_reversion", "enhanced"])
+def test_one_symbol_matches_the_vectorized_engine(strategy):
+    panel = synthetic_panel(1, n_days=1500, seed=3)
+    open_, close = panel.open[:, 0], panel.close[:, 0]
+    single = vectorized.simulate(open_, close, 100_000, strategy=strategy, period=20,
+                                 devfactor=1.5, stake=100)
+    result = simulate_portfolio(panel, 100_000, strategy, period=20, devfactor=1.5, stake=100)
+
+    np.testing.assert_allclose(result.value[single.start:], single.value_history, rtol=1e-12)
+    assert result.trades[0] == len(single.fill_index)
+
+
+def test_shorts_are_capped_by_gross_exposure():
+    # 40 symbols x 100 shares x ~100 is far more than the 100k pool; unchecked,
+    # short entries keep adding cash and the book grows without bound.
+    panel = synthetic_panel(40, n_days=1000, seed=1)
+    capped = simulate_portfolio(panel, 100_000, period=20, devfactor=1.0, stake=100)
+    loose = simulate_portfolio(panel, 100_000, period=20, devfactor=1.0, stake=100, leverage=1e9)
+
+    assert capped.rejected > loose.rejected
+    gross = lambda r: np.abs(r.position[-1]) @ panel.close[-1]
+    assert gross(capped) < gross(loose)
+    assert capped.value.min() > 0
+
+
+def test_entry_over_the_limit_is_rejected():
+    dates = np.arange(60).astype("datetime64[D]").astype("datetime64[ns]")
+    close = np.full((60, 1), 100.0)
+    close[40:, 0] = 50.0  # deep below the band: a long entry of 100 x 50
+    panel = Panel(["X"], dates, close.copy(), close)
+
+    assert simulate_portfolio(panel, 10_000, stake=100).trades[0] == 1
+    result = simulate_portfolio(panel, 10_000, stake=100, leverage=0.4)
+    assert result.trades[0] == 0 and result.rejected > 0
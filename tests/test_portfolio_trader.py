@@ -0,0 +1,86 @@
+# tests/test_portfolio_trader.py
+
+import asyncio
+
+import pytest
+
+from LiveTrader.fake_ib import FakeIB
+from LiveTrader.latency import LatencyRecorder
+from LiveTrader.portfolio import PortfolioTrader
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "AMZN"]
+
+
+class Collect:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, channel, event):
+        self.events.append((channel, event))
+
+
+async def session(trader, ib, duration):
+    runner = asyncio.ensure_future(trader.run())
+    while not ib.isConnected():
+        await asyncio.sleep(0.01)
+    await ib.stream(interval=0.002, duration=duration)
+    await asyncio.sleep(0.05)  # let the last fills land
+    trader.stop()
+    await runner
+
+
+@pytest.fixture(scope="module")
+def traded():
+    ib = FakeIB(fill_latency=(0.001, 0.01), volatility=0.01, seed=1)
+    publisher = Collect()
+    trader = PortfolioTrader(SYMBOLS, ib=ib, period=10, devfactor=1.5,
+                             recorder=LatencyRecorder(SYMBOLS), publisher=publisher, publish_interval=0)
+    asyncio.run(session(trader, ib, duration=1.0))
+    return trader, ib, publisher.events
+
+
+def filled(ib, symbol=None):
+    return [t for t in ib.trades if t.orderStatus.status == "Filled"
+            and (symbol is None or t.contract.symbol == symbol)]
+
+
+def _running(sizes):
+    total = 0
+    for size in sizes:
+        total += size
+        yield total
+
+
+def test_every_symbol_trades(traded):
+    trader, ib, _ = traded
+    assert set(trader.books) == set(SYMBOLS)
+    for book in trader.books.values():
+        assert book.ticks > 100
+        assert book.orders > 0
+        assert filled(ib, book.symbol)
+
+
+def test_books_match_fills(traded):
+    trader, ib, _ = traded
+    cash = 100_000.0
+    for book in trader.books.values():
+        signed = [(1 if t.order.action == "BUY" else -1) * t.orderStatus.filled for t in filled(ib, book.symbol)]
+        assert book.position == sum(signed)
+        assert book.pending is None
+        # one working order per symbol: orders alternate entry / exit
+        assert all(abs(p) <= trader.stake for p in _running(signed))
+    for t in filled(ib):
+        sign = 1 if t.order.action == "BUY" else -1
+        cash -= sign * t.orderStatus.filled * t.orderStatus.avgFillPrice
+    assert trader.cash == pytest.approx(cash)
+
+
+def test_publishes_fills_and_value(traded):
+    trader, ib, events = traded
+    assert {channel for channel, _ in events} == {"live/portfolio"}
+    fills = [e for _, e in events if e["type"] == "fill"]
+    assert len(fills) == len(filled(ib))
+    # fills land in latency order, not placement order
+    assert sorted((e["symbol"], e["price"]) for e in fills) == \
+        sorted((t.contract.symbol, t.orderStatus.avgFillPrice) for t in filled(ib))
+    assert sum(e["type"] == "value" for _, e in events) > 100
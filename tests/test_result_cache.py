@@ -0,0 +1,50 @@
+# tests/test_result_cache.py
+
+import os
+
+from Backtester.result_cache import ResultCache
+
+
+def test_get_counts_hits_and_misses(tmp_path):
+    cache = ResultCache(tmp_path)
+    key = cache.key("abc", period=20)
+    assert cache.get(key) is None
+    cache.put(key, {"values": [1.0, 2.0]})
+    assert cache.get(key) == {"values": [1.0, 2.0]}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_get_or_compute_counts_each_lookup_once(tmp_path):
+    cache = ResultCache(tmp_path)
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute("k" * 32, lambda: calls.append(1) or [1.0]) == [1.0]
+    assert (len(calls), cache.hits, cache.misses) == (1, 2, 1)
+
+
+def test_disabled_and_corrupt_entries_are_misses(tmp_path):
+    disabled = ResultCache(tmp_path, enabled=False)
+    disabled.put("k" * 32, [1.0])
+    assert disabled.get("k" * 32) is None
+    assert (disabled.hits, disabled.misses) == (0, 1)
+
+    cache = ResultCache(tmp_path)
+    key = cache.key("abc")
+    cache.put(key, [1.0])
+    cache._path(key).write_text("{truncated")
+    assert cache.get(key) is None
+    assert cache.misses == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=None)
+    keys = [cache.key("abc", i=i) for i in range(10)]
+    for n, key in enumerate(keys):
+        cache.put(key, [0.0] * 100)
+        os.utime(cache._path(key), ns=(n * 10 ** 9, n * 10 ** 9))
+    cache.get(keys[0])  # touched: now the most recent
+    size = cache._path(keys[0]).stat().st_size
+    removed = cache.evict(max_bytes=5 * size)
+    assert removed == 6
+    assert cache.get(keys[0]) is not None
+    assert [cache.get(key) is not None for key in keys[1:]] == [False] * 6 + [True] * 3
@@ -0,0 +1,121 @@
+# tests/test_scheduler.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from DataPipeline.scheduler import FakeProvider, IngestionScheduler, Job, Provider
+from DataPipeline.store import ColumnarStore
+
+END = datetime.today()
+START = END - timedelta(days=365)
+
+
+def scheduler(store, **kwargs):
+    kwargs.setdefault("backoff_base", 0.001)
+    kwargs.setdefault("backoff_cap", 0.01)
+    return IngestionScheduler(START, END, store=store, **kwargs)
+
+
+class Flaky:
+    """Fails the first `failures` calls per symbol, then delegates to FakeProvider."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = {}
+        self.fake = FakeProvider(latency=(0.0, 0.0), error_rate=0.0)
+
+    def __call__(self, symbol, since=None):
+        self.calls[symbol] = self.calls.get(symbol, 0) + 1
+        if self.calls[symbol] <= self.failures:
+            raise ConnectionError("transient")
+        return self.fake(symbol, since)
+
+
+def test_retries_until_success(tmp_path):
+    provider = Provider("flaky", Flaky(failures=2), rate=1000, burst=10)
+    [timing] = scheduler(ColumnarStore(tmp_path), max_retries=3).run([Job("A", "A", provider)])
+    assert (timing.status, timing.attempts, timing.error) == ("ok", 3, "")
+
+
+def test_gives_up_after_max_retries(tmp_path):
+    flaky = Flaky(failures=10)
+    provider = Provider("flaky", flaky, rate=1000, burst=10)
+    [timing] = scheduler(ColumnarStore(tmp_path), max_retries=2).run([Job("A", "A", provider)])
+    assert (timing.status, timing.attempts, flaky.calls["A"]) == ("failed", 3, 3)
+    assert timing.error.startswith("ConnectionError")
+    assert not ColumnarStore(tmp_path).has("A")
+
+
+def test_fifty_symbols(tmp_path):
+    store = ColumnarStore(tmp_path)
+    fake = FakeProvider(latency=(0.0, 0.005), error_rate=0.1, seed=0)
+    provider = Provider("fake", fake, rate=1000, burst=16)
+    jobs = [Job(f"SYM{i}", f"SYM{i}", provider) for i in range(50)]
+    timings = scheduler(store, workers=16, max_retries=8).run(jobs)
+
+    assert sorted(t.table for t in timings) == sorted(job.table for job in jobs)
+    assert all(t.status == "ok" for t in timings)
+    assert any(t.attempts > 1 for t in timings)  # some transient errors were retried
+    for t in timings:
+        # FakeProvider returns ten years; only the clipped year is written and counted
+        assert 0 < t.rows == len(store.read(t.table)) < 300
+
+
+def test_watermark_error_fails_the_job(tmp_path):
+    class BrokenStore(ColumnarStore):
+        def last_date(self, symbol):
+            raise OSError("store unavailable")
+
+    provider = Provider("fake", FakeProvider(latency=(0.0, 0.0), error_rate=0.0), rate=1000)
+    timings = scheduler(BrokenStore(tmp_path)).run([Job("A", "A", provider), Job("B", "B", provider)])
+    assert [t.status for t in timings] == ["failed", "failed"]
+    assert all("store unavailable" in t.error for t in timings)
+
+
+@pytest.mark.parametrize("full", [False, True])
+def test_incremental_run_upserts(tmp_path, full):
+    store = ColumnarStore(tmp_path)
+    provider = Provider("fake", FakeProvider(latency=(0.0, 0.0), error_rate=0.0), rate=1000)
+    scheduler(store).run([Job("A", "A", provider)])
+    rows = len(store.read("A"))
+    [timing] = scheduler(store, full=full).run([Job("A", "A", provider)])
+    assert timing.status == "ok"
+    assert len(store.read("A")) == rows
+    assert (timing.rows == rows) if full else (timing.rows < rows)
+
+
+def test_crypto_resumes_from_the_watermark(tmp_path, monkeypatch):
+    from DataPipeline import crypto
+    from DataPipeline.pipeline import RECONCILE_DAYS, fetch_crypto_since
+
+    class Exchange:
+        """Daily candles up to today; records the `since` of each request."""
+        day = 86_400_000
+
+        def __init__(self):
+            self.since = []
+
+        def parse_timeframe(self, timeframe):
+            return self.day // 1000
+
+        def fetch_ohlcv(self, symbol, timeframe, since, limit):
+            self.since.append(since)
+            first = since // self.day * self.day
+            last = int(END.timestamp() * 1000) // self.day * self.day
+            return [[t, 1.0, 1.0, 1.0, 1.0, 10.0] for t in range(first, last + 1, self.day)][:limit]
+
+    exchange = Exchange()
+    monkeypatch.setattr(crypto, "get_exchange", lambda: exchange)
+    store = ColumnarStore(tmp_path)
+    job = Job("BTC/USDT", "CRYPTO_BTCUSD", Provider("crypto", fetch_crypto_since, rate=1000))
+
+    [first] = scheduler(store).run([job])
+    assert first.status == "ok" and exchange.since[0] == 0
+    stored = store.read("CRYPTO_BTCUSD")
+    assert (stored["Adj Close"] == stored["Close"]).all()
+
+    [again] = scheduler(store).run([job])
+    since = stored.index[-1] - timedelta(days=RECONCILE_DAYS)
+    assert exchange.since[-1] == since.value // 1_000_000
+    assert again.rows < first.rows and len(store.read("CRYPTO_BTCUSD")) == len(stored)
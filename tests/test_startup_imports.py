@@ -0,0 +1,27 @@
+# tests/test_startup_imports.py
+
+"""`tradingfund <command> --help` must not import any heavy dependency."""
+
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup import FORBIDDEN, ROOT, parse_importtime
+from tradingfund import COMMANDS
+
+
+@pytest.mark.parametrize("command", sorted(COMMANDS))
+def test_help_skips_heavy_imports(command):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "tradingfund.py", command, "--help"],
+                          cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert "usage: tradingfund" in proc.stdout
+    loaded = {name.split(".")[0] for name in parse_importtime(proc.stderr)}
+    assert sorted(loaded.intersection(FORBIDDEN)) == []
+
+
+def test_startup_benchmark_covers_every_command():
+    from benchmarks.startup import COMMANDS as BENCHMARKED
+
+    assert set(BENCHMARKED) == set(COMMANDS)
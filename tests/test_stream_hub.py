@@ -0,0 +1,89 @@
+# tests/test_stream_hub.py
+
+import asyncio
+import json
+import math
+
+from API.stream import Hub, start_listener
+from common.stream import UDPPublisher
+
+
+def parse(message: bytes):
+    """(event, id, data) of one server-sent-events message."""
+    fields = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+    return fields["event"], fields.get("id"), json.loads(fields["data"])
+
+
+def drain(sub):
+    messages = []
+    while not sub.queue.empty():
+        messages.append(sub.queue.get_nowait())
+    return messages
+
+
+def test_snapshot_then_deltas():
+    hub = Hub()
+    hub.publish("live/AAPL", {"type": "value", "value": 1.0})
+    hub.publish("live/AAPL", {"type": "fill", "price": 10.0})
+    sub = hub.subscribe("live/AAPL")
+    hub.publish("live/AAPL", {"type": "value", "value": 2.0})
+    hub.publish("live/MSFT", {"type": "value", "value": 9.0})  # other channel
+
+    snapshot, delta = [parse(m) for m in drain(sub)]
+    assert snapshot[:2] == ("snapshot", "2")
+    assert [e["value"] for e in snapshot[2]["value"]] == [1.0]
+    assert [e["seq"] for e in snapshot[2]["fill"]] == [2]
+    assert delta == ("value", "3", {"type": "value", "value": 2.0, "seq": 3})
+
+
+def test_non_finite_floats_become_null():
+    hub = Hub()
+    sub = hub.subscribe("sweep")
+    hub.publish("sweep", {"type": "run", "sharpe": math.nan, "final": math.inf})
+    _, _, event = parse(drain(sub)[-1])
+    assert (event["sharpe"], event["final"]) == (None, None)
+
+
+def test_slow_consumer_is_dropped():
+    hub = Hub(queue_size=4)
+    slow, fast = hub.subscribe("live/portfolio"), hub.subscribe("live/portfolio")
+    received = []
+    for i in range(10):
+        hub.publish("live/portfolio", {"type": "value", "value": float(i)})
+        received += drain(fast)
+
+    assert slow.dropped and not fast.dropped
+    assert hub.channels["live/portfolio"].subscribers == {fast}
+    assert hub.dropped == 1
+    # the backlog is cleared: only the "dropped" notice and the end marker remain
+    dropped, end = drain(slow)
+    assert parse(dropped)[0] == "dropped" and end is None
+    assert [parse(m)[2]["value"] for m in received[1:]] == [float(i) for i in range(10)]
+
+
+def test_unsubscribe_forgets_unused_channel():
+    hub = Hub()
+    hub.unsubscribe(hub.subscribe("live/NVDA"))
+    assert "live/NVDA" not in hub.channels
+
+
+def test_udp_publisher_reaches_hub():
+    async def roundtrip():
+        hub = Hub()
+        transport = await start_listener(hub, "127.0.0.1:0")
+        port = transport.get_extra_info("sockname")[1]
+        publisher = UDPPublisher(f"127.0.0.1:{port}")
+        try:
+            publisher.publish("live/AAPL", {"type": "value", "value": 101.5})
+            for _ in range(100):
+                if hub.published:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            publisher.close()
+            transport.close()
+        return hub, publisher
+
+    hub, publisher = asyncio.run(roundtrip())
+    assert publisher.sent == 1
+    assert hub.snapshot("live/AAPL")["value"] == [{"type": "value", "value": 101.5, "seq": 1}]
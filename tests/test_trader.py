@@ -0,0 +1,30 @@
+# tests/test_trader.py
+
+from LiveTrader import latency
+from LiveTrader.fake_ib import FakeIB
+from LiveTrader.latency import LatencyRecorder
+from LiveTrader.trader import LiveMeanReversionTrader
+
+
+class Collect:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, channel, event):
+        self.events.append((channel, event))
+
+
+def test_uses_the_given_recorder(tmp_path, monkeypatch):
+    monkeypatch.setattr(latency, "DEFAULT_DIR", tmp_path)
+    recorder = LatencyRecorder(["AAPL"], enabled=False)
+    trader = LiveMeanReversionTrader("aapl", ib=FakeIB(), publisher=Collect(), recorder=recorder)
+    assert trader.latency is recorder
+    trader.latency.span(latency.TICK, latency.now())
+    assert trader.latency._head == 0
+    assert not any(tmp_path.iterdir())  # no span file for a disabled recorder
+
+
+def test_default_recorder_writes_spans(tmp_path, monkeypatch):
+    monkeypatch.setattr(latency, "DEFAULT_DIR", tmp_path)
+    trader = LiveMeanReversionTrader("AAPL", ib=FakeIB(), publisher=Collect())
+    assert trader.latency.enabled and trader.latency.path.parent == tmp_path
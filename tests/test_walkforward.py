@@ -0,0 +1,69 @@
+# tests/test_walkforward.py
+
+import pandas as pd
+import pytest
+
+from Backtester.result_cache import ResultCache
+from Backtester.sweep import build_grid
+from Backtester.walkforward import WalkForward, make_windows
+from tests.fixtures import synthetic_ohlcv
+
+GRID = build_grid("mean_reversion", [10, 20], [1.5, 2.0], [100], [14], [30], [70])
+
+
+def study(df, tmp_path):
+    return WalkForward(df, GRID, cache=ResultCache(tmp_path))
+
+
+def test_windows_are_complete_and_anchored():
+    index = pd.bdate_range("2020-01-01", "2022-12-31")
+    windows = make_windows(index, train_months=12, test_months=6)
+    assert windows[0] == (pd.Timestamp("2020-01-01"), pd.Timestamp("2021-01-01"), pd.Timestamp("2021-07-01"))
+    # the last bar is Friday 2022-12-30, so the window testing through 2022-12-31 is incomplete
+    assert windows[-1] == (pd.Timestamp("2021-01-01"), pd.Timestamp("2022-01-01"), pd.Timestamp("2022-07-01"))
+    assert len(windows) == 3
+
+
+def test_empty_history_raises():
+    with pytest.raises(ValueError, match="no bars"):
+        make_windows(pd.DatetimeIndex([]), 12, 6)
+
+
+def test_history_shorter_than_one_window_raises(tmp_path):
+    df = synthetic_ohlcv(200)  # under ten months of business days
+    with pytest.raises(ValueError, match="shorter than one window"):
+        study(df, tmp_path).run(train_months=12, test_months=6)
+
+
+def test_gap_in_history_skips_window(tmp_path):
+    df = synthetic_ohlcv(1000)
+    gap = (df.index >= "1991-01-01") & (df.index < "1991-07-01")
+    windows, dates, values = study(df[~gap], tmp_path).run(train_months=6, test_months=6)
+    assert 2 not in set(windows["window"])  # its train slice is the gap
+    assert len(windows) == len(make_windows(df.index, 6, 6)) - 1
+    assert len(dates) == len(values) > 0
+    assert dates.is_monotonic_increasing
+
+
+def test_rerun_is_served_from_cache(tmp_path):
+    df = synthetic_ohlcv(1000)
+    first = study(df, tmp_path).run(train_months=12, test_months=6)
+    again = study(df, tmp_path)
+    second = again.run(train_months=12, test_months=6)
+    assert again.cache.misses == 0 and again.cache.hits > 0
+    pd.testing.assert_frame_equal(first[0], second[0])
+    assert first[2] == second[2]
+
+
+def test_test_window_inside_warm_up(tmp_path):
+    df = synthetic_ohlcv(400)
+    grid = build_grid("mean_reversion", [50], [1.5], [100])
+    # One-month windows are ~22 bars, well inside period 50's 49-bar warm-up;
+    # final_value still scores the flat train runs, so windows get params
+    windows, dates, values = WalkForward(df, grid, objective="final_value",
+                                         cache=ResultCache(tmp_path)).run(train_months=1, test_months=1)
+    assert len(dates) == len(values) > 0
+    assert dates[0] == df.index[49]
+    assert dates.is_unique and dates.is_monotonic_increasing
+    assert pd.isna(windows["test_start"].iloc[0])  # its test month ends before bar 49
+    assert windows["test_start"].iloc[1] == df.index[49].date()
@@ -0,0 +1,80 @@
+# tradingfund.py
+
+"""
+One command line for the whole project.
+
+    python tradingfund.py ingest [--start ... --end ... --full]
+    python tradingfund.py backtest --symbol AAPL --start 2015-06-09 --end 2025-06-09
+    python tradingfund.py sweep --symbols AAPL MSFT --start ... --end ...
+    python tradingfund.py walkforward --symbol AAPL --train-months 24 --test-months 6
+    python tradingfund.py serve [--port 8000 --workers 4]
+    python tradingfund.py trade AAPL MSFT [--fake]
+    python tradingfund.py intraday ingest BTC/USDT --source crypto --interval 1m
+    python tradingfund.py replay --symbol BTC/USDT --interval 1m
+    python tradingfund.py robustness --symbol AAPL --resamples 10000
+    python tradingfund.py portfolio --symbols AAPL MSFT GOOGL --sizing equal
+
+Each subcommand hands its arguments to the main() of the module that
+implements it, and that module is only imported once the subcommand is
+known.  Those modules keep heavy dependencies (pandas, Backtrader,
+SQLAlchemy, yfinance, ib_insync) out of their top level, so `--help` and
+argument errors return quickly.  `python benchmarks/startup.py` tracks this.
+"""
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# subcommand -> (module whose main(argv, prog) runs it, or None for serve() below; help)
+COMMANDS = {
+    "ingest": ("DataPipeline.pipeline", "download prices into the price store"),
+    "backtest": ("Backtester.backtest", "run one backtest and write its P&L JSON"),
+    "sweep": ("Backtester.sweep", "run a parallel parameter sweep"),
+    "walkforward": ("Backtester.walkforward", "walk-forward optimization with memoized windows"),
+    "serve": (None, "start the API server (uvicorn)"),
+    "trade": ("LiveTrader.portfolio", "trade one or more symbols live (or --fake)"),
+    "intraday": ("DataPipeline.intraday", "ingest minute bars or ticks into the intraday store"),
+    "replay": ("Backtester.replay", "replay stored bars/ticks through the live trading rules"),
+    "robustness": ("Backtester.robustness", "bootstrap / entry-jitter distributions of a parameter grid"),
+    "portfolio": ("Backtester.portfolio", "backtest many symbols from one shared cash pool"),
+}
+
+
+def serve(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Start the TradingFund API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--reload", action="store_true", help="restart on code changes")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run("API.main:app", host=args.host, port=args.port,
+                workers=None if args.reload else args.workers, reload=args.reload)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    parser = argparse.ArgumentParser(
+        prog="tradingfund",
+        usage="tradingfund [-h] command [args ...]",
+        description="TradingFund command line (see tradingfund <command> --help)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<13}{text}" for name, (_, text) in COMMANDS.items()),
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    args = parser.parse_args(argv[:1])
+
+    module, _ = COMMANDS[args.command]
+    run = serve if module is None else importlib.import_module(module).main
+    return run(argv[1:], prog=f"tradingfund {args.command}")
+
+
+if __name__ == "__main__":
+    main()